@@ -1,7 +1,3 @@
 import pygame
 
-from app.buffer_system import BufferSystem
-
-
-buffer = BufferSystem()
 clock = pygame.time.Clock()
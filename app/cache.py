@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from functools import lru_cache
+
+from pygame.font import Font
+from pygame.surface import Surface
+
+TEXT_CACHE_SIZE = 256  # rendered strings kept, least recently used go first
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def text_surface(
+    text: str, font: Font, color: tuple[int, int, int]
+) -> Surface:
+    """Renders a line of antialiased text, memoized by (string, font,
+    color) since Font.render is by far the slowest draw call."""
+    return render_text(text, font, color)
+
+
+def render_text(
+    text: str, font: Font, color: tuple[int, int, int]
+) -> Surface:
+    """Uncached rendering, looked up on every cache miss so that it can
+    be instrumented."""
+    return font.render(text, True, color)
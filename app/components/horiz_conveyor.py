@@ -5,39 +5,16 @@ from pygame.surface import Surface
 
 from app.colors import BLACK, DARK_GREY, WHITE
 from app.config import HORIZ_CONV_CAPACITY, SCREEN_HEIGHT, SCREEN_WIDTH
+from engine import components as logic
 
 
-class HorizConveyor:
-    """
-    A horizontal indexing conveyor feeding parts
-    to a palletizing cell.
-
-    In the event this palletizing cell goes down, the
-    inlet vertical conveyor lifts parts from this
-    horizontal main conveyor to avoid upstream stoppage.
-
-    When the palletizing cell is returned to production,
-    the outlet vertical conveyor backfills voids on this
-    horizontal conveyor to empty out the buffer's contents.
-
-    """
+class HorizConveyor(logic.HorizConveyor):
+    """Drawable view of the horizontal indexing conveyor."""
 
     def __init__(self, part_height: int) -> None:
-        self.capacity = HORIZ_CONV_CAPACITY
         self.part_height = part_height
-        self.build()
-
-    def build(self) -> None:
-        self.contents = []
-        for _ in range(self.capacity):
-            self.contents.append(False)
+        super().__init__(capacity=HORIZ_CONV_CAPACITY)
 
-    def index(self, new_part: bool) -> None:
-        new_contents = [new_part] + self.contents[:-1]
-        self.contents = new_contents
-        pass
-
-    def draw(self, window: Surface) -> None:
         self.width = SCREEN_WIDTH
         self.height = SCREEN_HEIGHT * 0.05
         self.pitch_width = self.width / self.capacity
@@ -45,7 +22,29 @@ class HorizConveyor:
         x_pos = 0
         y_pos = SCREEN_HEIGHT * 0.9
         self.rect = Rect(x_pos, y_pos, self.width, self.height)
+        self.drawn_bits: int | None = None  # contents as last drawn
+
+    def slot_rect(self, i: int) -> Rect:
+        """Outline of the part at the i-th position from upstream."""
+        x_pos = self.rect.right - (self.pitch_width * (i + 1))
+        return Rect(x_pos, self.rect.top - self.part_height,
+                    self.pitch_width, self.part_height)
+
+    def dirty_rect(self) -> Rect | None:
+        """Area covering the positions that changed since they were last
+        drawn, or None if nothing changed."""
+        if self.drawn_bits is None:
+            return self.rect.union(self.slot_rect(0)).inflate(2, 2)
+        changed = self.bits ^ self.drawn_bits
+        if not changed:
+            return None
+        first = (changed & -changed).bit_length() - 1
+        last = changed.bit_length() - 1
+        return self.slot_rect(first).union(
+            self.slot_rect(last)
+        ).inflate(2, 2)
 
+    def draw(self, window: Surface) -> None:
         corners = [
             self.rect.topleft, self.rect.topright,
             self.rect.bottomright, self.rect.bottomleft
@@ -57,13 +56,12 @@ class HorizConveyor:
         draw.lines(window, BLACK, True, corners)
 
         self.draw_contents(window=window)
+        self.drawn_bits = self.bits
 
     def draw_contents(self, window: Surface) -> None:
 
         for i, part in enumerate(self.contents):
-            x_pos = self.rect.right - (self.pitch_width * (i + 1))
-            r = Rect(x_pos, self.rect.top - self.part_height,
-                     self.pitch_width, self.part_height)
+            r = self.slot_rect(i)
             corners = [r.topleft, r.topright, r.bottomright, r.bottomleft]
             if part:
                 draw.rect(window, WHITE, r)
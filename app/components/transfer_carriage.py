@@ -4,19 +4,17 @@ from pygame import Rect, draw
 from pygame.surface import Surface
 
 from app.colors import RED
+from engine import components as logic
 
 
-class XferCarriage:
-    def __init__(self, initial_pos: int) -> None:
-        self.position = initial_pos
-
-    def move_up(self) -> None:
-        self.position += 1
+class XferCarriage(logic.XferCarriage):
 
-    def move_down(self) -> None:
-        self.position -= 1
+    def __init__(self, initial_pos: int) -> None:
+        super().__init__(initial_pos)
+        self.drawn_rect: Rect | None = None  # outline as last drawn
 
-    def draw(self, window: Surface, buffer_rect: Rect, pitch_height: int):
+    def rect_at(self, buffer_rect: Rect, pitch_height: int) -> Rect:
+        """Outline of the carriage at its current position."""
         self.width = buffer_rect.width * .125
         self.height = pitch_height * .75
 
@@ -24,9 +22,22 @@ class XferCarriage:
         y_pos = buffer_rect.bottom - (pitch_height * (self.position + 0.5)) \
             - (self.height / 2)
 
-        self.rect = Rect(x_pos, y_pos, self.width, self.height)
+        return Rect(x_pos, y_pos, self.width, self.height)
+
+    def dirty_rects(self, buffer_rect: Rect, pitch_height: int) -> list[Rect]:
+        """Areas the carriage moved from and to since it was last drawn."""
+        rect = self.rect_at(buffer_rect, pitch_height)
+        if rect == self.drawn_rect:
+            return []
+        if self.drawn_rect is None:
+            return [rect.inflate(2, 2)]
+        return [self.drawn_rect.inflate(2, 2), rect.inflate(2, 2)]
+
+    def draw(self, window: Surface, buffer_rect: Rect, pitch_height: int):
+        self.rect = self.rect_at(buffer_rect, pitch_height)
         self.triangle = [
             self.rect.midleft, self.rect.topright, self.rect.bottomright
         ]
 
         draw.polygon(window, RED, self.triangle)
+        self.drawn_rect = self.rect
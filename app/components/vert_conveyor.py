@@ -5,30 +5,15 @@ from pygame.surface import Surface
 
 from app.colors import BLACK, GREY, WHITE
 from app.config import HORIZ_CONV_CAPACITY, SCREEN_HEIGHT, SCREEN_WIDTH
+from engine import components as logic
 
+GRID_KEY = (255, 0, 255)  # transparent background of the slot outlines
 
-class VertConveyor:
-    """
-    A vertical indexing conveyor which raises and lowers parts
-    from the main horizontal conveyor.
 
-    The buffer system consists of two (2) vertical conveyors,
-    along with a mechanism capable of transferring a part
-    from one of these vertical conveyors to the other.
-
-    The inlet side lifts parts up from the main conveyor,
-    staging them for transfer to the outlet conveyor.
-
-    The outlet conveyor receives parts from the inlet conveyor,
-    and lowers them onto the main horizontal conveyor when it can.
-
-    The transfer mechanism sits upon a carriage capable of
-    moving up and down as necessary as the vertical conveyors index.
-
-    """
+class VertConveyor(logic.VertConveyor):
+    """Drawable view of a vertical indexing conveyor."""
 
     def __init__(self, capacity: int, part_height: int, conv_pos: int) -> None:
-        self.capacity = capacity
         self.part_height = part_height
         self.conv_pos = conv_pos
 
@@ -37,53 +22,80 @@ class VertConveyor:
 
         self.x_pos = SCREEN_WIDTH - ((conv_pos + 1) * self.width)
         self.y_pos = (SCREEN_HEIGHT - self.height) / 2
+        self.rect = Rect(self.x_pos, self.y_pos, self.width, self.height)
 
-        self.pitch_height = self.height / self.capacity
+        self.pitch_height = self.height / capacity
         self.animation_offset = 0
+        self.animation_active = False  # indexed up since the flag was reset
+        self.drawn_bits: int | None = None  # contents as last drawn
+        self._grid: tuple[tuple, Surface] | None = None
 
-        self.build()
+        super().__init__(capacity=capacity)
 
-    def build(self) -> None:
-        self.contents: list[bool] = []
-        for _ in range(self.capacity):
-            self.contents.append(False)
+    def index_up(self) -> None:
+        self.animation_active = True
+        super().index_up()
+
+    def slot_rect(self, i: int) -> Rect:
+        """Outline of the i-th slot from the bottom."""
+        # +1 is to account for y_pos being the top of the rect
+        y_pos = self.animation_offset + self.rect.bottom - (
+            self.pitch_height * (i + 1)
+        )
+        return Rect(self.rect.left, y_pos, self.width, self.pitch_height)
+
+    def dirty_rect(self) -> Rect | None:
+        """Area covering the slots that changed since they were last
+        drawn, or None if nothing changed."""
+        if self.drawn_bits is None:
+            return self.rect.inflate(2, 2)
+        changed = self.bits ^ self.drawn_bits
+        if not changed:
+            return None
+        lowest = (changed & -changed).bit_length() - 1
+        highest = changed.bit_length() - 1
+        # outlines are drawn one pixel past the slot on each side
+        return self.slot_rect(highest).union(
+            self.slot_rect(lowest)
+        ).inflate(2, 2)
 
     def draw(self, window: Surface) -> None:
 
         if abs(self.animation_offset) >= self.pitch_height:
             self.animation_offset = 0
 
-        self.rect = Rect(self.x_pos, self.y_pos, self.width, self.height)
-
         draw.rect(window, GREY, self.rect)
         self.draw_contents(window=window)
+        window.blit(self.grid_layer(), self.rect.topleft)
+        self.drawn_bits = self.bits
+
+    def grid_layer(self) -> Surface:
+        """The slot outlines, rendered once off-screen with a transparent
+        background so they can be blitted over the parts."""
+        key = (self.animation_offset, self.capacity)
+        if self._grid is None or self._grid[0] != key:
+            layer = Surface((self.rect.width + 1, self.rect.height + 1))
+            layer.fill(GRID_KEY)
+            layer.set_colorkey(GRID_KEY)
+            for i in range(self.capacity):
+                r = self.slot_rect(i).move(-self.rect.left, -self.rect.top)
+                corners = [r.topleft, r.topright, r.bottomright, r.bottomleft]
+                draw.lines(layer, BLACK, True, corners)
+            self._grid = key, layer
+        return self._grid[1]
 
     def draw_contents(self, window: Surface) -> None:
 
-        for i, part in enumerate(self.contents):
-            # +1 is to account for y_pos being the top of the rect
-            y_pos = self.animation_offset + self.rect.bottom - (
-                self.pitch_height * (i + 1)
-            )
-
-            r = Rect(self.rect.left, y_pos, self.width, self.pitch_height)
-            corners = [r.topleft, r.topright, r.bottomright, r.bottomleft]
-            if part:
-                part_y = r.bottom - self.part_height
-                part_r = Rect(self.rect.left, part_y,
-                              self.width, self.part_height)
-                draw.rect(window, WHITE, part_r)
-                draw.line(window, BLACK, part_r.topleft, part_r.topright)
-            draw.lines(window, BLACK, True, corners)
-
-    def index_up(self) -> None:
-        self.animation_active = True
-        new_contents = [False] + self.contents[:-1]
-        self.contents = new_contents
-
-    def index_down(self) -> None:
-        if self.contents[0]:
-            raise Exception("Crash, part at position 0 when indexing down.")
-
-        new_contents = self.contents[1:] + [False]
-        self.contents = new_contents
+        clip = window.get_clip()
+        bits = self.bits
+        while bits:
+            i = (bits & -bits).bit_length() - 1
+            bits &= bits - 1
+            r = self.slot_rect(i)
+            if not clip.colliderect(r):
+                continue
+            part_y = r.bottom - self.part_height
+            part_r = Rect(self.rect.left, part_y,
+                          self.width, self.part_height)
+            draw.rect(window, WHITE, part_r)
+            draw.line(window, BLACK, part_r.topleft, part_r.topright)
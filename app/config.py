@@ -1,20 +1,43 @@
+import os
 
 import pygame
 
+from engine.config import BUFFER_CAPACITY, HORIZ_CONV_CAPACITY  # noqa
+
 pygame.init()
 
-# screen size
-(SCREEN_WIDTH, SCREEN_HEIGHT) = (1920, 1080)
+# screen size, or WIDTHxHEIGHT from the environment variable to draw at
+# another resolution, such as off screen when exporting with run_export.py
+RESOLUTION_VAR = "BUFFERSIM_RESOLUTION"
+DEFAULT_RESOLUTION = (1920, 1080)
+
+
+def parse_resolution(value: str) -> tuple[int, int]:
+    """Parses a resolution given as WIDTHxHEIGHT, e.g. 1280x720."""
+    width, _, height = value.lower().partition("x")
+    try:
+        size = (int(width), int(height))
+    except ValueError:
+        size = (0, 0)
+    if min(size) <= 0:
+        raise ValueError(f"Resolution must be WIDTHxHEIGHT, got {value!r}")
+    return size
+
+
+(SCREEN_WIDTH, SCREEN_HEIGHT) = (
+    parse_resolution(os.environ[RESOLUTION_VAR])
+    if os.environ.get(RESOLUTION_VAR) else DEFAULT_RESOLUTION
+)
 WINDOW = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 
+# text is laid out for the default height and scaled with the screen
+FONT_SCALE = SCREEN_HEIGHT / DEFAULT_RESOLUTION[1]
+
 # window caption
 pygame.display.set_caption("BufferSim")
 
 # simulation frames rendered per second
 FPS = 144
 
-# indexing conveyor capacity (scales object widths)
-HORIZ_CONV_CAPACITY = 16
-
-# total capacity of the buffer tower
-BUFFER_CAPACITY = 150
+# session journals are written here, see engine.journal
+JOURNAL_DIR = "journals"
@@ -1,42 +1,96 @@
+from __future__ import annotations
+
+from typing import Callable
+
 import pygame as pg
 
-from . import buffer
+from engine.journal import ACTION_CODES, JournalWriter, speed_argument
+from engine.strategy import (STRATEGIES, Strategy, StrategyWatcher,
+                             get_strategy, register_strategy)
+from engine.worker import MAX_SPEED, REALTIME_SPEED, SimulationWorker
+
+WARP_LIMIT = REALTIME_SPEED * 2 ** 9  # fastest doubling, ~1e6x
+
+FRAME_EVENT = pg.USEREVENT  # the simulation worker published a frame
+RELOAD_EVENT = pg.USEREVENT + 1  # time to check the logic files
+RELOAD_INTERVAL = 500  # milliseconds between checks
 
-CONV_CYCLE_EVENT = pg.USEREVENT
-VERT_CYCLE_EVENT = pg.USEREVENT + 1
-XFER_CYCLE_EVENT = pg.USEREVENT + 2
 
+def post_frame() -> None:
+    """Wakes the render loop, called from the worker thread."""
+    pg.event.post(pg.event.Event(FRAME_EVENT))
 
-def handle_event(event: pg.event.Event) -> None:
+
+def handle_event(
+    event: pg.event.Event, worker: SimulationWorker,
+    watcher: StrategyWatcher | None = None
+) -> None:
     """
     Generic event handling function which is called for each event
     and handles it according to its type.
 
     QUIT type will exit the simulation.
     KEYDOWN type will handle the input key.
+    RELOAD_EVENT type will reload the logic files changed since the
+    last, if they are watched.
 
-    The other event types are triggered by timers. They handle
-    the buffer components' motions while in Autorun mode.
+    The buffer components' motions in Autorun mode are run by the
+    simulation worker, which posts a FRAME_EVENT to wake the render
+    loop whenever the state it shows has changed.
 
     """
 
     if event.type == pg.QUIT:
+        worker.stop()
         pg.quit()
         exit()
 
     elif event.type == pg.KEYDOWN:
-        handle_input(event=event)
+        handle_input(event=event, worker=worker)
+
+    elif event.type == RELOAD_EVENT and watcher is not None:
+        strategies = watcher.poll()
+        for error in watcher.errors:
+            print(f"Logic not reloaded, {error}")
+        if strategies:
+            reload_logic(worker, strategies)
 
-    elif buffer.autorun:
-        if event.type == CONV_CYCLE_EVENT:
-            buffer.cycle_conveyor()
-        if event.type == VERT_CYCLE_EVENT:
-            buffer.cycle_verticals()
-        if event.type == XFER_CYCLE_EVENT:
-            buffer.cycle_xfer_push()
 
+def reload_logic(
+    worker: SimulationWorker, strategies: dict[int, Strategy]
+) -> None:
+    """
+    Swaps in changed strategies between two cycles on the worker thread,
+    recording each to the journal first. The buffer keeps its whole
+    state, and if its own configuration was changed, it follows the new
+    rules from the next cycle on.
 
-def handle_input(event: pg.event.Event) -> None:
+    """
+    buffer = worker.buffer
+    journal = worker.journal
+
+    def reload() -> None:
+        for config, strategy in strategies.items():
+            if journal is not None:
+                journal.record_strategy(config, strategy)
+            register_strategy(config, strategy)
+        buffer.min_pos = get_strategy(buffer.config).min_pos
+
+    worker.submit(reload)
+    for config, strategy in sorted(strategies.items()):
+        print(f"Reloaded config {config}: {strategy.name}")
+
+
+def apply(
+    command: Callable[..., None], journal: JournalWriter | None, *args: int
+) -> None:
+    """Records a buffer method call to the journal, then makes it."""
+    if journal is not None:
+        journal.record(command.__name__, *args)
+    command(*args)
+
+
+def handle_input(event: pg.event.Event, worker: SimulationWorker) -> None:
     """
     Inputs are handled using discrete functions/methods
     collected in dict/set objects by input type. A reference
@@ -47,15 +101,19 @@ def handle_input(event: pg.event.Event) -> None:
     MANUAL_CONTROLS will index buffer components if Autorun is not active.
 
     CONFIG_CHANGE inputs change the buffer configuration and logic to
-    several presaved options corresponding to updates made to the machine:
-        0: Current State
-        1: Original logic
-        2: 12/11/23 update
-        3: 12/18/23 update
+    the one of that number, as loaded from the logic files, see
+    engine.strategy. Each file sets its number and the update to the
+    machine it corresponds to.
+
+    AUTO_CONTROLS inputs are the main controls meant to be used in Autorun,
+    SPEED_CONTROLS change the simulation speed.
 
-    AUTO_CONTROLS inputs are the main controls meant to be used in Autorun.
+    Every change to the buffer is submitted to the worker as a command,
+    recorded to its journal, if it has one, before it is applied.
 
     """
+    buffer = worker.buffer
+    journal = worker.journal
 
     MANUAL_CONTROLS = {
         pg.K_u: buffer.cycle_conveyor,
@@ -67,26 +125,37 @@ def handle_input(event: pg.event.Event) -> None:
     }
 
     if event.key in MANUAL_CONTROLS.keys():
-        """This calls the manual_input method which checks if autorun is active,
-        and if not then it executes the passed command. """
-        buffer.manual_input(MANUAL_CONTROLS[event.key])
+        """Manual controls are only executed if autorun is not active,
+        see the manual_input method."""
+        command = MANUAL_CONTROLS[event.key]
+        worker.submit(
+            lambda: buffer.manual_input(lambda: apply(command, journal))
+        )
 
     CONFIG_CHANGE = {
         pg.K_0,
         pg.K_1,
         pg.K_2,
         pg.K_3,
-        # pg.K_4,
-        # pg.K_5,
-        # pg.K_6,
-        # pg.K_7,
-        # pg.K_8,
-        # pg.K_9
+        pg.K_4,
+        pg.K_5,
+        pg.K_6,
+        pg.K_7,
+        pg.K_8,
+        pg.K_9
     }
 
     if event.key in CONFIG_CHANGE:
-        buffer.set_config(int(event.unicode))
-        reset_timers(buffer.cycle_time)
+        config = event.key - pg.K_0
+        if config not in STRATEGIES:
+            print(f"No strategy defined for configuration {config}")
+            return
+
+        def change_config() -> None:
+            apply(buffer.set_config, journal, config)
+            worker.reset_timers()
+
+        worker.submit(change_config)
 
     AUTO_CONTROLS = {
         pg.K_a: buffer.toggle_autorun,
@@ -94,46 +163,69 @@ def handle_input(event: pg.event.Event) -> None:
         pg.K_d: buffer.toggle_downstream_fault,
         pg.K_f: buffer.toggle_part_inflow,
         pg.K_r: buffer.reset_buffer,
-        pg.K_q: buffer.quit,
-        pg.K_e: speed_up,
-        pg.K_w: speed_down
     }
 
     if event.key in AUTO_CONTROLS.keys():
-        AUTO_CONTROLS[event.key]()
+        command = AUTO_CONTROLS[event.key]
+        if command.__name__ in ACTION_CODES:
+            worker.submit(lambda: apply(command, journal))
+        else:
+            worker.submit(command)
+
+    if event.key == pg.K_q:
+        pg.event.post(pg.event.Event(pg.QUIT))
+
+    SPEED_CONTROLS = {
+        pg.K_e: speed_up,
+        pg.K_w: speed_down,
+        pg.K_m: max_speed,
+    }
 
+    if event.key in SPEED_CONTROLS.keys():
+        change_speed = SPEED_CONTROLS[event.key]
 
-def speed_up() -> None:
+        def record_speed() -> None:
+            change_speed(worker)
+            if journal is not None:
+                journal.record("set_speed", speed_argument(buffer.speed))
+
+        worker.submit(record_speed)
+
+
+def speed_up(worker: SimulationWorker) -> None:
     """
     Increases simulation speed by a factor of 2.
-    Maximum speed is 2048x = 1.4ms cycle time which rounds to 1ms.
+    Up to 2048x = 1.4ms cycle time, which rounds to 1ms, the speed is
+    run in real time, past it in time-warp, see SimulationWorker. Past
+    WARP_LIMIT, it goes to max.
     """
-    if buffer.cycle_time > 1:
+    buffer = worker.buffer
+    if buffer.speed == MAX_SPEED:
+        return
+    if buffer.speed >= WARP_LIMIT:
+        buffer.speed = MAX_SPEED
+    else:
         buffer.speed *= 2
-        reset_timers(buffer.cycle_time)
+    worker.reset_timers()
 
 
-def speed_down() -> None:
+def speed_down(worker: SimulationWorker) -> None:
     """
-    Decreases simulation speed by a factor of 2.
+    Decreases simulation speed by a factor of 2, or from max to
+    WARP_LIMIT.
     Minimum speed is 0.5x = 6 second cycle time.
     """
-    if buffer.cycle_time < 6000:
+    buffer = worker.buffer
+    if buffer.speed == MAX_SPEED:
+        buffer.speed = WARP_LIMIT
+    elif buffer.cycle_time < 6000:
         buffer.speed /= 2
-        reset_timers(buffer.cycle_time)
-
+    else:
+        return
+    worker.reset_timers()
 
-def reset_timers(cycle_time: int) -> None:
-    """
-    Resets the autorun timers, is called whenever the
-    buffer config or cycle time is changed.
-
-    Args:
-        cycle_time (int): New cycle time in milliseconds.
-    """
 
-    pg.time.set_timer(CONV_CYCLE_EVENT, cycle_time)
-    pg.time.delay(int(cycle_time / 3))
-    pg.time.set_timer(VERT_CYCLE_EVENT, cycle_time)
-    pg.time.delay(int(cycle_time / 3))
-    pg.time.set_timer(XFER_CYCLE_EVENT, cycle_time)
+def max_speed(worker: SimulationWorker) -> None:
+    """Runs the simulation as fast as the CPU allows."""
+    worker.buffer.speed = MAX_SPEED
+    worker.reset_timers()
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import pygame
+
+from engine.buffer_system import BASE_CYCLE_TIME
+from engine.trace import TraceReader
+
+from .buffer_system import BufferSystem
+from .config import SCREEN_HEIGHT, SCREEN_WIDTH, WINDOW
+from .playback import Playback
+from .renderer import Renderer
+from .ui import PlaybackInterface
+
+# outputs with these suffixes are encoded by ffmpeg, others are taken
+# as a directory for an image sequence
+VIDEO_SUFFIXES = (".avi", ".mkv", ".mov", ".mp4", ".webm")
+IMAGE_FORMATS = ("png", "bmp", "tga", "jpg")
+
+
+@dataclass(frozen=True)
+class Clip:
+    """
+    The part of a trace to export and how it is paced: frame i shows the
+    cycle reached after i / fps seconds of playback at the given speed.
+
+    Args:
+        trace (str): Path of the trace.
+        start (int): Cycle shown by the first frame.
+        frames (int): Number of frames.
+        speed (float): Multiple of real time, negative in reverse.
+        fps (float): Frames per second of the output.
+    """
+
+    trace: str
+    start: int
+    frames: int
+    speed: float = 1.0
+    fps: float = 30.0
+
+    @property
+    def cycles_per_frame(self) -> float:
+        return self.speed * 1000 / BASE_CYCLE_TIME / self.fps
+
+    @property
+    def duration(self) -> float:
+        """Length of the output, in seconds."""
+        return self.frames / self.fps
+
+    def position(self, frame: int) -> float:
+        return self.start + frame * self.cycles_per_frame
+
+    @classmethod
+    def fit(
+        cls, trace: str, start: int = 0, duration: float | None = None,
+        speed: float = 1.0, fps: float = 30.0
+    ) -> Clip:
+        """
+        The clip from start lasting duration seconds, cut short where
+        playback would run off either end of the trace.
+
+        """
+        with TraceReader(trace) as reader:
+            last = len(reader) - 1
+        if not 0 <= start <= last:
+            raise ValueError(f"Start cycle {start} is not in the trace, "
+                             f"which has cycles 0 to {last}")
+        per_frame = cls(trace, start, 0, speed, fps).cycles_per_frame
+        room = last - start if speed > 0 else start
+        frames = math.floor(room / abs(per_frame)) + 1
+        if duration is not None:
+            frames = min(frames, math.ceil(duration * fps))
+        return cls(trace, start, frames, speed, fps)
+
+
+def split(frames: int, parts: int) -> list[range]:
+    """Splits the frames into up to `parts` contiguous ranges of about
+    the same length, in order."""
+    parts = max(1, min(parts, frames))
+    bounds = [frames * i // parts for i in range(parts + 1)]
+    return [range(a, b) for a, b in zip(bounds, bounds[1:])]
+
+
+def render_frames(clip: Clip, frames: range, output: str,
+                  image_format: str = "png") -> int:
+    """
+    Renders a range of frames of the clip off screen, to one ffmpeg
+    video segment if output has a video suffix, else to numbered images
+    in the output directory. Runs in a worker process of export.
+
+    The trace viewer draws every frame through its renderer, so a frame
+    showing the same cycle as the one before draws nothing, and its
+    image is reused instead of being captured and encoded again.
+
+    Returns:
+        int: Number of frames rendered.
+    """
+    video = output.endswith(VIDEO_SUFFIXES)
+    ffmpeg = None
+    if video:
+        ffmpeg = subprocess.Popen([
+            "ffmpeg", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "rgb24",
+            "-s", f"{SCREEN_WIDTH}x{SCREEN_HEIGHT}", "-r", str(clip.fps),
+            "-i", "-", "-pix_fmt", "yuv420p", output,
+        ], stdin=subprocess.PIPE)
+
+    with TraceReader(clip.trace) as trace:
+        buffer = BufferSystem(capacity=trace.capacity)
+        buffer.config = trace.config
+        playback = Playback(trace, speed=clip.speed)
+        ui = PlaybackInterface(playback)
+        renderer = Renderer(WINDOW, buffer, ui)
+
+        raw = previous = None
+        try:
+            for frame in frames:
+                playback.seek(clip.position(frame))
+                buffer.show_record(playback.state())
+                changed = bool(renderer.render())
+                if video:
+                    if changed:
+                        raw = pygame.image.tobytes(WINDOW, "RGB")
+                    ffmpeg.stdin.write(raw)
+                    continue
+                file = os.path.join(
+                    output, f"frame_{frame:06d}.{image_format}"
+                )
+                if changed:
+                    pygame.image.save(WINDOW, file)
+                else:
+                    _link(previous, file)
+                previous = file
+        finally:
+            if ffmpeg is not None:
+                ffmpeg.stdin.close()
+                if ffmpeg.wait():
+                    raise RuntimeError(
+                        f"ffmpeg failed with exit code {ffmpeg.returncode} "
+                        f"encoding {output}"
+                    )
+    return len(frames)
+
+
+def _link(source: str, destination: str) -> None:
+    """Hard links an unchanged frame to the one before, or copies it
+    where links are not supported."""
+    if os.path.exists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def export(clip: Clip, output: str, workers: int | None = None,
+           image_format: str = "png") -> None:
+    """
+    Exports the clip at the configured screen resolution, see
+    app.config, using a pool of processes that each render a disjoint
+    range of frames, one per process. The processes are spawned rather
+    than forked, as forked ones would share the read offsets of the
+    font files opened here and garble each other's glyphs.
+
+    A video is encoded by one ffmpeg per range into a segment, then the
+    segments are joined without encoding again. An image sequence is
+    written to the output directory as frame_000000.png and on.
+
+    Args:
+        clip (Clip): What to export.
+        output (str): Video file, or directory for an image sequence.
+        workers (int | None): Processes, by default one per core.
+        image_format (str): File type of an image sequence.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = split(clip.frames, workers)
+
+    if not output.endswith(VIDEO_SUFFIXES):
+        os.makedirs(output, exist_ok=True)
+        _render(clip, ranges, [output] * len(ranges), workers, image_format)
+        return
+
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg was not found, export to a directory "
+                           "for an image sequence instead")
+    suffix = os.path.splitext(output)[1]
+    directory = os.path.dirname(os.path.abspath(output))
+    with tempfile.TemporaryDirectory(dir=directory) as temp:
+        segments = [
+            os.path.join(temp, f"segment_{i:03d}{suffix}")
+            for i in range(len(ranges))
+        ]
+        _render(clip, ranges, segments, workers, image_format)
+        if len(segments) == 1:
+            os.replace(segments[0], output)
+            return
+        playlist = os.path.join(temp, "segments.txt")
+        with open(playlist, "w") as file:
+            file.writelines(f"file '{segment}'\n" for segment in segments)
+        subprocess.run([
+            "ffmpeg", "-loglevel", "error", "-y", "-f", "concat",
+            "-safe", "0", "-i", playlist, "-c", "copy", output,
+        ], check=True)
+
+
+def _render(clip: Clip, ranges: list[range], outputs: list[str],
+            workers: int, image_format: str) -> None:
+    if len(ranges) == 1:
+        render_frames(clip, ranges[0], outputs[0], image_format)
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [
+            executor.submit(render_frames, clip, frames, output,
+                            image_format)
+            for frames, output in zip(ranges, outputs)
+        ]
+        for future in futures:
+            future.result()
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import pygame
+
+from engine.instrumentation import instrument, instrument_engine
+
+from . import cache
+from .buffer_system import BufferSystem
+from .components import HorizConveyor, VertConveyor, XferCarriage
+from .renderer import Renderer
+from .ui.controls_display import ControlsDisplay
+from .ui.playback_display import PlaybackDisplay
+from .ui.speed_display import SpeedDisplay
+from .ui.stats_display import StatsDisplay
+
+
+def instrument_app() -> None:
+    """Instruments the logic along with every component draw, text
+    rendering and display updates, to tell apart where frames go."""
+    instrument_engine()
+    for component in (
+        BufferSystem, HorizConveyor, VertConveyor, XferCarriage,
+        ControlsDisplay, SpeedDisplay, StatsDisplay, PlaybackDisplay
+    ):
+        instrument(component, "draw")
+    instrument(Renderer, "draw_scene")
+    instrument(cache, "render_text", "Font.render")
+    instrument(pygame.display, "update", "display.update")
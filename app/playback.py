@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pygame as pg
+
+from engine.buffer_system import BASE_CYCLE_TIME
+from engine.trace import CRASHED, UPSTREAM_INHIBIT, TraceReader, TraceState
+
+if TYPE_CHECKING:
+    from .ui.playback_display import PlaybackDisplay
+
+MIN_SPEED = 1 / 64  # slowest playback, as a multiple of real time
+
+
+class Playback:
+    """
+    Where in a trace the viewer is and how fast it moves through it.
+
+    The position is a fractional cycle, moved by the speed times the
+    real time elapsed, so playback runs at any multiple of the machine's
+    own pace, forwards or in reverse, and only the cycle on display is
+    ever decoded from the trace.
+
+    Args:
+        trace (TraceReader): Trace to play back.
+        speed (float): Multiple of real time, negative in reverse.
+    """
+
+    def __init__(self, trace: TraceReader, speed: float = 16.0) -> None:
+        self.trace = trace
+        self.position = 0.0
+        self.speed = speed
+        self.playing = True
+
+    @property
+    def cycle(self) -> int:
+        return int(self.position)
+
+    @property
+    def last(self) -> int:
+        return len(self.trace) - 1
+
+    @property
+    def rate(self) -> float:
+        """Cycles per second."""
+        return self.speed * 1000 / BASE_CYCLE_TIME
+
+    def state(self) -> TraceState:
+        return self.trace.state(self.cycle)
+
+    def advance(self, elapsed: int) -> None:
+        """
+        Moves on by the time elapsed while playing, pausing at either
+        end of the trace.
+
+        Args:
+            elapsed (int): Real time in milliseconds.
+        """
+        if not self.playing:
+            return
+        position = self.position + self.rate * elapsed / 1000
+        if not 0 <= position <= self.last:
+            self.playing = False
+        self.seek(position)
+
+    def seek(self, position: float) -> None:
+        self.position = min(max(position, 0.0), float(self.last))
+
+    def step(self, cycles: int) -> None:
+        """Pauses and moves by whole cycles."""
+        self.playing = False
+        self.seek(self.cycle + cycles)
+
+    def toggle(self) -> None:
+        """Plays or pauses, starting over if at the end."""
+        at_end = self.cycle == (self.last if self.speed > 0 else 0)
+        if not self.playing and at_end:
+            self.seek(0 if self.speed > 0 else self.last)
+        self.playing = not self.playing
+
+    def faster(self) -> None:
+        self.speed *= 2
+
+    def slower(self) -> None:
+        if abs(self.speed) > MIN_SPEED:
+            self.speed /= 2
+
+    def reverse(self) -> None:
+        self.speed = -self.speed
+
+    def jump(self, flags: int, reverse: bool = False) -> bool:
+        """
+        Pauses at the start of the next run of cycles with any of the
+        flags set, or of the previous run if reverse.
+
+        Returns:
+            bool: Whether there was one, else the position is kept.
+        """
+        trace = self.trace
+        cycle = self.cycle
+        if reverse:
+            found = trace.find(flags, cycle - 1, reverse=True)
+            if cycle == 0 or found is None:
+                return False
+            before = trace.find(flags, found, reverse=True, clear=True)
+            onset = 0 if before is None else before + 1
+        else:
+            start = cycle + 1
+            if start > self.last:
+                return False
+            if trace.state(cycle).flags & flags:
+                # skip the run the current cycle is in
+                start = trace.find(flags, start, clear=True)
+                if start is None:
+                    return False
+            onset = trace.find(flags, start)
+            if onset is None:
+                return False
+        self.playing = False
+        self.seek(onset)
+        return True
+
+
+def handle_playback_event(
+    event: pg.event.Event, playback: Playback, display: PlaybackDisplay
+) -> None:
+    """
+    Handles an event of the trace viewer: quitting, the playback
+    controls listed by the display, and clicks or drags on its scrub
+    bar, which seek to the cycle under the pointer.
+
+    """
+
+    if event.type == pg.QUIT:
+        pg.quit()
+        exit()
+
+    elif event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
+        if display.bar.collidepoint(event.pos):
+            playback.seek(display.cycle_at(event.pos[0]))
+
+    elif event.type == pg.MOUSEMOTION and event.buttons[0]:
+        if display.bar.collidepoint(event.pos):
+            playback.seek(display.cycle_at(event.pos[0]))
+
+    elif event.type == pg.KEYDOWN:
+        backwards = bool(event.mod & pg.KMOD_SHIFT)
+
+        PLAYBACK_CONTROLS = {
+            pg.K_SPACE: playback.toggle,
+            pg.K_LEFT: lambda: playback.step(-1),
+            pg.K_RIGHT: lambda: playback.step(1),
+            pg.K_UP: playback.faster,
+            pg.K_DOWN: playback.slower,
+            pg.K_r: playback.reverse,
+            pg.K_HOME: lambda: playback.seek(0),
+            pg.K_END: lambda: playback.seek(playback.last),
+            pg.K_c: lambda: playback.jump(CRASHED, backwards),
+            pg.K_i: lambda: playback.jump(UPSTREAM_INHIBIT, backwards),
+            pg.K_q: lambda: pg.event.post(pg.event.Event(pg.QUIT)),
+        }
+
+        if event.key in PLAYBACK_CONTROLS.keys():
+            PLAYBACK_CONTROLS[event.key]()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import pygame
+from pygame import Rect
+from pygame.surface import Surface
+
+from .buffer_system import BufferSystem
+from .colors import BG_COLOR
+from .ui.user_interface import UserInterface
+
+# events after which the window contents must be redrawn in full
+REDRAW_EVENTS = {pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED}
+
+
+class Renderer:
+    """
+    Keeps the window up to date by redrawing only what changed.
+
+    The components track what they last drew and report the areas that
+    no longer match their state. Each of these is redrawn by drawing the
+    whole scene clipped to it, so the layering is the same as a full
+    redraw, but the components skip any slot or block outside the clip.
+    Only the redrawn areas are passed on to the display.
+
+    """
+
+    def __init__(
+        self, window: Surface, buffer: BufferSystem, ui: UserInterface
+    ) -> None:
+        self.window = window
+        self.buffer = buffer
+        self.ui = ui
+        self.full_redraw = True
+
+    def invalidate(self) -> None:
+        """Redraws the whole window on the next render."""
+        self.full_redraw = True
+
+    def draw_scene(self) -> None:
+        self.window.fill(BG_COLOR)
+        self.buffer.draw(self.window)
+        self.ui.draw(self.window)
+
+    def render(self) -> list[Rect]:
+        """
+        Redraws the changed areas and updates them on the display.
+
+        Returns:
+            list[Rect]: Areas updated, empty if nothing changed.
+        """
+        if self.full_redraw:
+            self.full_redraw = False
+            self.window.set_clip(None)
+            self.draw_scene()
+            pygame.display.update()
+            return [self.window.get_rect()]
+
+        rects = self.buffer.dirty_rects() + self.ui.dirty_rects()
+        if not rects:
+            return rects
+        for rect in rects:
+            self.window.set_clip(rect)
+            self.draw_scene()
+        self.window.set_clip(None)
+        pygame.display.update(rects)
+        return rects
@@ -1,6 +1,6 @@
 from .speed_display import SpeedDisplay  # noqa
 from .controls_display import ControlsDisplay  # noqa
+from .stats_display import StatsDisplay  # noqa
+from .playback_display import PlaybackDisplay  # noqa
 
-from .user_interface import UserInterface
-
-ui = UserInterface()
\ No newline at end of file
+from .user_interface import PlaybackInterface, UserInterface  # noqa
\ No newline at end of file
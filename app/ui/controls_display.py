@@ -1,13 +1,15 @@
+from __future__ import annotations
+
 import pygame
 from pygame import Rect, draw
 from pygame.font import Font
 from pygame.surface import Surface
 
-from app import buffer
+from app.cache import text_surface
 from app.colors import BLACK, LIGHT_GREY
-from app.config import SCREEN_HEIGHT, SCREEN_WIDTH
+from app.config import FONT_SCALE, SCREEN_HEIGHT, SCREEN_WIDTH
 
-FONT_SIZE = 30
+FONT_SIZE = round(30 * FONT_SCALE)
 CONTROLS_DISPLAY_FONT: Font = pygame.font.SysFont(
     "Courier", FONT_SIZE, bold=True)
 
@@ -23,31 +25,52 @@ class ControlsDisplay:
         self.width = SCREEN_WIDTH * 0.33
         self.height = SCREEN_HEIGHT * 0.8
 
-    def draw(self, window: Surface) -> None:
-
         self.x_pos = (SCREEN_WIDTH * 0.025)
         self.y_pos = (SCREEN_HEIGHT * 0.025)
 
         self.rect = Rect(self.x_pos, self.y_pos, self.width, self.height)
+        self.layer: Surface | None = None  # pre-rendered block
+        self.drawn = False
+
+    def dirty_rect(self) -> Rect | None:
+        """The whole block until it is first drawn, it never changes."""
+        return None if self.drawn else self.rect.inflate(2, 2)
+
+    def draw(self, window: Surface) -> None:
+
+        if not window.get_clip().colliderect(self.rect.inflate(2, 2)):
+            return
+
+        if self.layer is None:
+            self.layer = self.render_layer()
+        window.blit(self.layer, self.rect)
+        self.drawn = True
+
+    def render_layer(self) -> Surface:
+        """Renders the whole block off-screen, including the border
+        drawn along its right and bottom edges."""
+        layer = Surface((self.rect.width + 1, self.rect.height + 1))
+        rect = Rect(0, 0, self.rect.width, self.rect.height)
 
-        draw.rect(window, self.bg_color, self.rect)
+        draw.rect(layer, self.bg_color, rect)
 
         corners = [
-            self.rect.topleft, self.rect.topright,
-            self.rect.bottomright, self.rect.bottomleft
+            rect.topleft, rect.topright,
+            rect.bottomright, rect.bottomleft
         ]
-        draw.lines(window, self.outline_color, True, corners)
+        draw.lines(layer, self.outline_color, True, corners)
 
         lines = [
             'CONTROLS:',
             'A      Auto / Manual Mode',
             'E      Speed Up',
             'W      Speed Down',
+            'M      Max Speed',
             'D      Halt Downstream Cell',
             'F      Halt Upstream Cell',
             'R      Reset Simulation',
             'Q      Quit',
-            '', '',
+            '',
 
             'MANUAL MODE:',
             'U      Horizontal Conveyor',
@@ -60,15 +83,16 @@ class ControlsDisplay:
 
         text = []
         for line in lines:
-            text.append(CONTROLS_DISPLAY_FONT.render(
-                line, True, self.text_color))
+            text.append(text_surface(
+                line, CONTROLS_DISPLAY_FONT, self.text_color))
 
         x_padding = self.width * 0.05
         y_padding = self.height * 0.025
 
-        location = (self.rect.left + x_padding,
-                    self.rect.top + y_padding)
+        location = (rect.left + x_padding,
+                    rect.top + y_padding)
 
         for i, line in enumerate(text):
             position = (location[0], location[1] + i * (FONT_SIZE * 1.5))
-            window.blit(text[i], position)
+            layer.blit(text[i], position)
+        return layer
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import pygame
+from pygame import Rect, draw
+from pygame.font import Font
+from pygame.surface import Surface
+
+from app.cache import text_surface
+from app.colors import BLACK, LIGHT_GREY, RED, WHITE, YELLOW
+from app.config import FONT_SCALE, SCREEN_HEIGHT, SCREEN_WIDTH
+from app.playback import Playback
+from engine.trace import CRASHED, UPSTREAM_INHIBIT
+
+FONT_SIZE = round(24 * FONT_SCALE)
+PLAYBACK_DISPLAY_FONT: Font = pygame.font.SysFont(
+    "Courier New", FONT_SIZE, bold=True)
+
+CONTROLS = [
+    'SPACE  Play / Pause',
+    '<- ->  Step',
+    'UP/DN  Faster / Slower',
+    'R      Reverse',
+    'HOME   Start  END  End',
+    'C      Next Crash',
+    'I      Next Inhibit',
+    '       (SHIFT: Previous)',
+    'Q      Quit',
+]
+
+
+class PlaybackDisplay:
+    """Display block of the trace viewer: where playback is and how fast
+    it goes, the flags of the cycle shown, the controls, and a scrub bar
+    marking where upstream was inhibited and where the run crashed."""
+
+    def __init__(self, playback: Playback) -> None:
+        self.playback = playback
+        self.bg_color = LIGHT_GREY
+        self.outline_color = BLACK
+        self.text_color = BLACK
+        self.bar_color = WHITE
+
+        self.width = SCREEN_WIDTH * 0.3
+        self.height = SCREEN_HEIGHT * 0.8
+
+        self.x_pos = (SCREEN_WIDTH * 0.95) - self.width
+        self.y_pos = (SCREEN_HEIGHT * 0.025)
+
+        self.rect = Rect(self.x_pos, self.y_pos, self.width, self.height)
+        x_padding = self.width * 0.05
+        # scrub bar, in window coordinates for hit tests
+        self.bar = Rect(
+            self.rect.left + x_padding, self.rect.bottom - self.height * 0.1,
+            self.width - 2 * x_padding, self.height * 0.06
+        )
+        self.background: Surface | None = None  # controls and markers
+        self.layer: Surface | None = None  # pre-rendered block
+        self.drawn_state: tuple | None = None  # as last drawn
+
+    @property
+    def state(self) -> tuple:
+        playback = self.playback
+        return playback.cycle, playback.speed, playback.playing
+
+    @property
+    def text(self) -> list[str]:
+        playback = self.playback
+        record = playback.state()
+        direction = 'forward' if playback.speed > 0 else 'reverse'
+        if not playback.playing:
+            direction += ', paused'
+        lines = [
+            'PLAYBACK:',
+            f'Cycle:      {playback.cycle:,} / {playback.last:,}',
+            f'Speed:      {abs(playback.speed):g}x {direction}',
+            f'Carriage:   {record.position}',
+            'Upstream:   ' + (
+                'INHIBITED' if record.upstream_inhibit
+                else 'running' if record.part_inflow else 'halted'
+            ),
+            'Downstream: ' + (
+                'STOPPED' if record.downstream_stoppage else 'running'
+            ),
+        ]
+        if record.crashed:
+            lines.append('CRASHED')
+        return lines
+
+    def cycle_at(self, x: int) -> float:
+        """The cycle under a point of the scrub bar."""
+        fraction = (x - self.bar.left) / max(1, self.bar.width - 1)
+        return min(max(fraction, 0.0), 1.0) * self.playback.last
+
+    def dirty_rect(self) -> Rect | None:
+        """The whole block whenever playback moved, else None."""
+        if self.state == self.drawn_state:
+            return None
+        return self.rect.inflate(2, 2)
+
+    def draw(self, window: Surface) -> None:
+
+        if not window.get_clip().colliderect(self.rect.inflate(2, 2)):
+            return
+
+        state = self.state
+        if self.layer is None or state != self.drawn_state:
+            self.layer = self.render_layer()
+        window.blit(self.layer, self.rect)
+        self.drawn_state = state
+
+    def render_layer(self) -> Surface:
+        """Renders the block off-screen for the cycle shown, over the
+        background rendered once."""
+        if self.background is None:
+            self.background = self.render_background()
+        layer = self.background.copy()
+
+        x_padding = self.width * 0.05
+        y_padding = self.height * 0.03
+        for i, line in enumerate(self.text):
+            surface = text_surface(
+                line, PLAYBACK_DISPLAY_FONT, self.text_color
+            )
+            layer.blit(surface, (x_padding,
+                                 y_padding + i * FONT_SIZE * 1.5))
+
+        bar = self.bar.move(-self.rect.left, -self.rect.top)
+        playback = self.playback
+        x = bar.left + round(
+            playback.cycle / max(1, playback.last) * (bar.width - 1)
+        )
+        draw.line(layer, self.outline_color, (x, bar.top - 4),
+                  (x, bar.bottom + 3), 3)
+        return layer
+
+    def render_background(self) -> Surface:
+        """The border, the controls and the scrub bar with its markers,
+        which never change."""
+        layer = Surface((self.rect.width + 1, self.rect.height + 1))
+        rect = Rect(0, 0, self.rect.width, self.rect.height)
+
+        draw.rect(layer, self.bg_color, rect)
+
+        corners = [
+            rect.topleft, rect.topright,
+            rect.bottomright, rect.bottomleft
+        ]
+        draw.lines(layer, self.outline_color, True, corners)
+
+        x_padding = self.width * 0.05
+        top = self.height * 0.03 + 8 * FONT_SIZE * 1.5
+        for i, line in enumerate(CONTROLS):
+            surface = text_surface(
+                line, PLAYBACK_DISPLAY_FONT, self.text_color
+            )
+            layer.blit(surface, (x_padding, top + i * FONT_SIZE * 1.5))
+
+        bar = self.bar.move(-self.rect.left, -self.rect.top)
+        draw.rect(layer, self.bar_color, bar)
+        self.draw_markers(layer, bar)
+        draw.rect(layer, self.outline_color, bar, 1)
+        return layer
+
+    def draw_markers(self, layer: Surface, bar: Rect) -> None:
+        """Marks the index blocks with upstream inhibited, then those
+        with a crash over them. The index makes this independent of the
+        length of the trace."""
+        trace = self.playback.trace
+        scale = (bar.width - 1) / max(1, len(trace))
+        for flag, color in ((UPSTREAM_INHIBIT, YELLOW), (CRASHED, RED)):
+            for block in (trace.block_flags & flag).nonzero()[0]:
+                start = bar.left + int(block * trace.interval * scale)
+                end = bar.left + int((block + 1) * trace.interval * scale)
+                marker = Rect(start, bar.top + 1, max(1, end - start),
+                              bar.height - 2)
+                draw.rect(layer, color, marker.clip(bar))
@@ -1,58 +1,114 @@
+from __future__ import annotations
+
 import pygame
 from pygame import Rect, draw
 from pygame.font import Font
 from pygame.surface import Surface
 
-from app import buffer
+from app.buffer_system import BufferSystem
+from app.cache import render_text, text_surface
 from app.colors import BLACK, LIGHT_GREY
-from app.config import SCREEN_HEIGHT, SCREEN_WIDTH
+from app.config import FONT_SCALE, SCREEN_HEIGHT, SCREEN_WIDTH
+from engine.worker import MAX_SPEED
 
-SPEED_DISPLAY_FONT: Font = pygame.font.SysFont("Courier New", 30, bold=True)
+SPEED_DISPLAY_FONT: Font = pygame.font.SysFont(
+    "Courier New", round(30 * FONT_SCALE), bold=True)
+RATE_REFRESH = 500  # milliseconds a shown cycles per second is held for
 
 
 class SpeedDisplay:
-    """Display block showing the current simulation speed."""
+    """Display block showing the current simulation speed, and the
+    cycles per second the worker achieves against its target."""
 
-    def __init__(self) -> None:
+    def __init__(self, buffer: BufferSystem) -> None:
+        self.buffer = buffer
         self.bg_color = LIGHT_GREY
         self.outline_color = BLACK
         self.text_color = BLACK
 
         self.width = SCREEN_WIDTH * 0.3
-        self.height = SCREEN_HEIGHT * 0.10
-
-    def draw(self, window: Surface) -> None:
+        self.height = SCREEN_HEIGHT * 0.12
 
         self.x_pos = (SCREEN_WIDTH * 0.95) - self.width
         self.y_pos = (SCREEN_HEIGHT * 0.025)
 
         self.rect = Rect(self.x_pos, self.y_pos, self.width, self.height)
+        self.layer: Surface | None = None  # pre-rendered block
+        self.drawn_text: tuple[str, ...] | None = None  # text as last drawn
+        self.rate = 0.0  # cycles per second shown
+        self.rate_shown_at = 0  # pygame ticks when self.rate was taken
+
+    def shown_rate(self) -> float:
+        """The achieved rate, taken at most every RATE_REFRESH so the
+        block is not redrawn on every frame, except when autorun starts
+        or stops."""
+        rate = self.buffer.rate
+        now = pygame.time.get_ticks()
+        if not rate or not self.rate \
+                or now - self.rate_shown_at >= RATE_REFRESH:
+            self.rate, self.rate_shown_at = rate, now
+        return self.rate
+
+    @property
+    def text(self) -> tuple[str, ...]:
+        buffer = self.buffer
+        rate = self.shown_rate()
+        if buffer.speed == MAX_SPEED:
+            return (
+                'Speed Multiplier: max',
+                'Warp: max',
+                f'Cycles/s: {rate:.1f} / max'
+            )
+        if buffer.cycles_per_frame:
+            timing = f'Warp: {buffer.cycles_per_frame} cycles/frame'
+        else:
+            timing = f'Cycle Time: {buffer.cycle_time}ms'
+        return (
+            f'Speed Multiplier: {buffer.speed}x',
+            timing,
+            f'Cycles/s: {rate:.1f} / {buffer.target_rate:.1f}'
+        )
 
-        draw.rect(window, self.bg_color, self.rect)
+    def dirty_rect(self) -> Rect | None:
+        """The whole block if the displayed speed changed, else None."""
+        if self.text == self.drawn_text:
+            return None
+        return self.rect.inflate(2, 2)
 
-        corners = [
-            self.rect.topleft, self.rect.topright,
-            self.rect.bottomright, self.rect.bottomleft
-        ]
-        draw.lines(window, self.outline_color, True, corners)
+    def draw(self, window: Surface) -> None:
 
-        speed_text = f'Speed Multiplier: {buffer.speed}x'
-        cycle_time_text = f'Cycle Time: {buffer.cycle_time}ms'
+        if not window.get_clip().colliderect(self.rect.inflate(2, 2)):
+            return
 
-        text_surface = SPEED_DISPLAY_FONT.render(
-            speed_text, True, self.text_color
-        )
-        cycle_time_surface = SPEED_DISPLAY_FONT.render(
-            cycle_time_text, True, self.text_color
-        )
+        text = self.text
+        if self.layer is None or text != self.drawn_text:
+            self.layer = self.render_layer(*text)
+        window.blit(self.layer, self.rect)
+        self.drawn_text = text
 
-        x_padding = self.width * 0.1
-        y_padding = self.height * 0.1
+    def render_layer(self, *lines: str) -> Surface:
+        """Renders the block off-screen for the given lines of text,
+        including the border drawn along its right and bottom edges.
+        The last line, the measured rate, is rendered uncached as its
+        values rarely repeat."""
+        layer = Surface((self.rect.width + 1, self.rect.height + 1))
+        rect = Rect(0, 0, self.rect.width, self.rect.height)
 
-        speed_location = (self.rect.left + x_padding,
-                          self.rect.top + y_padding)
-        cycle_time_location = (self.rect.left + x_padding,
-                               self.rect.centery + y_padding)
+        draw.rect(layer, self.bg_color, rect)
 
-        window.blit(text_surface, speed_location)
-        window.blit(cycle_time_surface, cycle_time_location)
+        corners = [
+            rect.topleft, rect.topright,
+            rect.bottomright, rect.bottomleft
+        ]
+        draw.lines(layer, self.outline_color, True, corners)
+
+        x_padding = self.width * 0.1
+        y_padding = self.height * 0.08
+        line_height = (self.height - y_padding) / len(lines)
+
+        for i, line in enumerate(lines):
+            render = text_surface if i < len(lines) - 1 else render_text
+            surface = render(line, SPEED_DISPLAY_FONT, self.text_color)
+            layer.blit(surface, (rect.left + x_padding,
+                                 rect.top + y_padding + i * line_height))
+        return layer
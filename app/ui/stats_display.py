@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import pygame
+from pygame import Rect, draw
+from pygame.font import Font
+from pygame.surface import Surface
+
+from app.buffer_system import BufferSystem
+from app.cache import text_surface
+from app.colors import BG_COLOR, BLACK, LIGHT_GREY, WHITE
+from app.config import FONT_SCALE, SCREEN_HEIGHT, SCREEN_WIDTH
+
+FONT_SIZE = round(24 * FONT_SCALE)
+STATS_DISPLAY_FONT: Font = pygame.font.SysFont(
+    "Courier New", FONT_SIZE, bold=True)
+PITCH_LENGTH = 0.01  # carriage travel per pitch, in metres
+
+
+class StatsDisplay:
+    """Display block showing the production KPIs of the buffer system
+    over the last hour of line time, with a chart of the buffer fill."""
+
+    def __init__(self, buffer: BufferSystem) -> None:
+        self.buffer = buffer
+        self.bg_color = LIGHT_GREY
+        self.outline_color = BLACK
+        self.text_color = BLACK
+        self.chart_color = WHITE
+        self.fill_color = BG_COLOR
+
+        self.width = SCREEN_WIDTH * 0.3
+        self.height = SCREEN_HEIGHT * 0.5
+
+        self.x_pos = (SCREEN_WIDTH * 0.95) - self.width
+        self.y_pos = (SCREEN_HEIGHT * 0.17)
+
+        self.rect = Rect(self.x_pos, self.y_pos, self.width, self.height)
+        self.layer: Surface | None = None  # pre-rendered block
+        self.drawn_state: tuple[int, ...] | None = None  # as last drawn
+
+    @property
+    def state(self) -> tuple[int, ...]:
+        """Identifies the stats shown, they only change once a cycle."""
+        stats = self.buffer.stats
+        return (id(stats), stats.cycles, self.buffer.capacity)
+
+    @property
+    def text(self) -> list[str]:
+        stats = self.buffer.stats
+        return [
+            'PRODUCTION (LAST HOUR):',
+            f'Parts In:    {stats.parts_in_per_hour:6.0f}/h',
+            f'Parts Out:   {stats.parts_out_per_hour:6.0f}/h',
+            f'Blocked:     {stats.blocked_fraction:6.1%}',
+            f'Starved:     {stats.starved_fraction:6.1%}',
+            f'Fill:        {stats.fill.latest:6d} (avg {stats.mean_fill:.1f})',
+            f'Travel:      {stats.travel * PITCH_LENGTH:6.2f}m',
+        ]
+
+    def dirty_rect(self) -> Rect | None:
+        """The whole block after every cycle, else None."""
+        if self.state == self.drawn_state:
+            return None
+        return self.rect.inflate(2, 2)
+
+    def draw(self, window: Surface) -> None:
+
+        if not window.get_clip().colliderect(self.rect.inflate(2, 2)):
+            return
+
+        state = self.state
+        if self.layer is None or state != self.drawn_state:
+            self.layer = self.render_layer()
+        window.blit(self.layer, self.rect)
+        self.drawn_state = state
+
+    def render_layer(self) -> Surface:
+        """Renders the block off-screen for the current stats, including
+        the border drawn along its right and bottom edges."""
+        layer = Surface((self.rect.width + 1, self.rect.height + 1))
+        rect = Rect(0, 0, self.rect.width, self.rect.height)
+
+        draw.rect(layer, self.bg_color, rect)
+
+        corners = [
+            rect.topleft, rect.topright,
+            rect.bottomright, rect.bottomleft
+        ]
+        draw.lines(layer, self.outline_color, True, corners)
+
+        x_padding = self.width * 0.05
+        y_padding = self.height * 0.04
+
+        for i, line in enumerate(self.text):
+            surface = text_surface(line, STATS_DISPLAY_FONT, self.text_color)
+            layer.blit(surface, (rect.left + x_padding,
+                                 rect.top + y_padding + i * FONT_SIZE * 1.5))
+
+        chart = Rect(
+            rect.left + x_padding, rect.centery + y_padding,
+            rect.width - 2 * x_padding, rect.height / 2 - 2 * y_padding
+        )
+        draw.rect(layer, self.chart_color, chart)
+        self.draw_fill(layer, chart)
+        draw.rect(layer, self.outline_color, chart, 1)
+        return layer
+
+    def draw_fill(self, layer: Surface, chart: Rect) -> None:
+        """Plots the buffer fill over the window, full scale being the
+        capacity, the latest cycle on the right."""
+        history = self.buffer.stats.fill
+        # at most one point per pixel column
+        step = -(-history.size // chart.width)
+        values = list(history)[::step]
+        if len(values) < 2:
+            return
+        x_scale = (chart.width - 1) / max(1, history.size // step - 1)
+        x_offset = chart.right - 1 - (len(values) - 1) * x_scale
+        y_scale = (chart.height - 1) / self.buffer.capacity
+        points = [
+            (x_offset + i * x_scale, chart.bottom - 1 - value * y_scale)
+            for i, value in enumerate(values)
+        ]
+        draw.lines(layer, self.fill_color, False, points, 2)
@@ -1,14 +1,40 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pygame import Rect
 from pygame.surface import Surface
 
-from . import ControlsDisplay, SpeedDisplay
+from app.buffer_system import BufferSystem
+
+from . import ControlsDisplay, PlaybackDisplay, SpeedDisplay, StatsDisplay
+
+if TYPE_CHECKING:
+    from app.playback import Playback
 
 
 class UserInterface:
 
-    def __init__(self) -> None:
-        self.speed_block = SpeedDisplay()
+    def __init__(self, buffer: BufferSystem) -> None:
+        self.speed_block = SpeedDisplay(buffer)
         self.controls_block = ControlsDisplay()
+        self.stats_block = StatsDisplay(buffer)
+        self.blocks = [self.speed_block, self.controls_block,
+                       self.stats_block]
+
+    def dirty_rects(self) -> list[Rect]:
+        """Areas of the display blocks that changed since last drawn."""
+        rects = [block.dirty_rect() for block in self.blocks]
+        return [rect for rect in rects if rect is not None]
 
     def draw(self, window: Surface) -> None:
-        self.speed_block.draw(window=window)
-        self.controls_block.draw(window=window)
\ No newline at end of file
+        for block in self.blocks:
+            block.draw(window=window)
+
+
+class PlaybackInterface(UserInterface):
+    """Display blocks of the trace viewer, see run_playback.py."""
+
+    def __init__(self, playback: Playback) -> None:
+        self.playback_block = PlaybackDisplay(playback)
+        self.blocks = [self.playback_block]
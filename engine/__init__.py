@@ -0,0 +1,2 @@
+from .buffer_system import BufferSystem  # noqa
+from .exceptions import CrashError  # noqa
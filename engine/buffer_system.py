@@ -0,0 +1,460 @@
+from __future__ import annotations
+
+import copy
+from random import Random, randrange
+from types import MethodType
+from typing import TYPE_CHECKING, Callable
+
+from .components import HorizConveyor, VertConveyor, XferCarriage
+from .config import BUFFER_CAPACITY, HORIZ_CONV_CAPACITY, INFLOW_PROBABILITY
+from .exceptions import CrashError
+from .snapshot import pack, unpack
+from .strategy import TABLES, get_strategy
+
+if TYPE_CHECKING:
+    from .kpi import ProductionStats
+    from .models import ArrivalModel, OutageModel
+
+BASE_CYCLE_TIME = 3000  # milliseconds
+CYCLES_PER_HOUR = 3600 * 1000 // BASE_CYCLE_TIME
+
+
+class BufferSystem:
+    """
+    The collective buffer system, consisting of:
+        1 Horizontal Conveyor component
+        2 Vertical Conveyor components
+        1 Transfer Carriage component
+    along with methods and properties to handle all of the business logic.
+
+    This class holds no display state and does not import pygame, so it
+    can be run headless. The drawable version lives in app.buffer_system.
+
+    """
+
+    def __init__(
+        self, capacity: int = BUFFER_CAPACITY,
+        conveyor_capacity: int = HORIZ_CONV_CAPACITY,
+        inflow_probability: float = INFLOW_PROBABILITY,
+        seed: int | None = None,
+        arrivals: ArrivalModel | None = None,
+        outages: OutageModel | None = None,
+        stats: ProductionStats | None = None
+    ) -> None:
+        self.capacity = capacity
+        self.conveyor_capacity = conveyor_capacity
+        self.inflow_probability = inflow_probability
+        self.max_pos = (self.capacity / 2) - 1  # uppermost transfer position
+        self.min_pos = 1  # lowermost transfer position
+        self.speed = 1.0  # sim speed
+        self.config = 0  # buffer configuration and logic
+
+        self.inlet_pos = int(conveyor_capacity / 2) - 1
+        self.outlet_pos = int(conveyor_capacity / 2)
+
+        # each buffer draws from its own generator so runs can be repeated
+        self.seed = seed if seed is not None else randrange(2**32)
+        self.rng = Random(self.seed)
+
+        # optional stochastic models, see engine.models
+        self.arrivals = arrivals  # replaces the inflow_probability roll
+        self.outages = outages  # drives downstream_stoppage every cycle
+        self.stats = stats  # production KPIs, see engine.kpi
+
+        self.autorun: bool = False
+        self.downstream_stoppage: bool = False
+        self.part_inflow: bool = False
+
+        self.cycle_count = 0  # conveyor cycles since the last reset
+        self.parts_in = 0  # parts loaded onto the conveyor by upstream
+        self.parts_out = 0  # parts delivered to the downstream cell
+
+        self.build()
+
+    def build(self) -> None:
+        """Initializes the system's subcomponents."""
+        self.inlet = VertConveyor(capacity=int(self.capacity/2))
+        self.outlet = VertConveyor(capacity=int(self.capacity/2))
+        self.conveyor = HorizConveyor(capacity=self.conveyor_capacity)
+
+        self.xfer = XferCarriage(
+            initial_pos=int(self.capacity/2)-1
+        )
+
+    def reset_buffer(self) -> None:
+        self.cycle_count = 0
+        self.parts_in = 0
+        self.parts_out = 0
+        if self.stats is not None:
+            self.stats.reset()
+        self.build()
+
+    def snapshot(self) -> bytes:
+        """
+        Saves the full state of the system, including the generator, so
+        that restoring it continues the exact same run. See
+        engine.snapshot for the layout.
+
+        Returns:
+            bytes: Packed state, about 2.5 kB without models.
+        """
+        return pack(self)
+
+    def restore(self, data: bytes | memoryview) -> None:
+        """
+        Replaces the state of the system with a snapshot, which may have
+        been taken from a system of another capacity.
+
+        Snapshots must come from a trusted source: the arrival and
+        outage models in them are unpickled, which can run any code.
+
+        Args:
+            data (bytes | memoryview): Packed state from snapshot.
+        """
+        state = unpack(data)
+        self.capacity = state.capacity
+        self.conveyor_capacity = state.conveyor_capacity
+        self.inflow_probability = state.inflow_probability
+        self.max_pos = (self.capacity / 2) - 1
+        self.min_pos = get_strategy(state.config).min_pos
+        self.inlet_pos = int(self.conveyor_capacity / 2) - 1
+        self.outlet_pos = int(self.conveyor_capacity / 2)
+        self.speed = state.speed
+        self.config = state.config
+
+        self.seed = state.seed
+        self.rng = Random()
+        self.rng.setstate(state.rng_state)
+        self.arrivals, self.outages = state.models
+
+        self.autorun = state.autorun
+        self.downstream_stoppage = state.downstream_stoppage
+        self.part_inflow = state.part_inflow
+
+        self.cycle_count = state.cycle_count
+        self.parts_in = state.parts_in
+        self.parts_out = state.parts_out
+
+        self.build()
+        self.conveyor.bits = state.conveyor
+        self.inlet.bits = state.inlet
+        self.outlet.bits = state.outlet
+        self.xfer.position = state.position
+
+    def fork(self, seed: int | None = None) -> BufferSystem:
+        """
+        Copies the system into an independent one of the same class,
+        e.g. to branch what-if runs from a warmed up buffer.
+
+        Args:
+            seed (int | None): Reseeds the copy so that its arrivals
+                and outages diverge from this system's. Its arrival
+                model, if any, is reseeded with seed and its outage
+                model with seed + 1, as run_headless.py seeds them. By
+                default the copy draws the same numbers and repeats
+                this system's run.
+
+        Returns:
+            BufferSystem: The copy.
+        """
+        clone = copy.copy(self)
+        clone.restore(self.snapshot())
+        clone.stats = copy.deepcopy(self.stats)
+        if seed is not None:
+            clone.seed = seed
+            clone.rng = Random(seed)
+            if clone.arrivals is not None:
+                clone.arrivals.reseed(seed)
+            if clone.outages is not None:
+                clone.outages.reseed(seed + 1)
+        return clone
+
+    def step(self, part_ready: bool | None = None) -> None:
+        """Runs one full machine cycle: conveyor, verticals, then transfer.
+        This is the same order the autorun timers fire in.
+
+        Args:
+            part_ready (bool | None): Passed on to cycle_conveyor.
+        """
+        self.cycle_conveyor(part_ready)
+        self.cycle_verticals()
+        self.cycle_xfer_push()
+
+    def run(self, n_cycles: int) -> None:
+        """
+        Runs the given number of cycles back to back, without timers.
+
+        Args:
+            n_cycles (int): Number of machine cycles to run.
+        """
+        step = self.step
+        for _ in range(n_cycles):
+            step()
+
+    def run_until(
+        self, condition: Callable[[BufferSystem], bool],
+        max_cycles: int | None = None
+    ) -> int:
+        """
+        Runs cycles back to back until the condition is met.
+
+        The condition is checked before every cycle, so nothing is run
+        if it is already met.
+
+        Args:
+            condition (Callable[[BufferSystem], bool]): Called with the
+                buffer system, returns True to stop.
+            max_cycles (int | None): Optional limit on the cycles run.
+
+        Returns:
+            int: Number of cycles run.
+        """
+        step = self.step
+        cycles = 0
+        while not condition(self):
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+            step()
+            cycles += 1
+        return cycles
+
+    def manual_input(self, move_command: MethodType) -> None:
+        """Checks if Autorun is active before executing manual controls."""
+        if not self.autorun:
+            move_command()
+
+    def index_inlet(self) -> None:
+        """Indexes the inlet-side vertical conveyor upwards."""
+        if self.part_at_inlet_top:
+            self.move_xfer_up()
+
+        if self.inlet.any_from(self.xfer.position):
+            raise CrashError(
+                "Part on inlet conveyor crashed into transfer carriage "
+                "or is currently above the transfer carriage."
+            )
+
+        self.inlet.set_part(0, self.part_at_inlet_bottom)
+        self.inlet.index_up()
+        self.conveyor.set_part(self.inlet_pos, False)
+
+    def index_outlet(self) -> None:
+        """Indexes the outlet-side vertical conveyor downwards."""
+        if self.outlet.part_at(0) or self.part_at_outlet_bottom:
+            raise CrashError(
+                "Part on outlet conveyor crashed into horizontal conveyor "
+                "during index."
+            )
+        self.outlet.index_down()
+        self.conveyor.set_part(self.outlet_pos, self.outlet.part_at(0))
+        self.outlet.set_part(0, False)
+
+    def transfer_push(self) -> None:
+        """Handles the transfer carriage pushing a part
+        from inlet to outlet."""
+
+        if (self.part_at_inlet_top and self.part_at_outlet_top):
+            raise CrashError(
+                "Part crashed into another part during transfer push."
+            )
+
+        if self.part_at_inlet_top:
+            self.outlet.set_part(self.xfer.position, True)
+            self.inlet.set_part(self.xfer.position, False)
+
+    def cycle_conveyor(self, part_ready: bool | None = None) -> None:
+        """
+        Indexes the horizontal conveyor and determines if
+        a part is loaded to the first conveyor position using
+        a configurable probability.
+
+        Checks if upstream cell is inhibited due to capacity
+        or if it is paused by the user. If not, a part is present
+        with probability inflow_probability (2/3 by default), or
+        when the arrival model has one ready.
+
+        As the first step of every cycle, this also updates the
+        downstream state from the outage model, if there is one,
+        and records the cycle in the production stats.
+
+        Args:
+            part_ready (bool | None): Whether the upstream cell has a part
+                ready, instead of drawing it. Used to explore the logic
+                under chosen arrivals.
+        """
+        if self.outages is not None:
+            self.downstream_stoppage = self.outages.stopped(self.cycle_count)
+        self.cycle_count += 1
+
+        if part_ready is None:
+            if self.arrivals is not None:
+                part_ready = self.arrivals.draw()
+            else:
+                part_ready = self.rng.random() < self.inflow_probability
+
+        if part_ready and (
+            self.part_inflow and not self.upstream_inhibit
+        ):
+            new_part = True
+        else:
+            new_part = False
+
+        delivered = self.conveyor.part_at(self.conveyor_capacity - 1)
+        if self.stats is not None:
+            self.stats.record(
+                new_part=new_part,
+                delivered=delivered,
+                blocked=self.part_inflow and self.upstream_inhibit,
+                starved=not (self.downstream_stoppage or delivered),
+                fill=self.inlet.part_count + self.outlet.part_count,
+                position=self.xfer.position,
+            )
+
+        self.parts_in += new_part
+        self.parts_out += delivered
+        self.conveyor.index(new_part=new_part)
+
+    def move_xfer_up(self) -> None:
+        """Moves the Transfer Carriage up by one position if
+        not already at its maximum."""
+        if self.xfer.position == self.max_pos:
+            print("Transfer Carriage already at end of travel")
+        else:
+            self.xfer.move_up()
+
+    def move_xfer_down(self) -> None:
+        """Moves the Transfer Carriage down by one position if
+        not already at its minimum."""
+        if self.xfer.position == self.min_pos:
+            print("Transfer Carriage already at end of travel")
+        else:
+            self.xfer.move_down()
+
+    def toggle_autorun(self) -> None:
+        """Toggles autorun on/off"""
+        self.autorun = not self.autorun
+
+    def enable_step_mode(self) -> None:
+        """Step Mode not yet implemented."""
+        pass
+
+    def set_config(self, config: int) -> None:
+        """
+        Called whenever a configuration change is made.
+
+        Sets the new configuration and its minimum position,
+        pauses part inflow and disables downstream stoppage,
+        and calls the reset_buffer method for a fresh start.
+
+        Args:
+            config (int): New configuration number, one with a strategy
+                registered in engine.strategy.
+        """
+
+        self.min_pos = get_strategy(config).min_pos
+        self.config = config
+
+        self.part_inflow = False
+        self.downstream_stoppage = False
+        self.reset_buffer()
+
+    def toggle_downstream_fault(self) -> None:
+        """Toggles downstream fault on/off"""
+        self.downstream_stoppage = not self.downstream_stoppage
+
+    def toggle_part_inflow(self) -> None:
+        """Toggles part inflow from upstream on/off"""
+        self.part_inflow = not self.part_inflow
+
+    def cycle_verticals(self) -> None:
+        """Calls an implementation of the Strategy design pattern
+        to handle various logic configurations. Based on the returned
+        tuple, indexes the vertical conveyors appropriately."""
+
+        inlet_cycle, outlet_cycle = self.vert_strategy
+
+        if inlet_cycle:
+            self.index_inlet()
+
+        if outlet_cycle:
+            self.index_outlet()
+
+    def cycle_xfer_push(self) -> None:
+        """Moves down one position if no part is seen by the transfer carriage,
+        then pushes a part if one is seen at the inlet but not the outlet."""
+        if self.xfer.position > self.min_pos and not (
+            self.part_at_inlet_top or self.part_at_outlet_top
+        ):
+            self.move_xfer_down()
+        # Pusher
+        if self.part_at_inlet_top and not self.part_at_outlet_top:
+            self.transfer_push()
+
+    @property
+    def cycle_time(self) -> int:
+        """Simulation cycle time in milliseconds"""
+        self._cycle_time = int(BASE_CYCLE_TIME / self.speed)
+        return self._cycle_time
+
+    @property
+    def part_at_inlet_bottom(self) -> bool:
+        """Part present at the bottom of the inlet conveyor."""
+        return self.conveyor.part_at(self.inlet_pos)
+
+    @property
+    def part_at_outlet_bottom(self) -> bool:
+        """Part present at the bottom of the outlet conveyor."""
+        return self.conveyor.part_at(self.outlet_pos)
+
+    @property
+    def part_at_inlet_top(self) -> bool:
+        """Part present at the inlet side of the transfer carriage."""
+        return self.inlet.part_at(self.xfer.position)
+
+    @property
+    def part_at_outlet_top(self) -> bool:
+        """Part present at the outlet side of the transfer carriage."""
+        return self.outlet.part_at(self.xfer.position)
+
+    @property
+    def infeed_part_count(self) -> int:
+        """Counts parts on the horizontal conveyor for capacity evaluation."""
+        return self.conveyor.count_below(self.outlet_pos)
+
+    @property
+    def upstream_inhibit(self) -> bool:
+        """Inhibits part inflow when capacity of the system is reached."""
+        if (
+            2 * (self.xfer.position) + self.infeed_part_count
+        ) >= (self.capacity - 2):
+            return True
+        return False
+
+    @property
+    def sensor_word(self) -> int:
+        """The sensors the vertical strategy decides on, packed into the
+        index of its compiled table, see engine.strategy.SENSORS."""
+        conveyor = self.conveyor.bits
+        position = self.xfer.position
+        return (
+            (conveyor >> self.inlet_pos & 1)
+            | (self.inlet.bits >> position & 1) << 1
+            | (self.outlet.bits >> position & 1) << 2
+            | (conveyor >> self.outlet_pos & 1) << 3
+            | (position >= self.max_pos) << 4
+            | self.downstream_stoppage << 5
+        )
+
+    @property
+    def vert_strategy(self) -> tuple[bool, bool]:
+        """Determines motion of the vertical conveyors based on system state
+        and configuration. Returns a tuple of booleans representing the
+        two vertical conveyors.
+
+        The rules of each configuration are compiled into a table of the
+        commands for every sensor word, see engine.strategy, so this is
+        a single lookup.
+
+        Returns:
+            tuple[bool, bool]: Commands for cycling the vertical conveyors."""
+        return TABLES[self.config][self.sensor_word]
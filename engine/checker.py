@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import contextlib
+import io
+from dataclasses import dataclass, field
+from hashlib import blake2b
+
+import numpy as np
+
+from .buffer_system import BufferSystem
+from .config import BUFFER_CAPACITY, HORIZ_CONV_CAPACITY
+from .exceptions import CrashError
+from .state import StateCodec
+
+CRASH = "crash"
+INACCESSIBLE_SLOT = "inaccessible slot"
+
+# every cycle's event, as (part ready, downstream halted)
+EVENTS = ((False, False), (True, False), (False, True), (True, True))
+
+
+class VisitedSet:
+    """
+    Set of 64-bit state fingerprints in an open-addressing NumPy table,
+    at 8 bytes per slot and a load factor of at most 1/2.
+
+    Fingerprints are added in batches, with the probing of the whole
+    batch vectorized, so a breadth-first search can add one layer of
+    states at a time.
+
+    """
+
+    def __init__(self, capacity: int = 1 << 16) -> None:
+        self.table = np.zeros(capacity, dtype=np.uint64)  # 0 marks empty
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, fingerprints: np.ndarray) -> np.ndarray:
+        """
+        Adds a batch of nonzero fingerprints.
+
+        Returns:
+            np.ndarray: Mask of the fingerprints that were new, only the
+                first of any duplicates within the batch counts as new.
+        """
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)
+        new = np.zeros(len(fingerprints), dtype=bool)
+        unique, first = np.unique(fingerprints, return_index=True)
+        if 2 * (self.size + len(unique)) > len(self.table):
+            self._grow(self.size + len(unique))
+
+        mask = np.uint64(len(self.table) - 1)
+        pending = np.arange(len(unique))
+        slots = unique & mask
+        while len(pending):
+            stored = self.table[slots]
+            empty = stored == 0
+            # several fingerprints may probe the same empty slot, the
+            # first of them takes it and the others probe on
+            claim_slots, claim = np.unique(slots[empty], return_index=True)
+            winners = pending[empty][claim]
+            self.table[claim_slots] = unique[winners]
+            new[first[winners]] = True
+            self.size += len(winners)
+
+            done = stored == unique[pending]
+            done[np.flatnonzero(empty)[claim]] = True
+            pending, slots = pending[~done], (slots[~done] + 1) & mask
+        return new
+
+    def _grow(self, size: int) -> None:
+        capacity = len(self.table)
+        while 2 * size > capacity:
+            capacity *= 2
+        old = self.table[self.table != 0]
+        self.table = np.zeros(capacity, dtype=np.uint64)
+        self.size = 0
+        self.add(old)
+
+
+@dataclass(frozen=True)
+class Counterexample:
+    """
+    Shortest event trace from a reset to a failure.
+
+    The trace holds one (part ready, downstream halted) event per
+    cycle, running the cycles with those events from a reset with part
+    inflow on reaches the failure on the last one.
+
+    """
+
+    kind: str
+    message: str
+    trace: tuple[tuple[bool, bool], ...]
+
+    def format(self) -> str:
+        """Lists the trace one cycle per line."""
+        lines = [f"{self.kind} after {len(self.trace)} cycles: "
+                 f"{self.message}"]
+        for cycle, (ready, halted) in enumerate(self.trace, 1):
+            lines.append(
+                f"  {cycle:5d}  {'part' if ready else '-':4}  "
+                f"{'downstream halted' if halted else ''}".rstrip()
+            )
+        return "\n".join(lines)
+
+
+@dataclass
+class CheckResult:
+    """
+    Outcome of checking one configuration. A failure kind missing from
+    failures is proven unreachable only if the search was exhaustive.
+
+    """
+
+    config: int
+    capacity: int
+    conveyor_capacity: int
+    states: int = 0
+    depth: int = 0
+    exhaustive: bool = False
+    failures: dict[str, Counterexample] = field(default_factory=dict)
+
+
+def stranded(buffer: BufferSystem) -> bool:
+    """
+    Checks for a part in the inlet below the lowest transfer position
+    that is never lifted if no more parts arrive. Runs the buffer with
+    the downstream cell running until the part is lifted or the buffer
+    settles.
+
+    """
+    seen = set()
+    while buffer.inlet.count_below(buffer.min_pos):
+        state = (
+            buffer.inlet.bits, buffer.outlet.bits, buffer.conveyor.bits,
+            buffer.xfer.position
+        )
+        if state in seen:
+            return True
+        seen.add(state)
+        buffer.downstream_stoppage = False
+        try:
+            buffer.step(False)
+        except CrashError:
+            return False  # found as a crash instead
+    return False
+
+
+class ModelChecker:
+    """
+    Breadth-first reachability check of the buffer logic.
+
+    Starting from a reset with part inflow on, every cycle branches on
+    whether a part arrives and whether the downstream cell is halted,
+    covering every arrival pattern and outage schedule. The search looks
+    for two kinds of failure:
+
+        Crash: any CrashError raised by the logic.
+
+        Inaccessible slot: a part left in the inlet below the lowest
+            transfer position, which is never lifted unless another
+            part arrives. This is what config 3's extra inlet
+            index fixes.
+
+    States are packed by a StateCodec, leaving out the conveyor past the
+    outlet and the last downstream state, and only a 64-bit fingerprint
+    of each is kept in a VisitedSet. Along with a parent index and event
+    per state, that is about 21 bytes per state, plus the packed states
+    of the current layer. A fingerprint collision could only hide part
+    of the state space, every counterexample is replayed from a reset
+    before it is reported.
+
+    The reachable states grow exponentially with the tower height. For
+    full size towers the search is bounded by max_states or max_depth,
+    which still finds the shortest failures within the bound.
+
+    """
+
+    def __init__(
+        self, config: int, capacity: int = BUFFER_CAPACITY,
+        conveyor_capacity: int = HORIZ_CONV_CAPACITY
+    ) -> None:
+        self.config = config
+        self.capacity = capacity
+        self.conveyor_capacity = conveyor_capacity
+        self.buffer = self._reset()
+        self.codec = StateCodec(self.buffer, downstream_conveyor=False)
+        self._key_bytes = (self.codec.bits + 7) // 8
+
+        # parent index and event of every state, in order of discovery
+        self._parents = np.zeros(1 << 16, dtype=np.int32)
+        self._events = np.zeros(1 << 16, dtype=np.uint8)
+
+    def _reset(self) -> BufferSystem:
+        buffer = BufferSystem(
+            capacity=self.capacity, conveyor_capacity=self.conveyor_capacity
+        )
+        buffer.set_config(self.config)
+        buffer.part_inflow = True
+        return buffer
+
+    def _fingerprint(self, key: int) -> int:
+        digest = blake2b(
+            key.to_bytes(self._key_bytes, "little"), digest_size=8
+        ).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def _record(self, start: int, parents: list, events: list) -> None:
+        end = start + len(parents)
+        if end > len(self._parents):
+            size = max(end, 2 * len(self._parents))
+            self._parents = np.resize(self._parents, size)
+            self._events = np.resize(self._events, size)
+        self._parents[start:end] = parents
+        self._events[start:end] = events
+
+    def _trace(self, state: int, event: int) -> list[int]:
+        trace = [event]
+        while state:
+            trace.append(int(self._events[state]))
+            state = int(self._parents[state])
+        return trace[::-1]
+
+    def replay(self, trace: list[int]) -> tuple[str, str] | None:
+        """
+        Runs an event trace from a reset.
+
+        Returns:
+            tuple[str, str] | None: Failure kind and message on the last
+                cycle, if any.
+        """
+        buffer = self._reset()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                for event in trace:
+                    ready, halted = EVENTS[event]
+                    buffer.downstream_stoppage = halted
+                    buffer.step(ready)
+        except CrashError as e:
+            return CRASH, str(e)
+        slots = [i for i in range(buffer.min_pos) if buffer.inlet.part_at(i)]
+        if stranded(buffer):
+            return INACCESSIBLE_SLOT, (
+                f"Part left on inlet conveyor at position {slots[0]}, below "
+                f"the lowest transfer position {buffer.min_pos}."
+            )
+        return None
+
+    def run(
+        self, max_states: int | None = None, max_depth: int | None = None,
+        kinds: tuple[str, ...] = (CRASH, INACCESSIBLE_SLOT)
+    ) -> CheckResult:
+        """
+        Searches until a counterexample of every kind is found, the state
+        space is exhausted or a bound is reached.
+
+        Args:
+            max_states (int | None): Stop after this many states.
+            max_depth (int | None): Stop after this many cycles.
+            kinds (tuple[str, ...]): Failure kinds to look for.
+
+        Returns:
+            CheckResult: States visited, depth reached and the shortest
+                counterexample of each failure kind found.
+        """
+        buffer, codec = self.buffer, self.codec
+        result = CheckResult(
+            self.config, self.capacity, self.conveyor_capacity
+        )
+        found: dict[str, tuple[int, int]] = {}
+        visited = VisitedSet()
+
+        root = codec.encode()
+        visited.add(np.array([self._fingerprint(root)], dtype=np.uint64))
+        frontier = [root]
+        n_states = 1
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            while frontier:
+                if max_depth is not None and result.depth >= max_depth:
+                    break
+                fingerprints, keys, parents, events = [], [], [], []
+                first = n_states - len(frontier)
+                for offset, key in enumerate(frontier):
+                    state = first + offset
+                    codec.decode(key)
+                    inhibit = buffer.upstream_inhibit
+                    for event, (ready, halted) in enumerate(EVENTS):
+                        if ready and inhibit:
+                            continue  # the part could not be accepted
+                        codec.decode(key)
+                        buffer.downstream_stoppage = halted
+                        try:
+                            buffer.step(ready)
+                        except CrashError:
+                            found.setdefault(CRASH, (state, event))
+                            continue
+                        buffer.downstream_stoppage = False
+                        child = codec.encode()
+                        if (
+                            INACCESSIBLE_SLOT in kinds
+                            and INACCESSIBLE_SLOT not in found
+                            and stranded(buffer)
+                        ):
+                            found[INACCESSIBLE_SLOT] = (state, event)
+                        fingerprints.append(self._fingerprint(child))
+                        keys.append(child)
+                        parents.append(state)
+                        events.append(event)
+                result.depth += 1
+
+                if all(kind in found for kind in kinds):
+                    break
+                new = visited.add(np.array(fingerprints, dtype=np.uint64))
+                frontier = [key for key, is_new in zip(keys, new) if is_new]
+                self._record(
+                    n_states, np.array(parents, dtype=np.int32)[new],
+                    np.array(events, dtype=np.uint8)[new]
+                )
+                n_states += len(frontier)
+                if max_states is not None and n_states >= max_states:
+                    break
+            else:
+                result.exhaustive = True
+
+        result.states = n_states
+        for kind in kinds:
+            if kind not in found:
+                continue
+            trace = self._trace(*found[kind])
+            outcome = self.replay(trace)
+            if outcome is None or outcome[0] != kind:
+                raise RuntimeError(f"Trace to {kind} did not replay.")
+            result.failures[kind] = Counterexample(
+                kind=kind, message=outcome[1],
+                trace=tuple(EVENTS[event] for event in trace)
+            )
+        return result
+
+
+def check(config: int, capacity: int = BUFFER_CAPACITY,
+          **kwargs) -> CheckResult:
+    """Checks one configuration, see ModelChecker.run for the keyword
+    arguments."""
+    conveyor_capacity = kwargs.pop("conveyor_capacity", HORIZ_CONV_CAPACITY)
+    return ModelChecker(config, capacity, conveyor_capacity).run(**kwargs)
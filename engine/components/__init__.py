@@ -0,0 +1,3 @@
+from .horiz_conveyor import HorizConveyor  # noqa
+from .vert_conveyor import VertConveyor  # noqa
+from .transfer_carriage import XferCarriage  # noqa
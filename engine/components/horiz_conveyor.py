@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from engine.config import HORIZ_CONV_CAPACITY
+
+
+class HorizConveyor:
+    """
+    A horizontal indexing conveyor feeding parts
+    to a palletizing cell.
+
+    In the event this palletizing cell goes down, the
+    inlet vertical conveyor lifts parts from this
+    horizontal main conveyor to avoid upstream stoppage.
+
+    When the palletizing cell is returned to production,
+    the outlet vertical conveyor backfills voids on this
+    horizontal conveyor to empty out the buffer's contents.
+
+    """
+
+    def __init__(self, capacity: int = HORIZ_CONV_CAPACITY) -> None:
+        self.capacity = capacity
+        self.mask = (1 << capacity) - 1
+        self.build()
+
+    def build(self) -> None:
+        self.bits = 0  # bit i set = part present at position i
+
+    @property
+    def contents(self) -> list[bool]:
+        """Copy of the contents as a list, position 0 first.
+        Use set_part to modify the conveyor."""
+        bits = self.bits
+        return [bool(bits >> i & 1) for i in range(self.capacity)]
+
+    @contents.setter
+    def contents(self, contents: list[bool]) -> None:
+        self.bits = 0
+        for i, part in enumerate(contents):
+            if part:
+                self.bits |= 1 << i
+
+    def part_at(self, position: int) -> bool:
+        """Part present at the given position."""
+        return bool(self.bits >> position & 1)
+
+    def set_part(self, position: int, present: bool) -> None:
+        """Adds or removes a part at the given position."""
+        if present:
+            self.bits |= 1 << position
+        else:
+            self.bits &= ~(1 << position)
+
+    def count_below(self, position: int) -> int:
+        """Number of parts upstream of the given position."""
+        return (self.bits & ((1 << position) - 1)).bit_count()
+
+    def index(self, new_part: bool) -> None:
+        self.bits = ((self.bits << 1) | new_part) & self.mask
@@ -0,0 +1,9 @@
+class XferCarriage:
+    def __init__(self, initial_pos: int) -> None:
+        self.position = initial_pos
+
+    def move_up(self) -> None:
+        self.position += 1
+
+    def move_down(self) -> None:
+        self.position -= 1
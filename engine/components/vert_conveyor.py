@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from engine.exceptions import CrashError
+
+
+class VertConveyor:
+    """
+    A vertical indexing conveyor which raises and lowers parts
+    from the main horizontal conveyor.
+
+    The buffer system consists of two (2) vertical conveyors,
+    along with a mechanism capable of transferring a part
+    from one of these vertical conveyors to the other.
+
+    The inlet side lifts parts up from the main conveyor,
+    staging them for transfer to the outlet conveyor.
+
+    The outlet conveyor receives parts from the inlet conveyor,
+    and lowers them onto the main horizontal conveyor when it can.
+
+    The transfer mechanism sits upon a carriage capable of
+    moving up and down as necessary as the vertical conveyors index.
+
+    The contents are stored as an integer bitmask, bit i is set when
+    a part is present at position i (0 is the bottom). Indexing shifts
+    the mask instead of rebuilding a list, and occupancy queries are
+    answered with a single mask and popcount.
+
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.mask = (1 << capacity) - 1
+        self.build()
+
+    def build(self) -> None:
+        self.bits = 0
+
+    @property
+    def contents(self) -> list[bool]:
+        """Copy of the contents as a list, position 0 first.
+        Use set_part to modify the conveyor."""
+        bits = self.bits
+        return [bool(bits >> i & 1) for i in range(self.capacity)]
+
+    @contents.setter
+    def contents(self, contents: list[bool]) -> None:
+        self.bits = 0
+        for i, part in enumerate(contents):
+            if part:
+                self.bits |= 1 << i
+
+    @property
+    def part_count(self) -> int:
+        """Number of parts on the conveyor."""
+        return self.bits.bit_count()
+
+    def part_at(self, position: int) -> bool:
+        """Part present at the given position."""
+        return bool(self.bits >> position & 1)
+
+    def set_part(self, position: int, present: bool) -> None:
+        """Adds or removes a part at the given position."""
+        if present:
+            self.bits |= 1 << position
+        else:
+            self.bits &= ~(1 << position)
+
+    def any_from(self, position: int) -> bool:
+        """Part present at or above the given position."""
+        return self.bits >> position != 0
+
+    def count_below(self, position: int) -> int:
+        """Number of parts below the given position."""
+        return (self.bits & ((1 << position) - 1)).bit_count()
+
+    def index_up(self) -> None:
+        self.bits = (self.bits << 1) & self.mask
+
+    def index_down(self) -> None:
+        if self.bits & 1:
+            raise CrashError("Crash, part at position 0 when indexing down.")
+
+        self.bits >>= 1
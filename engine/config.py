@@ -0,0 +1,8 @@
+# indexing conveyor capacity
+HORIZ_CONV_CAPACITY = 16
+
+# total capacity of the buffer tower
+BUFFER_CAPACITY = 150
+
+# probability of the upstream cell delivering a part each cycle
+INFLOW_PROBABILITY = 2 / 3
@@ -0,0 +1,2 @@
+class CrashError(Exception):
+    """Raised when a part crashes into another part or into the machine."""
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import cProfile
+import functools
+import os
+import pstats
+import time
+from typing import Any, Callable
+
+ENV_VAR = "BUFFERSIM_PROFILE"  # set to 1 to instrument without --profile
+SAMPLE_EVERY = 16  # calls between samples added to a histogram
+BUCKETS = 40  # histogram buckets, bucket i holds [2**(i-1), 2**i) ns
+
+
+class Probe:
+    """
+    Call count, cumulative time and a sampled log2 histogram of the
+    durations of one instrumented function. Timings are inclusive, so
+    cycle_verticals also counts the vert_strategy evaluation it makes.
+
+    """
+
+    __slots__ = ("name", "calls", "total_ns", "histogram")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.total_ns = 0
+        self.histogram = [0] * BUCKETS
+
+    def record(self, ns: int) -> None:
+        self.calls += 1
+        self.total_ns += ns
+        if (self.calls - 1) % SAMPLE_EVERY == 0:
+            self.histogram[min(ns.bit_length(), BUCKETS - 1)] += 1
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
+
+    def percentile(self, q: float) -> int:
+        """Upper bound in ns of the histogram bucket holding the given
+        percentile of the sampled durations."""
+        target = sum(self.histogram) * q / 100
+        seen = 0
+        for i, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= target:
+                return 1 << i
+        return 0
+
+
+PROBES: dict[str, Probe] = {}
+_patched: list[tuple[Any, str, Any]] = []  # owner, name, original
+
+
+def env_enabled() -> bool:
+    """Instrumentation requested through the environment variable."""
+    return os.environ.get(ENV_VAR, "") not in ("", "0")
+
+
+def _timed(func: Callable, probe: Probe) -> Callable:
+    clock = time.perf_counter_ns
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            probe.record(clock() - start)
+
+    return wrapper
+
+
+def instrument(owner: Any, name: str, label: str | None = None) -> Probe:
+    """
+    Wraps a function, method or property getter of a class or module in
+    a timing probe. Nothing is wrapped until this is called, so code
+    that is not instrumented runs at full speed.
+
+    Args:
+        owner (Any): Class or module defining the attribute.
+        name (str): Attribute to wrap.
+        label (str | None): Name of the probe, "Owner.name" by default.
+
+    Returns:
+        Probe: The probe collecting the timings.
+    """
+    if label is None:
+        label = f"{getattr(owner, '__name__', owner)}.{name}"
+    probe = PROBES.setdefault(label, Probe(label))
+
+    original = vars(owner)[name]
+    if isinstance(original, property):
+        wrapped: Any = property(
+            _timed(original.fget, probe), original.fset, original.fdel,
+            original.__doc__
+        )
+    else:
+        wrapped = _timed(original, probe)
+    setattr(owner, name, wrapped)
+    _patched.append((owner, name, original))
+    return probe
+
+
+def instrument_engine() -> None:
+    """Instruments the cycle functions of the logic."""
+    from .buffer_system import BufferSystem
+
+    for name in (
+        "cycle_conveyor", "cycle_verticals", "cycle_xfer_push",
+        "vert_strategy"
+    ):
+        instrument(BufferSystem, name)
+
+
+def uninstrument() -> None:
+    """Restores every instrumented attribute, keeping the probes."""
+    while _patched:
+        owner, name, original = _patched.pop()
+        setattr(owner, name, original)
+
+
+def reset() -> None:
+    """Discards the timings collected so far."""
+    for probe in PROBES.values():
+        probe.calls = probe.total_ns = 0
+        probe.histogram = [0] * BUCKETS
+
+
+def report(wall_ns: int | None = None) -> str:
+    """
+    Formats the probes as a table, slowest in total first.
+
+    Args:
+        wall_ns (int | None): Wall time of the run, to show each probe's
+            share of it.
+
+    Returns:
+        str: The table.
+    """
+    lines = [
+        f"{'probe':<32}{'calls':>10}{'total ms':>11}{'mean us':>10}"
+        f"{'p50 us':>9}{'p99 us':>9}" + ("   share" if wall_ns else "")
+    ]
+    for probe in sorted(
+        PROBES.values(), key=lambda p: p.total_ns, reverse=True
+    ):
+        if not probe.calls:
+            continue
+        line = (
+            f"{probe.name:<32}{probe.calls:>10}"
+            f"{probe.total_ns / 1e6:>11.1f}{probe.mean_ns / 1e3:>10.2f}"
+            f"{probe.percentile(50) / 1e3:>9.2f}"
+            f"{probe.percentile(99) / 1e3:>9.2f}"
+        )
+        if wall_ns:
+            line += f"{100 * probe.total_ns / wall_ns:>7.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def print_summary(
+    wall_ns: int, profiler: cProfile.Profile | None = None,
+    path: str | None = None
+) -> None:
+    """
+    Prints the probes and, when profiling, saves the cProfile stats and
+    prints the functions with the most time of their own.
+
+    Args:
+        wall_ns (int): Wall time of the run.
+        profiler (cProfile.Profile | None): Stopped profiler of the run.
+        path (str | None): File to save the stats to, for pstats.
+    """
+    print(report(wall_ns))
+    if profiler is not None:
+        profiler.dump_stats(path)
+        print(f"\ncProfile stats saved to {path}, top 15 by own time:")
+        pstats.Stats(profiler).sort_stats("tottime").print_stats(15)
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import struct
+from math import inf, isinf, log2
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, Iterator
+
+from .buffer_system import BufferSystem
+from .exceptions import CrashError
+from .strategy import (STRATEGIES, Strategy, dump_strategy, get_strategy,
+                       parse_strategy, register_strategy)
+from .worker import PHASES
+
+MAGIC = b"BSJ2"
+HEADER = struct.Struct("<4sQHHBd")  # magic, seed, capacities, config, inflow
+RECORD = struct.Struct("<QBb")  # cycle, action, argument
+PAYLOAD = struct.Struct("<I")  # length of the strategy after its record
+RUN = struct.Struct("<I")  # number of phases run, after a phase record
+MAX_RUN = 2 ** 32 - 1
+
+# journaled actions, a record stores the index, so only ever append
+ACTIONS = (
+    "cycle_conveyor",
+    "cycle_verticals",
+    "cycle_xfer_push",
+    "index_inlet",
+    "index_outlet",
+    "transfer_push",
+    "move_xfer_down",
+    "move_xfer_up",
+    "toggle_autorun",
+    "toggle_downstream_fault",
+    "toggle_part_inflow",
+    "reset_buffer",
+    "set_config",  # argument: configuration number
+    "set_speed",  # argument: see speed_argument
+    "register_strategy",  # argument: configuration number, see PAYLOAD
+)
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+PHASE_INDEX = {name: index for index, name in enumerate(PHASES)}
+MAX_SPEED_ARGUMENT = 127  # set_speed argument of the max speed setting
+
+
+def speed_argument(speed: float) -> int:
+    """The set_speed argument of a speed multiplier: its log2, or
+    MAX_SPEED_ARGUMENT for the unbounded max setting."""
+    if isinf(speed):
+        return MAX_SPEED_ARGUMENT
+    return int(log2(speed))
+
+
+@dataclass(frozen=True)
+class JournalHeader:
+    """Everything needed to rebuild the buffer a session started with."""
+
+    seed: int
+    capacity: int
+    conveyor_capacity: int
+    config: int
+    inflow_probability: float
+
+
+@dataclass(frozen=True)
+class Record:
+    """
+    One journaled action, on the given machine cycle of the session.
+    Each conveyor index starts a new cycle, the first one is cycle 1 and
+    actions before it are on cycle 0. Unlike BufferSystem.cycle_count,
+    this is not reset along with the buffer.
+
+    """
+
+    cycle: int
+    action: str
+    argument: int = 0
+    strategy: Strategy | None = None  # of register_strategy
+    count: int = 1  # of phases run back to back, starting with action
+
+
+class JournalWriter:
+    """
+    Appends every state-changing action of a session to a binary
+    journal, at 10 bytes per record after a fixed header.
+
+    Machine phases run back to back, in the order of PHASES, are merged
+    into one record of the first phase followed by the number run, so a
+    session left running adds a record per command rather than three
+    per cycle. The pending run is written when any other action is
+    recorded or the journal is closed.
+
+    The strategies registered when the journal is opened are recorded
+    first, and so should every strategy registered during the session,
+    each as a register_strategy record followed by its JSON, so the
+    session replays with the logic it ran even when the logic files
+    have changed since.
+
+    Actions are recorded before they are applied, so a journal ends
+    with the action, or the run of phases, that raised if the session
+    crashed.
+
+    Args:
+        file (str | BinaryIO): Path or binary file to write to.
+        buffer (BufferSystem): Buffer at the start of the session.
+    """
+
+    def __init__(self, file: str | BinaryIO, buffer: BufferSystem) -> None:
+        self.file = open(file, "wb") if isinstance(file, str) else file
+        self.cycle = 0
+        self._run: list[int] | None = None  # cycle, phase, count
+        self.file.write(HEADER.pack(
+            MAGIC, buffer.seed, buffer.capacity, buffer.conveyor_capacity,
+            buffer.config, buffer.inflow_probability
+        ))
+        for config, strategy in sorted(STRATEGIES.items()):
+            self.record_strategy(config, strategy)
+
+    def record(self, action: str, argument: int = 0) -> None:
+        """Appends an action, see ACTIONS."""
+        if action in PHASE_INDEX:
+            self._record_phase(PHASE_INDEX[action])
+            return
+        self._end_run()
+        self.file.write(RECORD.pack(
+            self.cycle, ACTION_CODES[action], argument
+        ))
+
+    def _record_phase(self, phase: int) -> None:
+        if phase == 0:
+            self.cycle += 1
+        run = self._run
+        if run is not None and run[2] < MAX_RUN \
+                and (run[1] + run[2]) % len(PHASES) == phase:
+            run[2] += 1
+        else:
+            self._end_run()
+            self._run = [self.cycle, phase, 1]
+
+    def _end_run(self) -> None:
+        if self._run is not None:
+            cycle, phase, count = self._run
+            self.file.write(RECORD.pack(
+                cycle, ACTION_CODES[PHASES[phase]], 0
+            ) + RUN.pack(count))
+            self._run = None
+
+    def record_strategy(self, config: int, strategy: Strategy) -> None:
+        """Appends the registration of a strategy, with its JSON."""
+        payload = dump_strategy(config, strategy).encode()
+        self._end_run()
+        self.file.write(RECORD.pack(
+            self.cycle, ACTION_CODES["register_strategy"], config
+        ) + PAYLOAD.pack(len(payload)) + payload)
+
+    def close(self) -> None:
+        self._end_run()
+        self.file.close()
+
+    def __enter__(self) -> JournalWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_journal(path: str) -> tuple[JournalHeader, list[Record]]:
+    """Reads a whole journal. A truncated last record is dropped."""
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, *fields = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"Not a buffer journal: {path}")
+    records = []
+    offset = HEADER.size
+    while offset + RECORD.size <= len(data):
+        cycle, code, argument = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        action, strategy, count = ACTIONS[code], None, 1
+        if action in PHASE_INDEX:
+            if offset + RUN.size > len(data):
+                break
+            (count,) = RUN.unpack_from(data, offset)
+            offset += RUN.size
+        elif action == "register_strategy":
+            if offset + PAYLOAD.size > len(data):
+                break
+            (length,) = PAYLOAD.unpack_from(data, offset)
+            offset += PAYLOAD.size
+            if offset + length > len(data):
+                break
+            text = data[offset:offset + length].decode()
+            offset += length
+            try:
+                argument, strategy = parse_strategy(text)
+            except ValueError as e:
+                raise ValueError(f"Invalid strategy on cycle {cycle} of "
+                                 f"{path}: {e}") from None
+        records.append(Record(cycle, action, argument, strategy, count))
+    return JournalHeader(*fields), records
+
+
+def expand_runs(records: Iterable[Record]) -> Iterator[Record]:
+    """Yields the actions of the records one by one, each run of phases
+    as a record per phase on its own cycle."""
+    for record in records:
+        if record.count == 1:
+            yield record
+            continue
+        cycle, first = record.cycle, PHASE_INDEX[record.action]
+        for i in range(first, first + record.count):
+            phase = i % len(PHASES)
+            if phase == 0 and i > first:
+                cycle += 1
+            yield Record(cycle, PHASES[phase])
+
+
+@dataclass
+class ReplayResult:
+    """
+    Outcome of a replay: the buffer as it was after the last applied
+    action, the cycle of that action, the number of actions applied,
+    each phase of a run counting as one, and the crash message and the
+    action that raised it if the session crashed.
+
+    """
+
+    buffer: BufferSystem
+    cycle: int
+    applied: int
+    crash: str | None = None
+    crash_record: Record | None = None
+
+
+def replay(
+    header: JournalHeader, records: list[Record],
+    until_cycle: int | None = None
+) -> ReplayResult:
+    """
+    Reconstructs a session headless, as fast as the logic runs.
+
+    Journaled strategies are registered as they are reached, replacing
+    those of the same numbers in this process.
+
+    Args:
+        header (JournalHeader): Session start, from read_journal.
+        records (list[Record]): Actions to apply in order.
+        until_cycle (int | None): Stop before the given cycle instead,
+            to inspect the state on the way to a crash.
+
+    Returns:
+        ReplayResult: Final state of the replayed session.
+    """
+    # the strategies the session started with, see JournalWriter
+    initial = 0
+    for record in records:
+        if record.action != "register_strategy" or record.cycle:
+            break
+        register_strategy(record.argument, record.strategy)
+        initial += 1
+
+    buffer = BufferSystem(
+        capacity=header.capacity,
+        conveyor_capacity=header.conveyor_capacity,
+        inflow_probability=header.inflow_probability,
+        seed=header.seed,
+    )
+    if header.config != buffer.config:
+        buffer.set_config(header.config)
+
+    result = ReplayResult(buffer=buffer, cycle=0, applied=initial)
+    for record in expand_runs(records[initial:]):
+        if until_cycle is not None and record.cycle >= until_cycle:
+            break
+        result.cycle = record.cycle
+        try:
+            if record.action == "set_config":
+                buffer.set_config(record.argument)
+            elif record.action == "register_strategy":
+                register_strategy(record.argument, record.strategy)
+                buffer.min_pos = get_strategy(buffer.config).min_pos
+            elif record.action == "set_speed":
+                buffer.speed = (
+                    inf if record.argument == MAX_SPEED_ARGUMENT
+                    else 2.0 ** record.argument
+                )
+            else:
+                getattr(buffer, record.action)()
+        except CrashError as e:
+            result.crash, result.crash_record = str(e), record
+            break
+        result.applied += 1
+    return result
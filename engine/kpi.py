@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import copy
+from typing import Iterator
+
+from .buffer_system import CYCLES_PER_HOUR
+
+KPI_WINDOW = CYCLES_PER_HOUR  # cycles in the rolling windows, 1 h of line
+
+
+class RingBuffer:
+    """
+    The last `size` values of a series in a fixed-size list, along with
+    their running sum, so appending and averaging are both O(1).
+
+    """
+
+    __slots__ = ("values", "size", "index", "count", "total")
+
+    def __init__(self, size: int) -> None:
+        self.values = [0] * size
+        self.size = size
+        self.index = 0  # slot of the next value
+        self.count = 0
+        self.total = 0
+
+    def append(self, value: int) -> None:
+        if self.count == self.size:
+            self.total -= self.values[self.index]
+        else:
+            self.count += 1
+        self.values[self.index] = value
+        self.total += value
+        self.index = (self.index + 1) % self.size
+
+    def extend(self, value: int, n: int) -> None:
+        """Appends the same value n times, in at most `size` steps since
+        the oldest values are overwritten anyway."""
+        for _ in range(min(n, self.size)):
+            self.append(value)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def copy(self) -> RingBuffer:
+        clone = RingBuffer.__new__(RingBuffer)
+        clone.values = self.values.copy()
+        clone.size = self.size
+        clone.index = self.index
+        clone.count = self.count
+        clone.total = self.total
+        return clone
+
+    def __iter__(self) -> Iterator[int]:
+        """Values from the oldest to the latest."""
+        start = self.index - self.count
+        for i in range(start, self.index):
+            yield self.values[i % self.size]
+
+    @property
+    def latest(self) -> int:
+        return self.values[self.index - 1] if self.count else 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class ProductionStats:
+    """
+    Production KPIs of a buffer system, updated once per cycle in O(1)
+    by BufferSystem.cycle_conveyor when set as its `stats`.
+
+    Every cycle records whether a part came in from upstream and went
+    out to downstream, whether upstream was blocked by upstream_inhibit
+    while its inflow was on, whether downstream was starved (running
+    but given no part), the parts held in the towers and the carriage
+    position, the last two as the cycle starts. Totals are kept since
+    the last reset, rates and means over the last `window` cycles.
+
+    Args:
+        window (int): Cycles in the rolling windows.
+    """
+
+    def __init__(self, window: int = KPI_WINDOW) -> None:
+        self.window = window
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears everything, called along with BufferSystem.reset_buffer."""
+        self.cycles = 0
+        self.parts_in = 0
+        self.parts_out = 0
+        self.blocked_cycles = 0
+        self.starved_cycles = 0
+        self.travel = 0  # carriage travel in pitches
+        self.position: int | None = None  # carriage as the last cycle began
+
+        self.inflow = RingBuffer(self.window)
+        self.outflow = RingBuffer(self.window)
+        self.blocked = RingBuffer(self.window)
+        self.starved = RingBuffer(self.window)
+        self.fill = RingBuffer(self.window)  # parts in the towers
+
+    def copy(self) -> ProductionStats:
+        """Independent copy, e.g. for another thread to read."""
+        clone = copy.copy(self)
+        for name in ("inflow", "outflow", "blocked", "starved", "fill"):
+            setattr(clone, name, getattr(self, name).copy())
+        return clone
+
+    def record(
+        self, new_part: bool, delivered: bool, blocked: bool, starved: bool,
+        fill: int, position: int
+    ) -> None:
+        """Adds one cycle, see the class description."""
+        self.cycles += 1
+        self.parts_in += new_part
+        self.parts_out += delivered
+        self.blocked_cycles += blocked
+        self.starved_cycles += starved
+        if self.position is not None:
+            self.travel += abs(position - self.position)
+        self.position = position
+
+        self.inflow.append(new_part)
+        self.outflow.append(delivered)
+        self.blocked.append(blocked)
+        self.starved.append(starved)
+        self.fill.append(fill)
+
+    def record_idle(
+        self, n_cycles: int, blocked: bool, starved: bool, fill: int,
+        position: int
+    ) -> None:
+        """Adds n cycles in which no part moved and nothing changed, as
+        skipped by the event scheduler, like n calls of record."""
+        if n_cycles <= 0:
+            return
+        self.cycles += n_cycles
+        self.blocked_cycles += blocked * n_cycles
+        self.starved_cycles += starved * n_cycles
+        if self.position is not None:
+            self.travel += abs(position - self.position)
+        self.position = position
+
+        self.inflow.extend(0, n_cycles)
+        self.outflow.extend(0, n_cycles)
+        self.blocked.extend(blocked, n_cycles)
+        self.starved.extend(starved, n_cycles)
+        self.fill.extend(fill, n_cycles)
+
+    @property
+    def parts_in_per_hour(self) -> float:
+        """Parts taken from upstream per hour, over the window."""
+        return self.inflow.mean * CYCLES_PER_HOUR
+
+    @property
+    def parts_out_per_hour(self) -> float:
+        """Parts delivered to downstream per hour, over the window."""
+        return self.outflow.mean * CYCLES_PER_HOUR
+
+    @property
+    def blocked_fraction(self) -> float:
+        """Share of the window's cycles upstream was blocked."""
+        return self.blocked.mean
+
+    @property
+    def starved_fraction(self) -> float:
+        """Share of the window's cycles downstream was starved."""
+        return self.starved.mean
+
+    @property
+    def mean_fill(self) -> float:
+        """Mean parts held in the towers over the window."""
+        return self.fill.mean
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING
+
+from .buffer_system import BufferSystem
+from .config import HORIZ_CONV_CAPACITY
+
+if TYPE_CHECKING:
+    from .models import OutageModel
+
+
+class Segment:
+    """
+    Accumulating conveyor between two stages of a line, holding up to
+    capacity parts. Parts are interchangeable, so only their number is
+    kept.
+
+    """
+
+    __slots__ = ("capacity", "parts")
+
+    def __init__(self, capacity: int = HORIZ_CONV_CAPACITY) -> None:
+        self.capacity = capacity
+        self.parts = 0
+
+    @property
+    def free(self) -> int:
+        return self.capacity - self.parts
+
+
+class Stage:
+    """
+    A machine of the line cycling at a fixed cycle time, taking parts
+    from its input segment and passing them on to its output segment.
+    The first stage of a line has no input and always finds a part, the
+    parts leaving the last stage have nowhere to wait.
+
+    """
+
+    def __init__(self, name: str, cycle_time: int) -> None:
+        self.name = name
+        self.cycle_time = cycle_time  # milliseconds
+        self.input: Segment | None = None
+        self.output: Segment | None = None
+
+        self.cycles = 0
+        self.parts_in = 0
+        self.parts_out = 0
+
+    def tick(self) -> None:
+        """Runs one cycle of the stage."""
+        raise NotImplementedError
+
+
+class Cell(Stage):
+    """
+    Processing cell taking one cycle per part. Each cycle, it passes on
+    the part it finished if there is room for it and takes the next one.
+    A cell that cannot pass its part on is blocked and one without a
+    part to take is starved.
+
+    Args:
+        name (str): Name in reports.
+        cycle_time (int): Cycle time in milliseconds.
+        outages (OutageModel | None): Halts the cell on some of its
+            cycles, counted from 0, see engine.models.
+    """
+
+    def __init__(
+        self, name: str, cycle_time: int,
+        outages: OutageModel | None = None
+    ) -> None:
+        super().__init__(name, cycle_time)
+        self.outages = outages
+        self.holding = False  # finished part waiting to leave
+        self.blocked_cycles = 0
+        self.starved_cycles = 0
+        self.down_cycles = 0
+
+    def tick(self) -> None:
+        cycle = self.cycles
+        self.cycles += 1
+        if self.outages is not None and self.outages.stopped(cycle):
+            self.down_cycles += 1
+            return
+
+        output = self.output
+        if self.holding:
+            if output is not None and output.parts >= output.capacity:
+                self.blocked_cycles += 1
+                return
+            if output is not None:
+                output.parts += 1
+            self.holding = False
+            self.parts_out += 1
+
+        if self.input is None:
+            self.holding = True
+        elif self.input.parts:
+            self.input.parts -= 1
+            self.holding = True
+        else:
+            self.starved_cycles += 1
+            return
+        self.parts_in += 1
+
+
+class Tower(Stage):
+    """
+    A buffer system in the line, cycling at its own cycle time. Upstream
+    has a part ready when the input segment holds one. Downstream is
+    halted once the output segment has no room left for the parts at or
+    past the inlet, plus one the outlet may drop, as the conveyor keeps
+    running these out while the outlet holds back. Should a part reach
+    a full segment anyway, it is counted as an overflow.
+
+    Args:
+        name (str): Name in reports.
+        buffer (BufferSystem): The buffer, which must not have an outage
+            model as the line drives downstream_stoppage. Part inflow is
+            turned on.
+    """
+
+    def __init__(self, name: str, buffer: BufferSystem) -> None:
+        if buffer.outages is not None:
+            raise ValueError(
+                f"{name}: the line drives the downstream stoppage, the "
+                "buffer cannot have an outage model."
+            )
+        super().__init__(name, buffer.cycle_time)
+        self.buffer = buffer
+        self.overflows = 0
+        buffer.part_inflow = True
+
+    def tick(self) -> None:
+        buffer = self.buffer
+        output = self.output
+        if output is not None:
+            running_out = buffer.conveyor.bits >> buffer.inlet_pos
+            buffer.downstream_stoppage = (
+                output.free <= running_out.bit_count() + 1
+            )
+
+        parts_in, parts_out = buffer.parts_in, buffer.parts_out
+        buffer.step(self.input is None or self.input.parts > 0)
+        self.cycles += 1
+
+        if buffer.parts_in != parts_in:
+            self.parts_in += 1
+            if self.input is not None:
+                self.input.parts -= 1
+        if buffer.parts_out != parts_out:
+            self.parts_out += 1
+            if output is not None:
+                self.overflows += output.parts >= output.capacity
+                output.parts += 1
+
+    @property
+    def fill(self) -> int:
+        """Parts held in the towers."""
+        return self.buffer.inlet.part_count + self.buffer.outlet.part_count
+
+
+class Line:
+    """
+    Stages in series, each one connected to the next by a segment, all
+    advanced by one discrete-event loop.
+
+    Every stage is due again one cycle time after it last ran. The loop
+    keeps the stages in a heap by the time they are due, so a cycle
+    costs O(log n) on top of the stage's own logic however many stages
+    there are and whatever their cycle times. Stages due at the same
+    time run from the end of the line to its start, so a part moves at
+    most one stage per cycle and room freed downstream is seen upstream
+    straight away.
+
+    A CrashError raised by a tower propagates with the line stopped at
+    the time it happened.
+
+    """
+
+    def __init__(self) -> None:
+        self.stages: list[Stage] = []
+        self.segments: list[Segment] = []
+        self.time = 0  # milliseconds
+        self._due: list[tuple[int, int]] = []  # time due, -stage index
+
+    def add(
+        self, stage: Stage | BufferSystem,
+        segment_capacity: int = HORIZ_CONV_CAPACITY
+    ) -> Stage:
+        """
+        Appends a stage to the end of the line.
+
+        Args:
+            stage (Stage | BufferSystem): Cell or tower, a buffer system
+                is added as a tower.
+            segment_capacity (int): Parts the segment from the previous
+                stage holds.
+
+        Returns:
+            Stage: The stage added.
+        """
+        if isinstance(stage, BufferSystem):
+            stage = Tower(f"tower {len(self.stages)}", stage)
+        if self.stages:
+            segment = Segment(segment_capacity)
+            self.stages[-1].output = segment
+            stage.input = segment
+            self.segments.append(segment)
+        heapq.heappush(self._due, (self.time, -len(self.stages)))
+        self.stages.append(stage)
+        return stage
+
+    def run(self, duration: int) -> None:
+        """
+        Runs every stage cycle due before the given time from now.
+
+        Args:
+            duration (int): Line time to run, in milliseconds.
+        """
+        end = self.time + duration
+        due = self._due
+        stages = self.stages
+        while due and due[0][0] < end:
+            time, index = due[0]
+            self.time = time
+            stage = stages[-index]
+            stage.tick()
+            heapq.heapreplace(due, (time + stage.cycle_time, index))
+        self.time = end
+
+    @property
+    def parts_out(self) -> int:
+        """Parts finished by the last stage."""
+        return self.stages[-1].parts_out
+
+    @property
+    def towers(self) -> list[Tower]:
+        return [stage for stage in self.stages if isinstance(stage, Tower)]
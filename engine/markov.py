@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import contextlib
+import io
+from dataclasses import dataclass
+
+import numpy as np
+
+from .buffer_system import CYCLES_PER_HOUR, BufferSystem
+from .config import HORIZ_CONV_CAPACITY, INFLOW_PROBABILITY
+from .exceptions import CrashError
+from .state import StateCodec
+
+try:
+    from scipy import sparse
+    from scipy.sparse import linalg as sparse_linalg
+except ImportError:  # exact sparse solve needs scipy, NumPy falls back
+    sparse = None
+
+MAX_STATES = 2_000_000
+DENSE_LIMIT = 4000  # largest chain solved with a dense NumPy solve
+
+
+class StateSpaceTooLarge(Exception):
+    """More states are reachable than the analysis was allowed to visit."""
+
+
+@dataclass(frozen=True)
+class SteadyState:
+    """
+    Long-run behaviour of one buffer configuration, per machine cycle.
+
+    throughput is parts delivered downstream, mean_fill the parts held
+    in the tower, overflow_probability the fraction of cycles the
+    upstream cell is blocked and crash_probability the probability of
+    having crashed, which is 1 if a crash can be reached at all.
+
+    """
+
+    config: int
+    capacity: int
+    conveyor_capacity: int
+    inflow_probability: float
+    mtbf: float | None
+    mttr: float | None
+    n_states: int
+    n_transitions: int
+    throughput: float
+    mean_fill: float
+    overflow_probability: float
+    crash_probability: float
+    method: str
+
+    @property
+    def parts_per_hour(self) -> float:
+        return self.throughput * CYCLES_PER_HOUR
+
+
+class MarkovChain:
+    """
+    The buffer logic as a finite Markov chain.
+
+    The states are the ones reachable from a reset with part inflow on,
+    found breadth first by stepping a scratch BufferSystem through every
+    combination of part arrival and downstream state. Each state is the
+    system right after a full cycle, packed by a StateCodec and hashed
+    to its index in a dict. Conveyor positions past the outlet are left
+    out, see StateCodec. Crashing leads to one absorbing state, the last.
+
+    Parts arrive with the given probability each cycle. Without an MTBF
+    the downstream cell always runs, otherwise it fails and is repaired
+    with probability 1/mtbf and 1/mttr per cycle, i.e. geometrically
+    distributed running and halted periods with those means in cycles.
+
+    Args:
+        config (int): Buffer configuration.
+        capacity (int): Total tower capacity. The state space grows
+            exponentially with it, towers of up to about 16 are practical.
+        conveyor_capacity (int): Horizontal conveyor capacity.
+        inflow_probability (float): Part arrival probability per cycle.
+        mtbf (float | None): Mean time between downstream failures.
+        mttr (float | None): Mean time to repair, required with mtbf.
+        max_states (int): Raises StateSpaceTooLarge beyond this.
+    """
+
+    def __init__(
+        self, config: int, capacity: int,
+        conveyor_capacity: int = HORIZ_CONV_CAPACITY,
+        inflow_probability: float = INFLOW_PROBABILITY,
+        mtbf: float | None = None, mttr: float | None = None,
+        max_states: int = MAX_STATES
+    ) -> None:
+        if mtbf is not None and (mttr is None or mtbf < 1 or mttr < 1):
+            raise ValueError("MTBF and MTTR must be at least one cycle.")
+        self.config = config
+        self.capacity = capacity
+        self.conveyor_capacity = conveyor_capacity
+        self.inflow_probability = inflow_probability
+        self.mtbf = mtbf
+        self.mttr = mttr
+        self.max_states = max_states
+
+        self.buffer = BufferSystem(
+            capacity=capacity, conveyor_capacity=conveyor_capacity
+        )
+        self.buffer.set_config(config)
+        self.buffer.part_inflow = True
+        self.codec = StateCodec(self.buffer, downstream_conveyor=False)
+
+        self.keys: list[int] = []
+        self.index: dict[int, int] = {}
+        self._explore()
+
+    def _downstream(self, stopped: bool) -> list[tuple[bool, float]]:
+        """Next cycle's downstream states with their probabilities."""
+        if self.mtbf is None:
+            return [(False, 1.0)]
+        change = 1 / self.mttr if stopped else 1 / self.mtbf
+        return [(stopped, 1 - change), (not stopped, change)]
+
+    def _explore(self) -> None:
+        buffer, codec = self.buffer, self.codec
+        p = self.inflow_probability
+        arrivals = [(ready, q) for ready, q in ((False, 1 - p), (True, p))
+                    if q > 0]
+
+        src: list[int] = []
+        dst: list[int] = []
+        prob: list[float] = []
+        delivered: list[bool] = []
+        fill: list[int] = []
+        blocked: list[bool] = []
+        crash = -1  # placeholder index, the crash state is appended last
+
+        def visit(key: int) -> int:
+            if key not in self.index:
+                if len(self.keys) >= self.max_states:
+                    raise StateSpaceTooLarge(
+                        f"More than {self.max_states} reachable states."
+                    )
+                self.index[key] = len(self.keys)
+                self.keys.append(key)
+                delivered.append(
+                    buffer.conveyor.part_at(buffer.outlet_pos)
+                )
+                fill.append(
+                    buffer.inlet.part_count + buffer.outlet.part_count
+                )
+                blocked.append(buffer.upstream_inhibit)
+            return self.index[key]
+
+        # the crash messages and end of travel notices are of no interest
+        with contextlib.redirect_stdout(io.StringIO()):
+            visit(codec.encode())
+            i = 0
+            while i < len(self.keys):
+                key = self.keys[i]
+                codec.decode(key)
+                for stopped, q_down in self._downstream(
+                    buffer.downstream_stoppage
+                ):
+                    for ready, q_part in arrivals:
+                        codec.decode(key)
+                        buffer.downstream_stoppage = stopped
+                        try:
+                            buffer.step(ready)
+                            j = visit(codec.encode())
+                        except CrashError:
+                            j = crash
+                        src.append(i)
+                        dst.append(j)
+                        prob.append(q_down * q_part)
+                i += 1
+
+        n = len(self.keys)
+        self.src = np.array(src + [n], dtype=np.int64)
+        self.dst = np.array(dst + [n], dtype=np.int64)
+        self.dst[self.dst == crash] = n
+        self.prob = np.array(prob + [1.0])
+        self.crash_reachable = bool((self.dst[:-1] == n).any())
+        self.delivered = np.array(delivered + [False], dtype=float)
+        self.fill = np.array(fill + [0], dtype=float)
+        self.blocked = np.array(blocked + [False], dtype=float)
+
+    @property
+    def n_states(self) -> int:
+        """Reachable states, including the crash state."""
+        return len(self.keys) + 1
+
+    def stationary(
+        self, tol: float = 1e-12, max_iterations: int = 1_000_000
+    ) -> tuple[np.ndarray, str]:
+        """
+        Solves for the stationary distribution, exactly with a sparse
+        solve if scipy is installed or a dense solve for small chains.
+        Otherwise, or if the exact solve fails, iterates the lazy chain
+        from the reset state until the distribution changes by less
+        than tol, which gives the long-run distribution from a reset.
+
+        Returns:
+            tuple[np.ndarray, str]: Probability of each state and the
+                method used.
+        """
+        if self.crash_reachable:
+            pi = np.zeros(self.n_states)
+            pi[-1] = 1
+            return pi, "absorbing"
+
+        # the unreachable crash state is left out, it would be a second
+        # recurrent class
+        n = self.n_states - 1
+        src, dst, prob = self.src[:-1], self.dst[:-1], self.prob[:-1]
+
+        # pi (P - I) = 0, with the first equation replaced by sum(pi) = 1
+        keep = dst != 0
+        rows = np.concatenate([dst[keep], np.arange(1, n),
+                               np.zeros(n, dtype=np.int64)])
+        cols = np.concatenate([src[keep], np.arange(1, n), np.arange(n)])
+        values = np.concatenate([prob[keep], -np.ones(n - 1), np.ones(n)])
+        rhs = np.zeros(n)
+        rhs[0] = 1
+
+        pi = None
+        if sparse is not None:
+            matrix = sparse.csc_matrix((values, (rows, cols)), shape=(n, n))
+            pi, method = sparse_linalg.spsolve(matrix, rhs), "sparse"
+        elif n <= DENSE_LIMIT:
+            matrix = np.zeros((n, n))
+            np.add.at(matrix, (rows, cols), values)
+            try:
+                pi, method = np.linalg.solve(matrix, rhs), "dense"
+            except np.linalg.LinAlgError:
+                pi = None
+        if pi is not None and np.isfinite(pi).all() and pi.min() > -1e-9:
+            return np.append(np.clip(pi, 0, None), 0), method
+
+        pi = np.zeros(n)
+        pi[0] = 1
+        for _ in range(max_iterations):
+            step = np.bincount(dst, weights=pi[src] * prob, minlength=n)
+            step = (pi + step) / 2
+            if np.abs(step - pi).sum() < tol:
+                return np.append(step, 0), "power"
+            pi = step
+        raise RuntimeError(
+            f"No convergence within {max_iterations} iterations."
+        )
+
+    def solve(self, **kwargs) -> SteadyState:
+        """Computes the long-run statistics, see stationary for the
+        keyword arguments."""
+        pi, method = self.stationary(**kwargs)
+        return SteadyState(
+            config=self.config,
+            capacity=self.capacity,
+            conveyor_capacity=self.conveyor_capacity,
+            inflow_probability=self.inflow_probability,
+            mtbf=self.mtbf,
+            mttr=self.mttr,
+            n_states=self.n_states,
+            n_transitions=len(self.prob),
+            throughput=float(pi @ self.delivered),
+            mean_fill=float(pi @ self.fill),
+            overflow_probability=float(pi @ self.blocked),
+            crash_probability=float(pi[-1]),
+            method=method,
+        )
+
+
+def analyze(config: int, capacity: int, **kwargs) -> SteadyState:
+    """Builds the chain for a configuration and solves it, see
+    MarkovChain for the keyword arguments."""
+    return MarkovChain(config, capacity, **kwargs).solve()
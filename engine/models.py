@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import csv
+from bisect import bisect_right
+from math import gamma, inf
+
+import numpy as np
+
+BLOCK_SIZE = 4096  # random numbers drawn per NumPy call
+
+
+class ArrivalModel:
+    """
+    Decides every cycle whether the upstream cell has a part ready.
+
+    BufferSystem calls draw once per conveyor cycle, whether or not
+    part inflow is enabled. The scheduler skips over quiescent cycles
+    with next_arrival and advance instead.
+
+    """
+
+    def draw(self) -> bool:
+        """Part ready on this cycle."""
+        raise NotImplementedError
+
+    def next_arrival(self) -> float:
+        """Cycles until the next part is ready, including that cycle."""
+        raise NotImplementedError
+
+    def advance(self, n_cycles: int) -> None:
+        """Skips the given number of cycles, as if draw was called for
+        each of them."""
+        raise NotImplementedError
+
+    def reseed(self, seed: int | None) -> None:
+        """Restarts the random arrivals from a new seed, e.g. so that a
+        forked buffer diverges. Models without randomness ignore it."""
+
+
+class BernoulliArrivals(ArrivalModel):
+    """
+    A part is ready on each cycle with probability p, independently.
+
+    Instead of one random number per cycle, the gaps between parts are
+    drawn from the equivalent geometric distribution in NumPy blocks,
+    so each cycle only counts down to the next part.
+
+    """
+
+    def __init__(
+        self, p: float, seed: int | None = None, block_size: int = BLOCK_SIZE
+    ) -> None:
+        if not 0 <= p <= 1:
+            raise ValueError(f"Arrival probability must be in [0, 1]: {p}")
+        self.p = p
+        self.rng = np.random.default_rng(seed)
+        self.block_size = block_size
+        self._gaps: list[int] = []
+        self._countdown = self._next_gap()
+
+    def _next_gap(self) -> float:
+        if self.p <= 0:
+            return inf
+        if not self._gaps:
+            self._gaps = self.rng.geometric(self.p, self.block_size).tolist()
+        return self._gaps.pop()
+
+    def draw(self) -> bool:
+        self._countdown -= 1
+        if self._countdown > 0:
+            return False
+        self._countdown = self._next_gap()
+        return True
+
+    def next_arrival(self) -> float:
+        return self._countdown
+
+    def reseed(self, seed: int | None) -> None:
+        """Draws the gap to the next part and those after it from the new
+        seed. The gaps are memoryless, so the one under way is redrawn."""
+        self.rng = np.random.default_rng(seed)
+        self._gaps = []
+        self._countdown = self._next_gap()
+
+    def advance(self, n_cycles: int) -> None:
+        while n_cycles >= self._countdown:
+            n_cycles -= self._countdown
+            self._countdown = self._next_gap()
+        self._countdown -= n_cycles
+
+
+class OutageModel:
+    """
+    Decides on which cycles the downstream cell is halted.
+
+    When a BufferSystem has an outage model it sets downstream_stoppage
+    from it at the start of every cycle, cycle 0 being the first one
+    after a reset. The scheduler wakes up on next_change.
+
+    """
+
+    def stopped(self, cycle: int) -> bool:
+        """Downstream cell is halted on the given cycle."""
+        raise NotImplementedError
+
+    def next_change(self, cycle: int) -> float:
+        """First cycle after the given one on which the downstream state
+        may change."""
+        raise NotImplementedError
+
+    def reseed(self, seed: int | None) -> None:
+        """Restarts the random outages from a new seed, e.g. so that a
+        forked buffer diverges. Models without randomness ignore it."""
+
+
+class RenewalOutages(OutageModel):
+    """
+    Alternating running and halted periods with random durations, the
+    downstream cell starting out running.
+
+    Subclasses provide the duration distributions through _sample. The
+    durations are drawn in NumPy blocks, and the cycles on which the
+    state changes are kept so any cycle can be looked up. Looking up
+    cycles in order only compares against the current period.
+
+    """
+
+    def __init__(
+        self, seed: int | None = None, block_size: int = BLOCK_SIZE
+    ) -> None:
+        self.rng = np.random.default_rng(seed)
+        self.block_size = block_size
+        self._changes: list[int] = []  # running until the first change
+        self._start, self._end, self._stopped = 0, 0, False
+
+    def _sample(self, stopped: bool, size: int) -> np.ndarray:
+        """Draws durations, in cycles, of halted or running periods."""
+        raise NotImplementedError
+
+    def reseed(self, seed: int | None) -> None:
+        """Keeps the periods up to the end of the current one, and draws
+        those after it from the new seed."""
+        self.rng = np.random.default_rng(seed)
+        del self._changes[bisect_right(self._changes, self._end):]
+        if len(self._changes) % 2:
+            # in a running period, _extend starts with a running one
+            self._changes.append(
+                self._end + int(self.sample_durations(True, 1)[0])
+            )
+
+    def sample_durations(self, stopped: bool, size: int) -> np.ndarray:
+        """Draws whole durations of at least one cycle."""
+        durations = np.ceil(self._sample(stopped, size))
+        return np.maximum(durations, 1).astype(np.int64)
+
+    def _extend(self) -> None:
+        durations = np.empty(2 * self.block_size, dtype=np.int64)
+        durations[0::2] = self.sample_durations(False, self.block_size)
+        durations[1::2] = self.sample_durations(True, self.block_size)
+        last = self._changes[-1] if self._changes else 0
+        self._changes.extend((last + np.cumsum(durations)).tolist())
+
+    def _locate(self, cycle: int) -> None:
+        while not self._changes or self._changes[-1] <= cycle:
+            self._extend()
+        i = bisect_right(self._changes, cycle)
+        self._start = self._changes[i - 1] if i else 0
+        self._end = self._changes[i]
+        self._stopped = i % 2 == 1
+
+    def stopped(self, cycle: int) -> bool:
+        if not self._start <= cycle < self._end:
+            self._locate(cycle)
+        return self._stopped
+
+    def next_change(self, cycle: int) -> float:
+        if not self._start <= cycle < self._end:
+            self._locate(cycle)
+        return self._end
+
+
+class ExponentialOutages(RenewalOutages):
+    """
+    Exponentially distributed running and halted periods, given the
+    mean time between failures and mean time to repair in cycles.
+
+    """
+
+    def __init__(
+        self, mtbf: float, mttr: float, seed: int | None = None,
+        block_size: int = BLOCK_SIZE
+    ) -> None:
+        if mtbf <= 0 or mttr <= 0:
+            raise ValueError("MTBF and MTTR must be positive.")
+        self.mtbf = mtbf
+        self.mttr = mttr
+        super().__init__(seed=seed, block_size=block_size)
+
+    def _sample(self, stopped: bool, size: int) -> np.ndarray:
+        return self.rng.exponential(self.mttr if stopped else self.mtbf, size)
+
+
+class WeibullOutages(RenewalOutages):
+    """
+    Weibull distributed running and halted periods, given the mean time
+    between failures and mean time to repair in cycles. A shape above 1
+    models wear-out failures, below 1 early-life failures, and 1 is the
+    exponential case. The repair shape defaults to the failure shape.
+
+    """
+
+    def __init__(
+        self, shape: float, mtbf: float, mttr: float,
+        repair_shape: float | None = None, seed: int | None = None,
+        block_size: int = BLOCK_SIZE
+    ) -> None:
+        if mtbf <= 0 or mttr <= 0:
+            raise ValueError("MTBF and MTTR must be positive.")
+        self.shape = shape
+        self.repair_shape = repair_shape or shape
+        self.mtbf = mtbf
+        self.mttr = mttr
+        # scale parameters giving the requested means
+        self._up_scale = mtbf / gamma(1 + 1 / self.shape)
+        self._down_scale = mttr / gamma(1 + 1 / self.repair_shape)
+        super().__init__(seed=seed, block_size=block_size)
+
+    def _sample(self, stopped: bool, size: int) -> np.ndarray:
+        if stopped:
+            return self.rng.weibull(self.repair_shape, size) * self._down_scale
+        return self.rng.weibull(self.shape, size) * self._up_scale
+
+
+class FaultLog(OutageModel):
+    """
+    Replays recorded downstream faults, given as (start, end) cycles
+    with the cell halted from start up to but not including end.
+
+    """
+
+    def __init__(self, faults: list[tuple[int, int]]) -> None:
+        self._changes: list[int] = []
+        for start, end in sorted(faults):
+            if start >= end or (self._changes and start < self._changes[-1]):
+                raise ValueError(
+                    f"Invalid or overlapping fault: {start}-{end}"
+                )
+            self._changes += [start, end]
+
+    @classmethod
+    def from_csv(cls, path: str) -> FaultLog:
+        """
+        Loads a fault log from a CSV file with 'start' and 'end' columns
+        in cycles. Lines starting with # are ignored.
+        """
+        with open(path, newline="") as file:
+            rows = csv.DictReader(
+                line for line in file if not line.startswith("#")
+            )
+            return cls([(int(row["start"]), int(row["end"])) for row in rows])
+
+    def stopped(self, cycle: int) -> bool:
+        return bisect_right(self._changes, cycle) % 2 == 1
+
+    def next_change(self, cycle: int) -> float:
+        i = bisect_right(self._changes, cycle)
+        return self._changes[i] if i < len(self._changes) else inf
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from math import sqrt
+from statistics import NormalDist
+
+import numpy as np
+
+from .buffer_system import CYCLES_PER_HOUR
+from .config import HORIZ_CONV_CAPACITY, INFLOW_PROBABILITY
+from .sweep import Outage
+from .vectorized import BufferBatch
+
+CYCLES_PER_MINUTE = CYCLES_PER_HOUR // 60
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    The requirement a buffer is sized for: with part inflow on at the
+    given probability, the downstream cell halts for outage_cycles and
+    upstream must not be blocked by upstream_inhibit before it restarts.
+
+    The outage begins once the carriage has come down from the top of
+    an empty buffer, where upstream starts out inhibited, and a further
+    warmup cycles have run.
+
+    """
+
+    outage_cycles: int
+    inflow_probability: float = INFLOW_PROBABILITY
+    conveyor_capacity: int = HORIZ_CONV_CAPACITY
+    warmup: int = 100
+
+    def outage_start(self, capacity: int) -> int:
+        return capacity // 2 + self.warmup
+
+
+def trial(
+    scenario: Scenario, config: int, capacity: int, n_replicas: int,
+    seed: int | list[int]
+) -> int:
+    """
+    Runs a batch of replicas through the scenario, aborting each one as
+    soon as upstream is blocked or it crashes.
+
+    Returns:
+        int: Number of replicas that made it through the outage.
+    """
+    start = scenario.outage_start(capacity)
+    end = start + scenario.outage_cycles
+    batch = BufferBatch(
+        n_replicas, capacity=capacity, config=config,
+        seed=np.random.SeedSequence(seed),
+        conveyor_capacity=scenario.conveyor_capacity,
+        inflow_probability=scenario.inflow_probability,
+        outages=Outage(every=end, duration=scenario.outage_cycles)
+    )
+    batch.part_inflow[:] = True
+
+    failed = np.zeros(n_replicas, dtype=bool)
+    batch.run(start)
+    for _ in range(scenario.outage_cycles):
+        failed |= batch.upstream_inhibit | batch.crashed
+        if failed.all():
+            break
+        # frozen like crashed replicas, they no longer change
+        batch.crashed |= failed
+        batch.step()
+    else:
+        failed |= batch.upstream_inhibit | batch.crashed
+    return int(n_replicas - failed.sum())
+
+
+@dataclass
+class Estimate:
+    """Successes out of trials, with a Wilson score interval for the
+    success probability."""
+
+    successes: int = 0
+    trials: int = 0
+
+    @property
+    def p(self) -> float:
+        return self.successes / self.trials if self.trials else 0.0
+
+    def interval(self, confidence: float = 0.95) -> tuple[float, float]:
+        if not self.trials:
+            return 0.0, 1.0
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        n, p = self.trials, self.p
+        center = (p + z * z / (2 * n)) / (1 + z * z / n)
+        spread = sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+        half = z * spread / (1 + z * z / n)
+        return max(0.0, center - half), min(1.0, center + half)
+
+
+@dataclass
+class Sizing:
+    """Outcome of the search for one configuration: the smallest
+    capacity meeting the target, if any in range, and the estimates of
+    every capacity tried."""
+
+    config: int
+    capacity: int | None
+    tried: dict[int, Estimate] = field(default_factory=dict)
+
+
+class CapacityOptimizer:
+    """
+    Finds the smallest buffer capacity meeting a scenario for each
+    configuration, by bisection over the even capacities in a range.
+
+    Each capacity is judged by sequential Monte Carlo: rounds of batches
+    run in parallel, each replica aborted as soon as upstream is
+    blocked, until the confidence interval of the success probability
+    lies entirely above the target (pass) or below it (fail). A capacity
+    still undecided after max_replicas fails, so the result errs on the
+    large side. Bisection assumes that a larger buffer never does
+    worse.
+
+    Args:
+        scenario (Scenario): Requirement to meet.
+        target (float): Probability of getting through the outage
+            without blocking upstream that a capacity must reach.
+        confidence (float): Confidence level of the intervals.
+        batch_size (int): Replicas per batch.
+        max_replicas (int): Replicas per capacity at most.
+        workers (int | None): Worker processes, all cores by default.
+        seed (int): Base seed, each batch derives its own from it.
+    """
+
+    def __init__(
+        self, scenario: Scenario, target: float = 0.99,
+        confidence: float = 0.95, batch_size: int = 256,
+        max_replicas: int = 16384, workers: int | None = None,
+        seed: int = 0
+    ) -> None:
+        self.scenario = scenario
+        self.target = target
+        self.confidence = confidence
+        self.batch_size = batch_size
+        self.max_replicas = max_replicas
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+
+    def evaluate(
+        self, executor: Executor, config: int, capacity: int
+    ) -> Estimate:
+        """Runs rounds of batches until the capacity passes or fails."""
+        estimate = Estimate()
+        n_batches = 0
+        while estimate.trials < self.max_replicas:
+            # one batch per worker and round
+            futures = [
+                executor.submit(
+                    trial, self.scenario, config, capacity, self.batch_size,
+                    [self.seed, config, capacity, n_batches + i]
+                )
+                for i in range(self.workers)
+            ]
+            n_batches += self.workers
+            for future in futures:
+                estimate.successes += future.result()
+                estimate.trials += self.batch_size
+            low, high = estimate.interval(self.confidence)
+            if low >= self.target or high < self.target:
+                break
+        return estimate
+
+    def passes(self, estimate: Estimate) -> bool:
+        return estimate.interval(self.confidence)[0] >= self.target
+
+    def search(
+        self, executor: Executor, config: int, min_capacity: int,
+        max_capacity: int
+    ) -> Sizing:
+        """Bisects the even capacities in the range for one config."""
+        sizing = Sizing(config=config, capacity=None)
+        low, high = min_capacity // 2, max_capacity // 2  # in pitches
+
+        def passes(pitches: int) -> bool:
+            capacity = 2 * pitches
+            estimate = self.evaluate(executor, config, capacity)
+            sizing.tried[capacity] = estimate
+            return self.passes(estimate)
+
+        if not passes(high):
+            return sizing
+        # the smallest passing capacity is always within [low, high]
+        while low < high:
+            middle = (low + high) // 2
+            if passes(middle):
+                high = middle
+            else:
+                low = middle + 1
+        sizing.capacity = 2 * high
+        return sizing
+
+    def run(
+        self, configs: list[int], min_capacity: int, max_capacity: int
+    ) -> list[Sizing]:
+        """
+        Sizes the buffer for each configuration.
+
+        Args:
+            configs (list[int]): Configurations to size.
+            min_capacity (int): Smallest capacity considered.
+            max_capacity (int): Largest capacity considered.
+
+        Returns:
+            list[Sizing]: One result per configuration.
+        """
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return [
+                self.search(executor, config, min_capacity, max_capacity)
+                for config in configs
+            ]
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import itertools
+from heapq import heapify, heappop, heappush, heapreplace
+from math import inf, log
+from typing import Callable
+
+from . import strategy
+from .buffer_system import BufferSystem
+
+# event priorities within a cycle, external state changes come first
+EXTERNAL = 0
+CONVEYOR = 1
+VERTICAL = 2
+TRANSFER = 3
+
+
+class EventScheduler:
+    """
+    Discrete-event driver for a BufferSystem.
+
+    Conveyor, vertical and transfer motions, as well as upstream and
+    downstream state changes, are events in a priority queue ordered by
+    (cycle, priority). Each transfer event schedules the next cycle's
+    conveyor event, normally on the following cycle. When the buffer is
+    quiescent the conveyor event is scheduled straight at the next
+    external event instead and the cycles in between are skipped:
+
+        Idle: the last cycle changed nothing and no part can arrive, so
+            nothing will change until an external event.
+
+        Pass-through: the tower is empty, the carriage is parked at
+            min_pos and the current logic never lifts a part, so the
+            horizontal conveyor is a plain shift register. Only the
+            part arrivals are simulated, by drawing the gaps between
+            them directly.
+
+    Changes of the buffer's outage model wake the scheduler like any
+    other external event.
+
+    With production stats attached to the buffer, idle stretches are
+    recorded in bulk, see ProductionStats.record_idle. Pass-through
+    stretches deliver parts on cycles that are never visited, so they
+    are run cycle by cycle instead to keep the KPIs exact.
+
+    With the original logic, pass-through happens in config 0 while the
+    downstream cell is running. Configs 1-3 lift every part into the
+    tower, so they only skip cycles while idle.
+
+    """
+
+    def __init__(self, buffer: BufferSystem) -> None:
+        self.buffer = buffer
+        self.cycle = 0  # next cycle to run
+        self.queue: list[tuple] = []
+        self._seq = itertools.count()  # keeps equal-time events in order
+        self._pass_through: dict[tuple, bool] = {}
+        self._strategy_revision = strategy.revision  # of the cache
+
+        self.events_processed = 0
+        self.cycles_skipped = 0
+
+    def schedule(
+        self, cycle: int, action: Callable[[BufferSystem], None]
+    ) -> None:
+        """
+        Schedules an external action, called with the buffer system
+        before the conveyor indexes on the given cycle.
+
+        Args:
+            cycle (int): Scheduler cycle to run the action on.
+            action (Callable[[BufferSystem], None]): State change to make.
+        """
+        heappush(self.queue, (cycle, EXTERNAL, next(self._seq), action))
+
+    def set_downstream(self, cycle: int, stopped: bool) -> None:
+        """Schedules the downstream cell to halt or resume."""
+        def action(buffer: BufferSystem) -> None:
+            buffer.downstream_stoppage = stopped
+        self.schedule(cycle, action)
+
+    def set_upstream(self, cycle: int, running: bool) -> None:
+        """Schedules part inflow from the upstream cell to pause or resume."""
+        def action(buffer: BufferSystem) -> None:
+            buffer.part_inflow = running
+        self.schedule(cycle, action)
+
+    def run(self, n_cycles: int) -> None:
+        """Processes events until the given number of cycles has passed."""
+        buffer = self.buffer
+        queue = self.queue
+        end = self.cycle + n_cycles
+        event = (self.cycle, CONVEYOR, next(self._seq), None)
+        if queue and queue[0] < event:
+            event = heapreplace(queue, event)
+        before = None
+
+        while event[0] < end:
+            cycle, priority, _, action = event
+            self.events_processed += 1
+
+            if priority == EXTERNAL:
+                action(buffer)
+                event = heappop(queue)
+                continue
+
+            if priority == CONVEYOR:
+                before = self._state()
+                buffer.cycle_conveyor()
+                event = (cycle, VERTICAL, next(self._seq), None)
+            elif priority == VERTICAL:
+                buffer.cycle_verticals()
+                event = (cycle, TRANSFER, next(self._seq), None)
+            else:
+                buffer.cycle_xfer_push()
+                event = (
+                    self._skip(cycle + 1, end, before), CONVEYOR,
+                    next(self._seq), None
+                )
+
+            # the next motion usually comes first, only go through the
+            # queue when an external event is due before it
+            if queue and queue[0] < event:
+                event = heapreplace(queue, event)
+
+        # keep the external events for the next run, the motions restart
+        # from the conveyor event of its first cycle
+        queue.append(event)
+        self.queue = [event for event in queue if event[1] == EXTERNAL]
+        heapify(self.queue)
+        self.cycle = end
+
+    def _state(self) -> tuple[int, int, int, int]:
+        buffer = self.buffer
+        return (
+            buffer.inlet.bits, buffer.outlet.bits,
+            buffer.conveyor.bits, buffer.xfer.position
+        )
+
+    def _skip(self, cycle: int, end: int, before: tuple | None) -> int:
+        """
+        Skips ahead if the buffer is quiescent.
+
+        Returns:
+            int: Cycle of the next conveyor event.
+        """
+        buffer = self.buffer
+        horizon = end
+        if self.queue and self.queue[0][0] < horizon:
+            horizon = self.queue[0][0]
+        if buffer.outages is not None:
+            # the outage model counts cycles from the buffer's last reset
+            change = buffer.outages.next_change(buffer.cycle_count - 1)
+            horizon = min(horizon, change + cycle - buffer.cycle_count)
+        n_cycles = horizon - cycle
+        if n_cycles <= 0:
+            return cycle
+
+        if before == self._state() and not self._arrival_possible():
+            if buffer.stats is not None:
+                # every skipped cycle starts as the last one ended
+                buffer.stats.record_idle(
+                    n_cycles,
+                    blocked=buffer.part_inflow and buffer.upstream_inhibit,
+                    starved=not buffer.downstream_stoppage,
+                    fill=buffer.inlet.part_count + buffer.outlet.part_count,
+                    position=buffer.xfer.position,
+                )
+            buffer.cycle_count += n_cycles
+            if buffer.arrivals is not None:
+                buffer.arrivals.advance(n_cycles)
+        elif buffer.stats is None and self._passes_through():
+            self._shift_conveyor(n_cycles)
+        else:
+            return cycle
+
+        self.cycles_skipped += n_cycles
+        return horizon
+
+    def _arrival_possible(self) -> bool:
+        buffer = self.buffer
+        if not buffer.part_inflow or buffer.upstream_inhibit:
+            return False
+        if buffer.arrivals is not None:
+            return buffer.arrivals.next_arrival() != inf
+        return buffer.inflow_probability > 0
+
+    def _passes_through(self) -> bool:
+        """Checks that no conveyor contents can make the tower move."""
+        buffer = self.buffer
+        if (
+            buffer.inlet.bits or buffer.outlet.bits
+            or buffer.xfer.position != buffer.min_pos
+            # a full infeed must not trip the upstream inhibit
+            or 2 * buffer.min_pos + buffer.outlet_pos >= buffer.capacity - 2
+        ):
+            return False
+
+        if self._strategy_revision != strategy.revision:
+            # a strategy was registered since, its table may have changed
+            self._pass_through.clear()
+            self._strategy_revision = strategy.revision
+        key = (buffer.config, buffer.min_pos, buffer.downstream_stoppage)
+        if key not in self._pass_through:
+            self._pass_through[key] = self._probe_strategy()
+        return self._pass_through[key]
+
+    def _probe_strategy(self) -> bool:
+        """Evaluates the vertical strategy with each combination of parts
+        at the bottom of the verticals: the inlet must never lift one,
+        and the outlet must never index down onto one."""
+        buffer = self.buffer
+        conveyor = buffer.conveyor
+        saved = conveyor.bits
+        inlet_bit = 1 << buffer.inlet_pos
+        outlet_bit = 1 << buffer.outlet_pos
+        try:
+            for bits in (inlet_bit, outlet_bit, inlet_bit | outlet_bit):
+                conveyor.bits = bits
+                inlet, outlet = buffer.vert_strategy
+                if (inlet and bits & inlet_bit) or (
+                    outlet and bits & outlet_bit
+                ):
+                    return False
+        finally:
+            conveyor.bits = saved
+        return True
+
+    def _shift_conveyor(self, n_cycles: int) -> None:
+        """Runs the horizontal conveyor alone for n_cycles, jumping from
+        one part arrival to the next."""
+        buffer = self.buffer
+        conveyor = buffer.conveyor
+        capacity, mask = conveyor.capacity, conveyor.mask
+        arrivals = buffer.arrivals
+        p = buffer.inflow_probability if buffer.part_inflow else 0
+        bits = conveyor.bits
+
+        remaining = n_cycles
+        while remaining:
+            if arrivals is None:
+                gap = _geometric(buffer.rng.random(), p)
+            else:
+                gap = arrivals.next_arrival() if buffer.part_inflow else inf
+            arrival = gap <= remaining
+            if not arrival:
+                gap = remaining
+            if arrivals is not None:
+                arrivals.advance(gap)
+            if gap >= capacity:
+                buffer.parts_out += bits.bit_count()
+                bits = 0
+            else:
+                shifted = bits << gap
+                buffer.parts_out += (shifted >> capacity).bit_count()
+                bits = shifted & mask
+            bits |= arrival
+            buffer.parts_in += arrival
+            remaining -= gap
+
+        conveyor.bits = bits
+        buffer.cycle_count += n_cycles
+
+
+def _geometric(u: float, p: float) -> float:
+    """Cycles up to and including the next arrival, drawn from a uniform
+    u in [0, 1) for an arrival probability p per cycle."""
+    if p >= 1:
+        return 1
+    if p <= 0:
+        return float("inf")
+    return 1 + int(log(1 - u) / log(1 - p))
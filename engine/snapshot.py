@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import math
+import pickle
+import struct
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .buffer_system import BufferSystem
+
+MAGIC = b"BSS1"
+# magic, capacities, config, flags, carriage position, speed, inflow
+# probability, cycle count, parts in and out, seed
+HEADER = struct.Struct("<4sHHBBHddQQQQ")
+# Mersenne Twister words and index, then the cached gauss value or NaN
+RNG_STATE = struct.Struct("<625Id")
+MODELS_SIZE = struct.Struct("<I")
+
+AUTORUN, DOWNSTREAM_STOPPAGE, PART_INFLOW = 1, 2, 4  # flag bits
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Full state of a BufferSystem, as packed by pack."""
+
+    capacity: int
+    conveyor_capacity: int
+    inflow_probability: float
+    config: int
+    autorun: bool
+    downstream_stoppage: bool
+    part_inflow: bool
+    position: int
+    speed: float
+    cycle_count: int
+    parts_in: int
+    parts_out: int
+    seed: int
+    conveyor: int
+    inlet: int
+    outlet: int
+    rng_state: tuple
+    models: tuple[Any, Any]  # arrival and outage models, or None
+
+
+def _bit_bytes(n_bits: int) -> int:
+    return (n_bits + 7) // 8
+
+
+def pack(buffer: BufferSystem) -> bytes:
+    """
+    Packs the state of a buffer system into bytes: a fixed header, the
+    conveyor, inlet and outlet bits, and the generator's state, about
+    2.5 kB in all. Arrival and outage models, if any, are appended
+    pickled, since they carry their own generators.
+
+    """
+    flags = (
+        AUTORUN * buffer.autorun
+        | DOWNSTREAM_STOPPAGE * buffer.downstream_stoppage
+        | PART_INFLOW * buffer.part_inflow
+    )
+    parts = [HEADER.pack(
+        MAGIC, buffer.capacity, buffer.conveyor_capacity, buffer.config,
+        flags, buffer.xfer.position, buffer.speed,
+        buffer.inflow_probability, buffer.cycle_count, buffer.parts_in,
+        buffer.parts_out, buffer.seed
+    )]
+
+    tower_bytes = _bit_bytes(buffer.inlet.capacity)
+    parts.append(buffer.conveyor.bits.to_bytes(
+        _bit_bytes(buffer.conveyor.capacity), "little"
+    ))
+    parts.append(buffer.inlet.bits.to_bytes(tower_bytes, "little"))
+    parts.append(buffer.outlet.bits.to_bytes(tower_bytes, "little"))
+
+    _, words, gauss = buffer.rng.getstate()
+    parts.append(RNG_STATE.pack(*words, math.nan if gauss is None else gauss))
+
+    models = (buffer.arrivals, buffer.outages)
+    blob = pickle.dumps(models) if any(m is not None for m in models) else b""
+    parts.append(MODELS_SIZE.pack(len(blob)))
+    parts.append(blob)
+    return b"".join(parts)
+
+
+def unpack(data: bytes | memoryview) -> Snapshot:
+    """Reads packed state, from any bytes-like object without copying
+    it first. Only unpack trusted data, the models are unpickled."""
+    data = memoryview(data)
+    (
+        magic, capacity, conveyor_capacity, config, flags, position, speed,
+        inflow_probability, cycle_count, parts_in, parts_out, seed
+    ) = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a buffer system snapshot.")
+
+    offset = HEADER.size
+    fields = []
+    for n_bits in (conveyor_capacity, capacity // 2, capacity // 2):
+        size = _bit_bytes(n_bits)
+        fields.append(int.from_bytes(data[offset:offset + size], "little"))
+        offset += size
+
+    *words, gauss = RNG_STATE.unpack_from(data, offset)
+    offset += RNG_STATE.size
+    rng_state = (3, tuple(words), None if math.isnan(gauss) else gauss)
+
+    (size,) = MODELS_SIZE.unpack_from(data, offset)
+    offset += MODELS_SIZE.size
+    models = (
+        pickle.loads(data[offset:offset + size]) if size else (None, None)
+    )
+
+    conveyor, inlet, outlet = fields
+    return Snapshot(
+        capacity=capacity,
+        conveyor_capacity=conveyor_capacity,
+        inflow_probability=inflow_probability,
+        config=config,
+        autorun=bool(flags & AUTORUN),
+        downstream_stoppage=bool(flags & DOWNSTREAM_STOPPAGE),
+        part_inflow=bool(flags & PART_INFLOW),
+        position=position,
+        speed=speed,
+        cycle_count=cycle_count,
+        parts_in=parts_in,
+        parts_out=parts_out,
+        seed=seed,
+        conveyor=conveyor,
+        inlet=inlet,
+        outlet=outlet,
+        rng_state=rng_state,
+        models=models,
+    )
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from .buffer_system import BufferSystem
+
+
+class StateCodec:
+    """
+    Packs the dynamic state of a BufferSystem into a single int and
+    loads it back, for exploring the logic one state at a time.
+
+    From the lowest bit up, a key holds the conveyor bits, the inlet and
+    outlet bits, the transfer carriage position and the downstream
+    stoppage and part inflow flags. Configuration and capacities are
+    fixed per codec and not part of the key.
+
+    Conveyor positions downstream of the outlet only carry parts off to
+    the downstream cell and never affect the logic, so they can be left
+    out of the key with downstream_conveyor=False. Every delivered part
+    is then counted once, on the cycle it sits at the outlet position.
+
+    """
+
+    def __init__(
+        self, buffer: BufferSystem, downstream_conveyor: bool = True
+    ) -> None:
+        self.buffer = buffer
+        conveyor_bits = buffer.conveyor.capacity
+        if not downstream_conveyor:
+            conveyor_bits = buffer.outlet_pos + 1
+        self.conveyor_mask = (1 << conveyor_bits) - 1
+
+        height = buffer.inlet.capacity
+        self._inlet_shift = conveyor_bits
+        self._outlet_shift = conveyor_bits + height
+        self._position_shift = conveyor_bits + 2 * height
+        self._flags_shift = (
+            self._position_shift + int(buffer.max_pos).bit_length()
+        )
+        self.bits = self._flags_shift + 2  # width of a key
+        self._tower_mask = (1 << height) - 1
+        self._position_mask = (1 << int(buffer.max_pos).bit_length()) - 1
+
+    def encode(self) -> int:
+        """Packs the buffer's current state."""
+        buffer = self.buffer
+        return (
+            (buffer.conveyor.bits & self.conveyor_mask)
+            | buffer.inlet.bits << self._inlet_shift
+            | buffer.outlet.bits << self._outlet_shift
+            | buffer.xfer.position << self._position_shift
+            | buffer.downstream_stoppage << self._flags_shift
+            | buffer.part_inflow << (self._flags_shift + 1)
+        )
+
+    def decode(self, key: int) -> None:
+        """Loads a packed state into the buffer."""
+        buffer = self.buffer
+        buffer.conveyor.bits = key & self.conveyor_mask
+        buffer.inlet.bits = key >> self._inlet_shift & self._tower_mask
+        buffer.outlet.bits = key >> self._outlet_shift & self._tower_mask
+        buffer.xfer.position = (
+            key >> self._position_shift & self._position_mask
+        )
+        buffer.downstream_stoppage = bool(key >> self._flags_shift & 1)
+        buffer.part_inflow = bool(key >> (self._flags_shift + 1) & 1)
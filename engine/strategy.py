@@ -0,0 +1,368 @@
+from __future__ import annotations
+
+import json
+import os
+import warnings
+from dataclasses import dataclass
+from typing import Mapping
+
+# the configurations shipped with the engine, one file each
+LOGIC_DIR = os.path.join(os.path.dirname(__file__), "logic")
+
+# sensor bits of the vertical strategy, named after the BufferSystem
+# properties they sample, packed into a sensor word in this order
+SENSORS = {
+    "part_at_inlet_bottom": 1,
+    "part_at_inlet_top": 2,
+    "part_at_outlet_top": 4,
+    "part_at_outlet_bottom": 8,
+    "xfer_at_max": 16,  # carriage at its uppermost position
+    "downstream_stoppage": 32,
+}
+WORDS = 1 << len(SENSORS)  # entries of a compiled table
+
+CONFIGS = range(10)  # configuration numbers, one per number key
+
+Rule = Mapping[str, bool]  # sensor states that must all hold
+
+# outlet logic, unchanged from the start: index down unless the
+# downstream cell is stopped or a part is in the way
+OUTLET_RULES: tuple[Rule, ...] = (
+    {"downstream_stoppage": False, "part_at_outlet_bottom": False},
+)
+
+
+@dataclass(frozen=True)
+class Strategy:
+    """
+    Logic of the vertical conveyors in one buffer configuration,
+    declared as rules over the sensor bits.
+
+    A conveyor indexes when any of its rules holds, and a rule holds
+    when every sensor it names is in the given state, the sensors it
+    leaves out do not matter. So the rules of a conveyor are an OR of
+    ANDs, e.g. the inlet of the original logic indexes unless a part
+    at its top would be lifted past the carriage at the top:
+
+        ({"part_at_inlet_top": False}, {"xfer_at_max": False})
+
+    Strategies are read from JSON files, see read_strategy.
+
+    Args:
+        name (str): Name of the configuration, e.g. its revision.
+        inlet (tuple[Rule, ...]): When the inlet indexes up.
+        outlet (tuple[Rule, ...]): When the outlet indexes down.
+        min_pos (int): Lowermost transfer position.
+        description (str): What the logic does and why.
+    """
+
+    name: str
+    inlet: tuple[Rule, ...]
+    outlet: tuple[Rule, ...] = OUTLET_RULES
+    min_pos: int = 2
+    description: str = ""
+
+    def __post_init__(self) -> None:
+        for rule in self.inlet + self.outlet:
+            unknown = set(rule) - set(SENSORS)
+            if unknown:
+                raise ValueError(
+                    f"Unknown sensor(s) {', '.join(sorted(unknown))} in "
+                    f"strategy {self.name!r}, expected one of "
+                    f"{', '.join(SENSORS)}"
+                )
+            if not all(isinstance(state, bool) for state in rule.values()):
+                raise ValueError(
+                    f"Sensor states must be true or false in strategy "
+                    f"{self.name!r}"
+                )
+        if self.min_pos < 1:
+            raise ValueError(
+                f"Lowermost transfer position must be at least 1 in "
+                f"strategy {self.name!r}"
+            )
+
+    def compile(self) -> tuple[tuple[bool, bool], ...]:
+        """
+        Evaluates the rules for every sensor word once.
+
+        Returns:
+            tuple[tuple[bool, bool], ...]: The inlet and outlet commands,
+                indexed by sensor word.
+        """
+        inlet, outlet = _masks(self.inlet), _masks(self.outlet)
+        return tuple(
+            (_holds(inlet, word), _holds(outlet, word))
+            for word in range(WORDS)
+        )
+
+
+def _masks(rules: tuple[Rule, ...]) -> list[tuple[int, int]]:
+    """The bits each rule tests and the values they must have."""
+    return [
+        (
+            sum(SENSORS[sensor] for sensor in rule),
+            sum(SENSORS[sensor] for sensor, state in rule.items() if state),
+        )
+        for rule in rules
+    ]
+
+
+def _holds(masks: list[tuple[int, int]], word: int) -> bool:
+    return any(word & tested == values for tested, values in masks)
+
+
+def sensor_word(
+    part_at_inlet_bottom: bool, part_at_inlet_top: bool,
+    part_at_outlet_top: bool, part_at_outlet_bottom: bool,
+    xfer_at_max: bool, downstream_stoppage: bool
+) -> int:
+    """Packs the sensor states into the index of a compiled table."""
+    return (
+        part_at_inlet_bottom
+        | part_at_inlet_top << 1
+        | part_at_outlet_top << 2
+        | part_at_outlet_bottom << 3
+        | xfer_at_max << 4
+        | downstream_stoppage << 5
+    )
+
+
+# the configurations, and their compiled tables looked up every cycle
+STRATEGIES: dict[int, Strategy] = {}
+TABLES: dict[int, tuple[tuple[bool, bool], ...]] = {}
+revision = 0  # counts registrations, for caches of what the tables do
+
+
+def register_strategy(config: int, strategy: Strategy) -> None:
+    """
+    Compiles a strategy and makes it available as a configuration,
+    replacing the strategy of that number if there is one. Buffers in
+    the configuration follow the new table from their next cycle.
+
+    Args:
+        config (int): Configuration number, 0 to 9.
+        strategy (Strategy): Logic of the configuration.
+    """
+    global revision
+    if config not in CONFIGS:
+        raise ValueError(f"Configuration must be 0 to 9, got {config}")
+    TABLES[config] = strategy.compile()
+    STRATEGIES[config] = strategy
+    revision += 1
+
+
+def get_strategy(config: int) -> Strategy:
+    """The strategy of a configuration, raises ValueError if none."""
+    try:
+        return STRATEGIES[config]
+    except KeyError:
+        raise ValueError(
+            f"No strategy for configuration {config}, defined: "
+            f"{', '.join(map(str, sorted(STRATEGIES)))}"
+        ) from None
+
+
+FIELDS = {
+    "config": int, "name": str, "inlet": list, "outlet": list,
+    "min_pos": int, "description": str,
+}
+REQUIRED = ("config", "name", "inlet")
+
+
+def read_strategy(path: str) -> tuple[int, Strategy]:
+    """
+    Reads and validates a strategy file, a JSON object such as:
+
+        {
+            "config": 1,
+            "name": "Original logic",
+            "inlet": [
+                {"part_at_inlet_top": false},
+                {"xfer_at_max": false}
+            ]
+        }
+
+    "config" is its number, 0 to 9. "outlet" defaults to OUTLET_RULES,
+    "min_pos" to 2 and "description" to none.
+
+    Returns:
+        tuple[int, Strategy]: The configuration number and its strategy.
+
+    Raises:
+        ValueError: The file is not a valid strategy, with the reason.
+    """
+    try:
+        with open(path) as file:
+            return parse_strategy(file.read())
+    except (OSError, ValueError) as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+def parse_strategy(text: str) -> tuple[int, Strategy]:
+    """Validates a strategy in the JSON of a strategy file, see
+    read_strategy, raises ValueError with the reason if invalid."""
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    missing = [key for key in REQUIRED if key not in data]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    for key, value in data.items():
+        expected = FIELDS.get(key)
+        if expected is None:
+            raise ValueError(f"unknown field {key!r}, expected one of "
+                             f"{', '.join(FIELDS)}")
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise ValueError(f"{key!r} must be of type "
+                             f"{expected.__name__}")
+    config = data.pop("config")
+    if config not in CONFIGS:
+        raise ValueError(f"config must be 0 to 9, got {config}")
+    for key in ("inlet", "outlet"):
+        if key in data:
+            if not all(isinstance(rule, dict) for rule in data[key]):
+                raise ValueError(f"{key!r} must be a list of objects "
+                                 "of sensor states")
+            data[key] = tuple(data[key])
+    return config, Strategy(**data)
+
+
+def dump_strategy(config: int, strategy: Strategy) -> str:
+    """The JSON of a strategy file declaring the strategy, compact."""
+    return json.dumps({
+        "config": config,
+        "name": strategy.name,
+        "inlet": [dict(rule) for rule in strategy.inlet],
+        "outlet": [dict(rule) for rule in strategy.outlet],
+        "min_pos": strategy.min_pos,
+        "description": strategy.description,
+    }, separators=(",", ":"))
+
+
+def strategy_files(directory: str) -> list[str]:
+    """The strategy files in a directory, in name order."""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith(".json")
+    )
+
+
+def load_strategies(directory: str) -> dict[int, Strategy]:
+    """
+    Reads every strategy file in a directory, without registering them.
+
+    Raises:
+        ValueError: A file is invalid, or two declare the same config.
+    """
+    strategies: dict[int, Strategy] = {}
+    sources: dict[int, str] = {}
+    for path in strategy_files(directory):
+        config, strategy = read_strategy(path)
+        if config in sources:
+            raise ValueError(f"{path}: config {config} is already defined "
+                             f"by {sources[config]}")
+        strategies[config] = strategy
+        sources[config] = path
+    return strategies
+
+
+def load_directory(directory: str) -> list[int]:
+    """
+    Validates and compiles every strategy file in a directory, then
+    registers them all, replacing those of the same numbers. Nothing is
+    registered if any file is invalid.
+
+    Returns:
+        list[int]: The configurations loaded.
+    """
+    strategies = load_strategies(directory)
+    tables = {
+        config: strategy.compile() for config, strategy in strategies.items()
+    }
+    global revision
+    TABLES.update(tables)
+    STRATEGIES.update(strategies)
+    revision += 1
+    return sorted(strategies)
+
+
+class StrategyWatcher:
+    """
+    Watches a directory of strategy files for changes by polling their
+    modification times, for hot reloading while a buffer runs.
+
+    The files present when the watcher is created are taken as loaded.
+    A file that fails validation is reported in `errors` and skipped,
+    so its configuration keeps the last strategy that loaded, until it
+    is saved again.
+
+    Args:
+        directory (str): Directory of strategy files.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.errors: list[str] = []  # files skipped by the last poll
+        self._stamps = self._scan()
+        self._configs: dict[str, int] = {}  # config declared by each file
+        for path in self._stamps:
+            try:
+                self._configs[path] = read_strategy(path)[0]
+            except ValueError:
+                pass
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        stamps = {}
+        for path in strategy_files(self.directory):
+            try:
+                stat = os.stat(path)
+            except OSError:  # removed since listed
+                continue
+            stamps[path] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def poll(self) -> dict[int, Strategy]:
+        """
+        Reads the files added or changed since the last poll.
+
+        Returns:
+            dict[int, Strategy]: The strategies read, not yet registered.
+        """
+        stamps = self._scan()
+        changed = [
+            path for path, stamp in stamps.items()
+            if self._stamps.get(path) != stamp
+        ]
+        for path in set(self._configs) - set(stamps):
+            del self._configs[path]  # removed, its config stays loaded
+        self._stamps = stamps
+
+        self.errors = []
+        strategies: dict[int, Strategy] = {}
+        for path in changed:
+            try:
+                config, strategy = read_strategy(path)
+                for other, other_config in self._configs.items():
+                    if other != path and other_config == config:
+                        raise ValueError(f"{path}: config {config} is "
+                                         f"already defined by {other}")
+            except ValueError as e:
+                self.errors.append(str(e))
+                continue
+            self._configs[path] = config
+            strategies[config] = strategy
+        return strategies
+
+
+def _load_shipped() -> None:
+    """Registers the shipped strategies file by file, a file that fails
+    to load is warned about and skipped rather than failing the import."""
+    for path in strategy_files(LOGIC_DIR):
+        try:
+            register_strategy(*read_strategy(path))
+        except ValueError as e:
+            warnings.warn(f"Skipped logic file {e}", stacklevel=2)
+
+
+_load_shipped()
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import itertools
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Iterable, Iterator
+
+from .buffer_system import CYCLES_PER_HOUR, BufferSystem
+from .exceptions import CrashError
+
+
+@dataclass(frozen=True)
+class Outage:
+    """
+    A repeating downstream outage pattern: the downstream cell is halted
+    for the last `duration` cycles of every `every` cycles. Can be used
+    as a BufferSystem outage model, see engine.models.OutageModel.
+
+    """
+
+    every: int
+    duration: int
+
+    def stopped(self, cycle: int) -> bool:
+        """Downstream cell is halted on the given cycle."""
+        return cycle % self.every >= self.every - self.duration
+
+    def next_change(self, cycle: int) -> int:
+        """First cycle after the given one on which the downstream state
+        may change."""
+        period_start = cycle - cycle % self.every
+        halt = period_start + self.every - self.duration
+        return halt if cycle < halt else period_start + self.every
+
+    def reseed(self, seed: int | None) -> None:
+        """The pattern has no randomness, see OutageModel.reseed."""
+
+    @classmethod
+    def parse(cls, text: str) -> Outage | None:
+        """Parses 'EVERY:DURATION' in cycles, or 'none' for no outages."""
+        if text.lower() == "none":
+            return None
+        every, duration = (int(value) for value in text.split(":"))
+        if not 0 < duration <= every:
+            raise ValueError(f"Invalid outage pattern: {text}")
+        return cls(every=every, duration=duration)
+
+    def __str__(self) -> str:
+        return f"{self.every}:{self.duration}"
+
+
+@dataclass(frozen=True)
+class SweepPoint:
+    """One simulation run of a parameter sweep."""
+
+    config: int
+    capacity: int
+    conveyor_capacity: int
+    inflow_probability: float
+    outage: Outage | None
+    replica: int
+    n_cycles: int
+    seed: int
+
+
+def grid(
+    configs: Iterable[int], capacities: Iterable[int],
+    conveyor_capacities: Iterable[int], probabilities: Iterable[float],
+    outages: Iterable[Outage | None], replicas: int, n_cycles: int,
+    seed: int = 0
+) -> list[SweepPoint]:
+    """
+    Builds the full grid of runs for a sweep.
+
+    Every run gets its own seed, derived from the base seed and the run's
+    parameters rather than its place in the grid, so a run gives the same
+    result no matter which other values are swept alongside it.
+
+    Returns:
+        list[SweepPoint]: One point per combination and replica.
+    """
+    points = []
+    for config, capacity, conveyor, p, outage, replica in itertools.product(
+        configs, capacities, conveyor_capacities, probabilities, outages,
+        range(replicas)
+    ):
+        key = repr((seed, config, capacity, conveyor, p, str(outage), replica))
+        points.append(SweepPoint(
+            config=config, capacity=capacity, conveyor_capacity=conveyor,
+            inflow_probability=p, outage=outage, replica=replica,
+            n_cycles=n_cycles, seed=zlib.crc32(key.encode())
+        ))
+    return points
+
+
+def simulate(point: SweepPoint) -> dict:
+    """
+    Runs a single sweep point headless with part inflow on.
+
+    A crash ends the run early, the message is kept in the 'crash'
+    column and 'cycles' holds the cycle it happened on.
+
+    Returns:
+        dict: One row of the results table.
+    """
+    buffer = BufferSystem(
+        capacity=point.capacity,
+        conveyor_capacity=point.conveyor_capacity,
+        inflow_probability=point.inflow_probability,
+        seed=point.seed,
+        outages=point.outage
+    )
+    buffer.set_config(point.config)
+    buffer.part_inflow = True
+
+    blocked = peak_fill = 0
+    crash = ""
+    try:
+        for _ in range(point.n_cycles):
+            blocked += buffer.upstream_inhibit
+            buffer.step()
+            fill = buffer.inlet.part_count + buffer.outlet.part_count
+            if fill > peak_fill:
+                peak_fill = fill
+    except CrashError as e:
+        crash = str(e)
+
+    row = asdict(point)
+    row["outage"] = str(point.outage)
+    row.update(
+        cycles=buffer.cycle_count,
+        parts_in=buffer.parts_in,
+        parts_out=buffer.parts_out,
+        blocked_cycles=blocked,
+        peak_fill=peak_fill,
+        crash=crash,
+    )
+    return row
+
+
+def run_sweep(
+    points: Iterable[SweepPoint], workers: int | None = None
+) -> Iterator[dict]:
+    """
+    Fans the runs out over a process pool using all cores by default,
+    yielding each result row as soon as it completes.
+
+    Args:
+        points (Iterable[SweepPoint]): Runs to simulate.
+        workers (int | None): Number of worker processes.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(simulate, point) for point in points]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+GROUP_KEYS = (
+    "config", "capacity", "conveyor_capacity", "inflow_probability", "outage"
+)
+
+
+def summarize(rows: Iterable[dict]) -> list[dict]:
+    """
+    Aggregates result rows over replicas.
+
+    Returns:
+        list[dict]: One row per swept combination, sorted by its keys,
+            with the mean parts/hour and blocked fraction, the largest
+            fill seen and the number of replicas that crashed.
+    """
+    groups: dict[tuple, list[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row[k] for k in GROUP_KEYS), []).append(row)
+
+    summary = []
+    for key in sorted(groups, key=str):
+        runs = groups[key]
+        cycles = sum(run["cycles"] for run in runs) or 1
+        summary.append(dict(
+            zip(GROUP_KEYS, key),
+            runs=len(runs),
+            parts_per_hour=(
+                sum(run["parts_out"] for run in runs) * CYCLES_PER_HOUR
+                / cycles
+            ),
+            blocked=sum(run["blocked_cycles"] for run in runs) / cycles,
+            peak_fill=max(run["peak_fill"] for run in runs),
+            crashes=sum(bool(run["crash"]) for run in runs),
+        ))
+    return summary
+
+
+def format_table(summary: list[dict]) -> str:
+    """Formats summarized rows as an aligned text table."""
+    header = (
+        "config", "capacity", "conveyor", "inflow", "outage", "runs",
+        "parts/h", "blocked", "peak fill", "crashes"
+    )
+    lines = [
+        (
+            str(row["config"]), str(row["capacity"]),
+            str(row["conveyor_capacity"]),
+            f"{row['inflow_probability']:.3g}", row["outage"],
+            str(row["runs"]), f"{row['parts_per_hour']:.1f}",
+            f"{row['blocked']:.2%}", str(row["peak_fill"]),
+            str(row["crashes"])
+        )
+        for row in summary
+    ]
+    widths = [
+        max(len(line[i]) for line in [header, *lines])
+        for i in range(len(header))
+    ]
+    return "\n".join(
+        "  ".join(cell.rjust(width) for cell, width in zip(line, widths))
+        for line in [header, *lines]
+    )
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import mmap
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from .buffer_system import BufferSystem
+from .exceptions import CrashError
+
+MAGIC = b"BST1"
+# magic, capacities, config, record size, index interval, record count,
+# offset of the index or 0 while the trace is being written
+HEADER = struct.Struct("<4sHHBxHIQQ")
+# per index entry: cycle count, parts in and out, flags of the block
+INDEX_ENTRY = struct.Struct("<QQQB7x")
+INDEX_DTYPE = np.dtype([
+    ("cycle_count", "<u8"),
+    ("parts_in", "<u8"),
+    ("parts_out", "<u8"),
+    ("flags", "u1"),
+], align=True)
+TAIL = struct.Struct("<HB")  # carriage position, flags
+
+UPSTREAM_INHIBIT, DOWNSTREAM_STOPPAGE, PART_INFLOW, CRASHED = 1, 2, 4, 8
+INDEX_INTERVAL = 4096  # records per index entry
+GROWTH = 1 << 16  # records the file grows by when full
+
+
+def _bit_bytes(n_bits: int) -> int:
+    return (n_bits + 7) // 8
+
+
+def record_dtype(conveyor_capacity: int, capacity: int) -> np.dtype:
+    """
+    Layout of a trace record: the conveyor, inlet and outlet bits as
+    little-endian bytes, bit i of a component in bit i % 8 of its byte
+    i // 8 like the bits attribute, then the carriage position and the
+    flags. About 25 bytes per cycle at the default capacities.
+
+    """
+    tower_bytes = _bit_bytes(capacity // 2)
+    return np.dtype([
+        ("conveyor", "u1", (_bit_bytes(conveyor_capacity),)),
+        ("inlet", "u1", (tower_bytes,)),
+        ("outlet", "u1", (tower_bytes,)),
+        ("position", "<u2"),
+        ("flags", "u1"),
+    ])
+
+
+@dataclass(frozen=True)
+class TraceState:
+    """One record of a trace, decoded."""
+
+    conveyor: int
+    inlet: int
+    outlet: int
+    position: int
+    flags: int
+
+    @property
+    def upstream_inhibit(self) -> bool:
+        return bool(self.flags & UPSTREAM_INHIBIT)
+
+    @property
+    def downstream_stoppage(self) -> bool:
+        return bool(self.flags & DOWNSTREAM_STOPPAGE)
+
+    @property
+    def part_inflow(self) -> bool:
+        return bool(self.flags & PART_INFLOW)
+
+    @property
+    def crashed(self) -> bool:
+        return bool(self.flags & CRASHED)
+
+
+class TraceWriter:
+    """
+    Records the state of a buffer system after every cycle to a trace
+    file, at a fixed record size so that any cycle can be found by its
+    offset. See record_dtype for the record layout.
+
+    Records are written through a memory map of the file, which grows
+    by GROWTH records at a time. Every `interval` records, an index
+    entry keeps the buffer's counters as of the first record and which
+    flags are set anywhere in the block, so readers can skip to the
+    next event without scanning. The index is appended on close, the
+    record count in the header is kept current every entry so that a
+    trace cut short is readable up to its last full block.
+
+    Args:
+        file (str): Path of the trace, overwritten.
+        buffer (BufferSystem): Buffer to record, sets the capacities.
+        interval (int): Records per index entry.
+    """
+
+    def __init__(
+        self, file: str, buffer: BufferSystem,
+        interval: int = INDEX_INTERVAL
+    ) -> None:
+        self.capacity = buffer.capacity
+        self.conveyor_capacity = buffer.conveyor_capacity
+        self.config = buffer.config
+        self.interval = interval
+        self.dtype = record_dtype(self.conveyor_capacity, self.capacity)
+        self.conveyor_bytes = self.dtype["conveyor"].itemsize
+        self.tower_bytes = self.dtype["inlet"].itemsize
+
+        self.count = 0
+        self.index: list[bytes] = []
+        self._block_counters = (0, 0, 0)
+        self._block_flags = 0
+
+        self.file = open(file, "w+b")
+        self.file.truncate(HEADER.size + GROWTH * self.dtype.itemsize)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self._write_header(index_offset=0)
+
+    def _write_header(self, index_offset: int) -> None:
+        HEADER.pack_into(
+            self.map, 0, MAGIC, self.conveyor_capacity, self.capacity,
+            self.config, self.dtype.itemsize, self.interval, self.count,
+            index_offset
+        )
+
+    def record(self, buffer: BufferSystem, crashed: bool = False) -> None:
+        """
+        Appends the state of the buffer.
+
+        Args:
+            buffer (BufferSystem): The buffer, after the cycle.
+            crashed (bool): The cycle raised a CrashError, the state is
+                as it was left.
+        """
+        flags = (
+            UPSTREAM_INHIBIT * buffer.upstream_inhibit
+            | DOWNSTREAM_STOPPAGE * buffer.downstream_stoppage
+            | PART_INFLOW * buffer.part_inflow
+            | CRASHED * crashed
+        )
+        if self.count % self.interval == 0:
+            self._start_block(buffer)
+        self._block_flags |= flags
+
+        size = self.dtype.itemsize
+        offset = HEADER.size + self.count * size
+        if offset + size > len(self.map):
+            self.map.resize(len(self.map) + GROWTH * size)
+        tower_bytes = self.tower_bytes
+        self.map[offset:offset + size] = b"".join((
+            buffer.conveyor.bits.to_bytes(self.conveyor_bytes, "little"),
+            buffer.inlet.bits.to_bytes(tower_bytes, "little"),
+            buffer.outlet.bits.to_bytes(tower_bytes, "little"),
+            TAIL.pack(buffer.xfer.position, flags),
+        ))
+        self.count += 1
+
+    def _start_block(self, buffer: BufferSystem) -> None:
+        self._end_block()
+        self._block_counters = (
+            buffer.cycle_count, buffer.parts_in, buffer.parts_out
+        )
+        self._block_flags = 0
+
+    def _end_block(self) -> None:
+        if self.count:
+            self.index.append(INDEX_ENTRY.pack(
+                *self._block_counters, self._block_flags
+            ))
+            self._write_header(index_offset=0)
+
+    def run(self, buffer: BufferSystem, n_cycles: int) -> None:
+        """
+        Runs cycles back to back like BufferSystem.run, recording each.
+        A crash is recorded too, then raised.
+
+        Args:
+            buffer (BufferSystem): The buffer to run.
+            n_cycles (int): Number of machine cycles to run.
+        """
+        step = buffer.step
+        record = self.record
+        for _ in range(n_cycles):
+            try:
+                step()
+            except CrashError:
+                record(buffer, crashed=True)
+                raise
+            record(buffer)
+
+    def close(self) -> None:
+        """Cuts the file down to the records and appends the index."""
+        self._end_block()
+        end = HEADER.size + self.count * self.dtype.itemsize
+        self._write_header(index_offset=end)
+        self.map.flush()
+        self.map.close()
+        self.file.truncate(end)
+        self.file.seek(end)
+        self.file.write(b"".join(self.index))
+        self.file.close()
+
+    def __enter__(self) -> TraceWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class TraceReader:
+    """
+    Reads a trace through a memory map, so opening it costs the same
+    however long it is and only the records used are ever loaded.
+
+    Indexing returns NumPy views of the records, see record_dtype, and
+    bits unpacks a range into one column per slot. The reader cannot be
+    closed while views of it are still referenced.
+
+    Args:
+        file (str): Path of a trace written by TraceWriter.
+    """
+
+    def __init__(self, file: str) -> None:
+        self.file = open(file, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic, self.conveyor_capacity, self.capacity, self.config,
+            record_size, self.interval, count, index_offset
+        ) = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError(f"Not a buffer trace: {file}")
+        self.dtype = record_dtype(self.conveyor_capacity, self.capacity)
+        if record_size != self.dtype.itemsize:
+            raise ValueError(f"Unexpected record size in {file}")
+
+        self.records = np.frombuffer(
+            self.map, dtype=self.dtype, count=count, offset=HEADER.size
+        )
+        if index_offset:
+            self.index = np.frombuffer(
+                self.map, dtype=INDEX_DTYPE, offset=index_offset,
+                count=-(-count // self.interval)
+            )
+            self.block_flags = self.index["flags"]
+        else:
+            # cut short, the flags are only ever read block by block
+            self.index = None
+            starts = np.arange(0, count, self.interval)
+            self.block_flags = np.bitwise_or.reduceat(
+                self.records["flags"], starts
+            ) if count else np.zeros(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, key: int | slice) -> np.ndarray:
+        return self.records[key]
+
+    def state(self, cycle: int) -> TraceState:
+        """Decodes the record of one cycle, counted from 0."""
+        record = self.records[cycle]
+        return TraceState(
+            conveyor=int.from_bytes(record["conveyor"].tobytes(), "little"),
+            inlet=int.from_bytes(record["inlet"].tobytes(), "little"),
+            outlet=int.from_bytes(record["outlet"].tobytes(), "little"),
+            position=int(record["position"]),
+            flags=int(record["flags"]),
+        )
+
+    def bits(
+        self, component: str, start: int = 0, stop: int | None = None
+    ) -> np.ndarray:
+        """
+        Unpacks the bits of a component over a range of cycles.
+
+        Args:
+            component (str): "conveyor", "inlet" or "outlet".
+            start (int): First cycle.
+            stop (int | None): Cycle after the last, by default the end.
+
+        Returns:
+            np.ndarray: Bool array of one row per cycle and one column
+                per slot, slot 0 first.
+        """
+        n_bits = (
+            self.conveyor_capacity if component == "conveyor"
+            else self.capacity // 2
+        )
+        packed = self.records[component][start:stop]
+        return np.unpackbits(
+            packed, axis=1, count=n_bits, bitorder="little"
+        ).astype(bool)
+
+    def find(
+        self, flags: int, start: int = 0, reverse: bool = False,
+        clear: bool = False
+    ) -> int | None:
+        """
+        Finds the next cycle from start, or the previous one if reverse,
+        with any of the given flags set, or with none of them if clear.
+        Looking for set flags skips the blocks without them using the
+        index.
+
+        Returns:
+            int | None: The cycle, or None if there is none.
+        """
+        count = len(self.records)
+        if not count:
+            return None
+        start = min(max(start, 0), count - 1)
+        interval = self.interval
+        first = start // interval
+        if reverse:
+            blocks = range(first, -1, -1)
+        else:
+            blocks = range(first, len(self.block_flags))
+        for block in blocks:
+            if not clear and not self.block_flags[block] & flags:
+                continue
+            low = block * interval
+            if reverse:
+                high = min(low + interval, start + 1)
+            else:
+                low, high = max(low, start), min(low + interval, count)
+            matches = self.records["flags"][low:high] & flags
+            hits = np.flatnonzero(matches == 0 if clear else matches)
+            if len(hits):
+                return low + int(hits[-1] if reverse else hits[0])
+        return None
+
+    def close(self) -> None:
+        self.records = self.index = self.block_flags = None
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self) -> TraceReader:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
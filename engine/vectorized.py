@@ -0,0 +1,326 @@
+from __future__ import annotations
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .config import BUFFER_CAPACITY, HORIZ_CONV_CAPACITY, INFLOW_PROBABILITY
+from .models import OutageModel, RenewalOutages
+from .snapshot import unpack
+from .strategy import TABLES, WORDS, get_strategy, sensor_word
+
+
+class BufferBatch:
+    """
+    N independent buffer systems simulated in lockstep with NumPy.
+
+    Every replica follows exactly the same logic as engine.BufferSystem,
+    but the state is held in arrays with one row per replica:
+        inlet, outlet:  N x (capacity / 2) booleans
+        conveyor:       N x conveyor_capacity booleans
+        position:       N transfer carriage positions
+
+    Each cycle method is evaluated for all replicas at once using masks
+    in place of the scalar engine's if statements. A replica that would
+    raise a crash exception in the scalar engine is flagged in `crashed`
+    instead and frozen for the rest of the run.
+
+    The batch also counts parts in/out and blocked cycles per replica,
+    which give the throughput and overflow probability distributions.
+
+    An outage model drives every replica's downstream cell. Random
+    (renewal) models give each replica its own independent outages,
+    any other model is followed by all replicas alike.
+
+    """
+
+    def __init__(
+        self, n_replicas: int, capacity: int = BUFFER_CAPACITY,
+        config: ArrayLike = 0, seed: int | None = None,
+        conveyor_capacity: int = HORIZ_CONV_CAPACITY,
+        inflow_probability: float = INFLOW_PROBABILITY,
+        outages: OutageModel | None = None
+    ) -> None:
+        self.n = n_replicas
+        self.capacity = capacity
+        self.conveyor_capacity = conveyor_capacity
+        self.inflow_probability = inflow_probability
+        self.max_pos = int(capacity / 2) - 1  # uppermost transfer position
+        self.rng = np.random.default_rng(seed)
+
+        self.inlet_pos = int(conveyor_capacity / 2) - 1
+        self.outlet_pos = int(conveyor_capacity / 2)
+
+        self._rows = np.arange(self.n)
+        self._slots = np.arange(int(capacity / 2))
+
+        self.downstream_stoppage = np.zeros(self.n, dtype=bool)
+        self.part_inflow = np.zeros(self.n, dtype=bool)
+        self.outages = outages
+
+        self.set_config(config)
+
+    @classmethod
+    def from_snapshot(
+        cls, data: bytes | memoryview, n_replicas: int,
+        seed: int | None = None, outages: OutageModel | None = None
+    ) -> BufferBatch:
+        """
+        Starts every replica from the state of one buffer system, saved
+        with BufferSystem.snapshot, e.g. to branch many runs from a
+        buffer warmed up once. The replicas draw their own arrivals from
+        there, and the counters start at zero.
+
+        Args:
+            data (bytes | memoryview): Packed state of a BufferSystem.
+            n_replicas (int): Number of replicas.
+            seed (int | None): Seed of the batch generator.
+            outages (OutageModel | None): Drives the downstream cells
+                from the snapshot on, instead of its flag.
+
+        Returns:
+            BufferBatch: The batch.
+        """
+        state = unpack(data)
+        batch = cls(
+            n_replicas, capacity=state.capacity, config=state.config,
+            seed=seed, conveyor_capacity=state.conveyor_capacity,
+            inflow_probability=state.inflow_probability, outages=outages
+        )
+        for array, bits in (
+            (batch.conveyor, state.conveyor),
+            (batch.inlet, state.inlet),
+            (batch.outlet, state.outlet),
+        ):
+            width = array.shape[1]
+            row = np.frombuffer(bits.to_bytes((width + 7) // 8, "little"),
+                                dtype=np.uint8)
+            array[:] = np.unpackbits(row, count=width, bitorder="little")
+        batch.position[:] = state.position
+        batch.part_inflow[:] = state.part_inflow
+        batch.downstream_stoppage[:] = state.downstream_stoppage
+        return batch
+
+    def build(self) -> None:
+        """Initializes the state arrays of every replica."""
+        shape = (self.n, int(self.capacity / 2))
+        self.inlet = np.zeros(shape, dtype=bool)
+        self.outlet = np.zeros(shape, dtype=bool)
+        self.conveyor = np.zeros(
+            (self.n, self.conveyor_capacity), dtype=bool
+        )
+        self.position = np.full(self.n, self.max_pos, dtype=np.int64)
+
+        self.crashed = np.zeros(self.n, dtype=bool)
+        self.crash_cycle = np.full(self.n, -1, dtype=np.int64)
+
+        self.cycle_count = 0
+        self.parts_in = np.zeros(self.n, dtype=np.int64)
+        self.parts_out = np.zeros(self.n, dtype=np.int64)
+        self.blocked_cycles = np.zeros(self.n, dtype=np.int64)
+
+        # per replica outage state when following a renewal model
+        self._outage_stopped = np.zeros(self.n, dtype=bool)
+        self._outage_change: np.ndarray | None = None
+
+    def reset_buffer(self) -> None:
+        self.build()
+
+    def set_config(self, config: ArrayLike) -> None:
+        """
+        Sets the configuration of every replica, either one number for
+        all of them or one per replica, then resets the batch.
+        Mirrors BufferSystem.set_config.
+
+        Args:
+            config (ArrayLike): New configuration number(s).
+        """
+        self.config = np.broadcast_to(
+            np.asarray(config, dtype=np.int64), (self.n,)
+        ).copy()
+        # the compiled strategy tables, one row per configuration number
+        configs = np.unique(self.config)
+        self.commands = np.zeros((configs.max() + 1, WORDS, 2), dtype=bool)
+        self.min_pos = np.zeros(self.n, dtype=np.int64)
+        for config in configs.tolist():
+            strategy = get_strategy(config)
+            self.commands[config] = TABLES[config]
+            self.min_pos[self.config == config] = strategy.min_pos
+
+        self.part_inflow[:] = False
+        self.downstream_stoppage[:] = False
+        self.reset_buffer()
+
+    def step(self) -> None:
+        """Runs one machine cycle on every replica that has not crashed."""
+        self.cycle_conveyor()
+        self.cycle_verticals()
+        self.cycle_xfer_push()
+
+    def run(self, n_cycles: int) -> None:
+        """Runs the given number of cycles on every replica."""
+        for _ in range(n_cycles):
+            self.step()
+
+    def draw_parts(self) -> np.ndarray:
+        """Rolls whether each replica's upstream cell has a part ready."""
+        return self.rng.random(self.n) < self.inflow_probability
+
+    def cycle_conveyor(self) -> None:
+        """Indexes the horizontal conveyor of every replica, loading a
+        new part where the upstream cell is running and not inhibited."""
+        if self.outages is not None:
+            self._apply_outages()
+
+        active = ~self.crashed
+        inhibit = self.upstream_inhibit
+        self.blocked_cycles += active & inhibit & self.part_inflow
+
+        new_part = (
+            self.draw_parts() & self.part_inflow & ~inhibit & active
+        )
+        self.parts_in += new_part
+        self.parts_out += active & self.conveyor[:, -1]
+
+        shifted = np.empty_like(self.conveyor)
+        shifted[:, 0] = new_part
+        shifted[:, 1:] = self.conveyor[:, :-1]
+        np.copyto(self.conveyor, shifted, where=active[:, None])
+        self.cycle_count += 1
+
+    def cycle_verticals(self) -> None:
+        """Indexes the vertical conveyors of every replica according
+        to its configuration."""
+        inlet_cycle, outlet_cycle = self.vert_strategy
+        self.index_inlet(inlet_cycle & ~self.crashed)
+        # an inlet crash stops the scalar engine before the outlet indexes
+        self.index_outlet(outlet_cycle & ~self.crashed)
+
+    def index_inlet(self, mask: np.ndarray) -> None:
+        """Indexes the inlet conveyors of the masked replicas upwards."""
+        move_up = mask & self.part_at_inlet_top & (
+            self.position < self.max_pos
+        )
+        self.position += move_up
+
+        above = (
+            self.inlet & (self._slots >= self.position[:, None])
+        ).any(axis=1)
+        self._crash(mask & above)
+        mask = mask & ~above
+
+        shifted = np.empty_like(self.inlet)
+        shifted[:, 0] = False
+        shifted[:, 1] = self.part_at_inlet_bottom
+        shifted[:, 2:] = self.inlet[:, 1:-1]
+        np.copyto(self.inlet, shifted, where=mask[:, None])
+        self.conveyor[mask, self.inlet_pos] = False
+
+    def index_outlet(self, mask: np.ndarray) -> None:
+        """Indexes the outlet conveyors of the masked replicas downwards."""
+        blocked = self.outlet[:, 0] | self.part_at_outlet_bottom
+        self._crash(mask & blocked)
+        mask = mask & ~blocked
+
+        self.conveyor[mask, self.outlet_pos] = self.outlet[mask, 1]
+        shifted = np.empty_like(self.outlet)
+        shifted[:, 0] = False
+        shifted[:, 1:-1] = self.outlet[:, 2:]
+        shifted[:, -1] = False
+        np.copyto(self.outlet, shifted, where=mask[:, None])
+
+    def cycle_xfer_push(self) -> None:
+        """Moves each carriage down one position if it sees no part,
+        then pushes a part where one is seen at the inlet but not the
+        outlet."""
+        active = ~self.crashed
+        move_down = active & (self.position > self.min_pos) & ~(
+            self.part_at_inlet_top | self.part_at_outlet_top
+        )
+        self.position -= move_down
+
+        push = active & self.part_at_inlet_top & ~self.part_at_outlet_top
+        rows, slots = self._rows[push], self.position[push]
+        self.outlet[rows, slots] = True
+        self.inlet[rows, slots] = False
+
+    def _apply_outages(self) -> None:
+        """Sets each replica's downstream state for the current cycle."""
+        model = self.outages
+        if not isinstance(model, RenewalOutages):
+            self.downstream_stoppage[:] = model.stopped(self.cycle_count)
+            return
+
+        if self._outage_change is None:
+            self._outage_change = model.sample_durations(False, self.n)
+
+        change = np.flatnonzero(self.cycle_count >= self._outage_change)
+        if change.size:
+            self._outage_stopped[change] ^= True
+            stopped = self._outage_stopped[change]
+            durations = np.empty(change.size, dtype=np.int64)
+            durations[stopped] = model.sample_durations(True, stopped.sum())
+            durations[~stopped] = model.sample_durations(
+                False, change.size - stopped.sum()
+            )
+            self._outage_change[change] += durations
+
+        self.downstream_stoppage[:] = self._outage_stopped
+
+    def _crash(self, mask: np.ndarray) -> None:
+        """Flags the masked replicas as crashed on the current cycle."""
+        self.crash_cycle[mask] = self.cycle_count
+        self.crashed |= mask
+
+    @property
+    def part_at_inlet_bottom(self) -> np.ndarray:
+        return self.conveyor[:, self.inlet_pos]
+
+    @property
+    def part_at_outlet_bottom(self) -> np.ndarray:
+        return self.conveyor[:, self.outlet_pos]
+
+    @property
+    def part_at_inlet_top(self) -> np.ndarray:
+        return self.inlet[self._rows, self.position]
+
+    @property
+    def part_at_outlet_top(self) -> np.ndarray:
+        return self.outlet[self._rows, self.position]
+
+    @property
+    def infeed_part_count(self) -> np.ndarray:
+        return self.conveyor[:, :self.outlet_pos].sum(axis=1)
+
+    @property
+    def upstream_inhibit(self) -> np.ndarray:
+        return (
+            2 * self.position + self.infeed_part_count
+        ) >= (self.capacity - 2)
+
+    @property
+    def fill(self) -> np.ndarray:
+        """Parts held in each buffer tower."""
+        return self.inlet.sum(axis=1) + self.outlet.sum(axis=1)
+
+    @property
+    def throughput(self) -> np.ndarray:
+        """Parts delivered downstream per cycle, per replica."""
+        return self.parts_out / max(self.cycle_count, 1)
+
+    @property
+    def overflow_probability(self) -> np.ndarray:
+        """Fraction of cycles each replica's upstream cell was blocked."""
+        return self.blocked_cycles / max(self.cycle_count, 1)
+
+    @property
+    def vert_strategy(self) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized BufferSystem.vert_strategy, returns the inlet and
+        outlet commands of every replica as two boolean arrays, looked
+        up in the same compiled tables as the scalar engine."""
+        word = sensor_word(
+            self.part_at_inlet_bottom, self.part_at_inlet_top,
+            self.part_at_outlet_top, self.part_at_outlet_bottom,
+            self.position >= self.max_pos, self.downstream_stoppage
+        )
+        commands = self.commands[self.config, word]
+        return commands[:, 0], commands[:, 1]
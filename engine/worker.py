@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import math
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable
+
+from .buffer_system import BASE_CYCLE_TIME, BufferSystem
+
+if TYPE_CHECKING:
+    from .journal import JournalWriter
+    from .kpi import ProductionStats
+
+# buffer methods run in turn by autorun, a third of a cycle apart
+PHASES = ("cycle_conveyor", "cycle_verticals", "cycle_xfer_push")
+MAX_LAG = 0.25  # seconds behind schedule before missed phases are dropped
+RATE_WINDOW = 1.0  # seconds the achieved rate is measured over, at least
+REALTIME_SPEED = 2048  # fastest speed run against the clock, 1 ms cycles
+MAX_SPEED = math.inf  # runs the cycles as fast as the CPU allows
+MAX_CHUNK = 64  # cycles run at max speed between checks for commands
+
+
+@dataclass(frozen=True)
+class Frame:
+    """
+    Immutable copy of everything drawn of a buffer system, published by
+    the worker for the render thread. The stats are a copy of the
+    buffer's too, taken when they last changed.
+
+    """
+
+    conveyor: int
+    inlet: int
+    outlet: int
+    position: int
+    config: int
+    speed: float
+    autorun: bool
+    downstream_stoppage: bool
+    part_inflow: bool
+    cycle_count: int
+    parts_in: int
+    parts_out: int
+    stats: ProductionStats | None
+    rate: float = 0.0  # cycles per second achieved by the worker
+    target_rate: float = 0.0  # cycles per second the speed asks for
+    cycles_per_frame: int = 0  # in time-warp, else 0
+
+    @classmethod
+    def capture(
+        cls, buffer: BufferSystem, stats: ProductionStats | None = None,
+        rate: float = 0.0, target_rate: float = 0.0,
+        cycles_per_frame: int = 0
+    ) -> Frame:
+        return cls(
+            conveyor=buffer.conveyor.bits,
+            inlet=buffer.inlet.bits,
+            outlet=buffer.outlet.bits,
+            position=buffer.xfer.position,
+            config=buffer.config,
+            speed=buffer.speed,
+            autorun=buffer.autorun,
+            downstream_stoppage=buffer.downstream_stoppage,
+            part_inflow=buffer.part_inflow,
+            cycle_count=buffer.cycle_count,
+            parts_in=buffer.parts_in,
+            parts_out=buffer.parts_out,
+            stats=stats,
+            rate=rate,
+            target_rate=target_rate,
+            cycles_per_frame=cycles_per_frame,
+        )
+
+
+class SimulationWorker:
+    """
+    Runs a buffer system in a background thread, so that the logic keeps
+    its own pace however long the frames take to draw.
+
+    While autorun is on, the worker runs the buffer in one of three
+    modes, depending on its speed multiplier:
+
+        Real time: up to REALTIME_SPEED, the conveyor, vertical and
+            transfer phases run a third of a cycle time apart, like the
+            timers of a real machine. Should the worker fall more than
+            MAX_LAG behind, the missed phases are dropped and the
+            achieved rate shows the shortfall.
+
+        Time-warp: above REALTIME_SPEED, the clock is simulated. Each
+            frame the render thread asks for advances the buffer by
+            cycles_per_frame whole cycles, as many as the speed fits in
+            a frame at frame_rate, so the display shows every k-th state
+            and the multiplier has no upper bound. Cycles slow down with
+            the frames if these take longer than planned.
+
+        Max: at MAX_SPEED, cycles run back to back as fast as the CPU
+            allows, in chunks of MAX_CHUNK between checks for commands
+            and frame requests.
+
+    Every other change to the buffer
+    is submitted as a command and run between phases, so the buffer is
+    only ever touched by the worker thread and needs no lock. Phases are
+    recorded to the journal, if one is given, before they are applied.
+
+    The render thread asks for a frame with request_frame. The worker
+    then publishes a new Frame as soon as the state differs from the
+    last one, by swapping the reference in `frame`, and calls on_frame.
+    Frames are immutable, so the render thread reads them while the
+    worker goes on, and are taken at most once per request, so high
+    speeds cost no more than the display rate in copies.
+
+    An exception raised by a phase or a command stops the worker, is
+    kept in `error` and on_frame is called to wake the render thread.
+
+    Args:
+        buffer (BufferSystem): The buffer to run.
+        journal (JournalWriter | None): Records the autorun phases.
+        on_frame (Callable[[], None] | None): Called from the worker
+            thread after each frame published.
+        frame_rate (float): Frames per second the render thread asks
+            for, sets the cycles per frame in time-warp.
+    """
+
+    def __init__(
+        self, buffer: BufferSystem, journal: JournalWriter | None = None,
+        on_frame: Callable[[], None] | None = None, frame_rate: float = 60
+    ) -> None:
+        self.buffer = buffer
+        self.journal = journal
+        self.on_frame = on_frame
+        self.frame_rate = frame_rate
+        self.error: Exception | None = None
+        self.cycles = 0  # cycles run by autorun
+
+        self._commands: queue.SimpleQueue[Callable[[], None]] = (
+            queue.SimpleQueue()
+        )
+        self._wake = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="simulation", daemon=True
+        )
+        self._stopping = False
+        self._wanted = False  # a frame was requested
+        self._changed = False  # state differs from the last frame
+        self._stats_changed = False  # stats too
+        self._phase = 0  # index of the next phase in PHASES
+        self._due = perf_counter()  # time the next phase is due
+        self._samples: deque[tuple[float, int]] = deque()  # time, cycles
+
+        self.frame = Frame.capture(
+            buffer, self._copy_stats(), target_rate=self.target_rate,
+            cycles_per_frame=self.cycles_per_frame
+        )
+        self.reset_timers()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the thread after the phase or command in progress."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def submit(self, command: Callable[[], None]) -> None:
+        """Runs a command on the worker thread, before the next phase."""
+        self._commands.put(command)
+        self._wake.set()
+
+    def request_frame(self) -> None:
+        """Asks for a frame as soon as the state differs from `frame`."""
+        self._wanted = True
+        self._wake.set()
+
+    def reset_timers(self) -> None:
+        """
+        Restarts the autorun cycle with the conveyor phase, one cycle
+        time from now. Is called from commands that change the buffer
+        config or cycle time, and never waits.
+        """
+        self._phase = 0
+        self._due = perf_counter() + self.buffer.cycle_time / 1000
+        self._samples.clear()
+
+    @property
+    def cycles_per_frame(self) -> int:
+        """Cycles run per frame in time-warp, 0 in the other modes."""
+        speed = self.buffer.speed
+        if speed <= REALTIME_SPEED or speed == MAX_SPEED:
+            return 0
+        cycles_per_second = speed * 1000 / BASE_CYCLE_TIME
+        return max(1, round(cycles_per_second / self.frame_rate))
+
+    @property
+    def target_rate(self) -> float:
+        """Cycles per second the speed asks for, inf at max speed."""
+        speed = self.buffer.speed
+        if speed == MAX_SPEED:
+            return math.inf
+        if speed <= REALTIME_SPEED:
+            return 1000 / self.buffer.cycle_time
+        return self.cycles_per_frame * self.frame_rate
+
+    def _run(self) -> None:
+        try:
+            while not self._stopping:
+                self._wake.wait(self._timeout())
+                self._wake.clear()
+                self._run_commands()
+                if self.buffer.autorun:
+                    self._run_autorun()
+                if self._wanted and self._changed:
+                    self._publish()
+        except Exception as error:
+            self.error = error
+            if self.on_frame is not None:
+                self.on_frame()
+
+    def _run_autorun(self) -> None:
+        speed = self.buffer.speed
+        if speed == MAX_SPEED:
+            self._run_cycles(MAX_CHUNK)
+        elif speed > REALTIME_SPEED:
+            if self._wanted:
+                self._run_cycles(self.cycles_per_frame)
+        else:
+            # catch up on every phase due, the render thread may have
+            # held the interpreter for a while
+            while perf_counter() >= self._due:
+                self._run_phase()
+                self._due += self.buffer.cycle_time / 3000
+                now = perf_counter()
+                if now - self._due > MAX_LAG:
+                    self._due = now
+
+    def _timeout(self) -> float | None:
+        """Seconds until the next phase is due, None while waiting for
+        a command or a frame request."""
+        if not self.buffer.autorun or self._stopping:
+            return None
+        speed = self.buffer.speed
+        if speed == MAX_SPEED:
+            return 0.0
+        if speed > REALTIME_SPEED:
+            return None
+        return max(0.0, self._due - perf_counter())
+
+    def _run_commands(self) -> None:
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            self._changed = self._stats_changed = True
+            command()
+
+    def _run_phase(self) -> None:
+        name = PHASES[self._phase]
+        self._changed = True
+        if self._phase == 0:
+            self._stats_changed = True
+            self.cycles += 1
+        if self.journal is not None:
+            self.journal.record(name)
+        getattr(self.buffer, name)()
+        self._phase = (self._phase + 1) % len(PHASES)
+
+    def _run_cycles(self, n_cycles: int) -> None:
+        """Runs whole cycles of phases back to back, starting from the
+        next phase so that a cycle begun in real time is completed."""
+        for _ in range(n_cycles * len(PHASES)):
+            self._run_phase()
+
+    def _copy_stats(self) -> ProductionStats | None:
+        stats = self.buffer.stats
+        return None if stats is None else stats.copy()
+
+    def _publish(self) -> None:
+        self._wanted = self._changed = False
+        stats = self.frame.stats
+        if self._stats_changed:
+            self._stats_changed = False
+            stats = self._copy_stats()
+        self.frame = Frame.capture(
+            self.buffer, stats, self._rate(), self.target_rate,
+            self.cycles_per_frame
+        )
+        if self.on_frame is not None:
+            self.on_frame()
+
+    def _rate(self) -> float:
+        """Cycles per second run by autorun over the last RATE_WINDOW,
+        or the last four cycles if these take longer."""
+        if not self.buffer.autorun:
+            self._samples.clear()
+            return 0.0
+        now = perf_counter()
+        samples = self._samples
+        samples.append((now, self.cycles))
+        window = max(RATE_WINDOW, 4 * self.buffer.cycle_time / 1000)
+        while now - samples[0][0] > window:
+            samples.popleft()
+        start, cycles = samples[0]
+        if now <= start:
+            return 0.0
+        return (self.cycles - cycles) / (now - start)
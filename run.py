@@ -1,29 +1,127 @@
+import argparse
+import cProfile
+import os
+import time
+
 import pygame
 
-from app import buffer, clock
-from app.buffer_system import BASE_CYCLE_TIME
-from app.colors import BG_COLOR
-from app.config import FPS, WINDOW
-from app.events import handle_event, reset_timers
-from app.ui import ui
+from app import clock
+from app.buffer_system import BufferSystem
+from app.config import FPS, JOURNAL_DIR, WINDOW
+from app.events import (RELOAD_EVENT, RELOAD_INTERVAL, handle_event,
+                        post_frame)
+from app.instrumentation import instrument_app
+from app.renderer import REDRAW_EVENTS, Renderer
+from app.ui import UserInterface
+from engine import buffer_system as logic
+from engine import instrumentation
+from engine.journal import JournalWriter
+from engine.kpi import ProductionStats
+from engine.strategy import LOGIC_DIR, StrategyWatcher, load_directory
+from engine.worker import SimulationWorker
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Runs the buffer simulation. Every session is recorded "
+        "to a journal that run_replay.py reconstructs headless."
+    )
+    journal = parser.add_mutually_exclusive_group()
+    journal.add_argument("--journal",
+                         help="file to record the session to (default: a "
+                         f"new file in {JOURNAL_DIR}/)")
+    journal.add_argument("--no-journal", action="store_true",
+                         help="do not record the session")
+    parser.add_argument("--logic", default=LOGIC_DIR, metavar="DIR",
+                        help="directory of logic files to load over the "
+                        "shipped ones and reload whenever one is saved "
+                        "(default: the shipped engine/logic)")
+    parser.add_argument("--profile", nargs="?", const="run.pstats",
+                        metavar="FILE",
+                        help="time the logic and drawing, print a summary "
+                        "on exit and save cProfile stats of the render "
+                        "thread to FILE (default: run.pstats). Setting "
+                        f"{instrumentation.ENV_VAR}=1 prints the summary "
+                        "only")
+    return parser.parse_args()
+
+
+def open_journal(
+    args: argparse.Namespace, buffer: logic.BufferSystem
+) -> JournalWriter | None:
+    if args.no_journal:
+        return None
+    path = args.journal
+    if path is None:
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        path = os.path.join(
+            JOURNAL_DIR, time.strftime("session-%Y%m%d-%H%M%S.journal")
+        )
+    return JournalWriter(path, buffer)
 
 
 def main() -> None:
 
-    reset_timers(BASE_CYCLE_TIME)
+    args = parse_args()
+    try:
+        if args.logic != LOGIC_DIR:
+            load_directory(args.logic)
+        watcher = StrategyWatcher(args.logic)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Cannot load the logic: {e}")
+    pygame.time.set_timer(RELOAD_EVENT, RELOAD_INTERVAL)
+
+    # the logic runs in the worker thread, the view shows its frames
+    buffer = logic.BufferSystem(stats=ProductionStats())
+    journal = open_journal(args, buffer)
+    worker = SimulationWorker(
+        buffer, journal, on_frame=post_frame, frame_rate=FPS
+    )
+    view = BufferSystem()
+    view.show(worker.frame)
+    ui = UserInterface(view)
+
+    profiler = None
+    if args.profile or instrumentation.env_enabled():
+        instrument_app()
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    start = time.perf_counter_ns()
+
+    worker.start()
+    renderer = Renderer(WINDOW, view, ui)
+    renderer.render()
+
+    try:
+        while True:
 
-    while True:
+            clock.tick(FPS)
+            worker.request_frame()
 
-        dt = clock.tick(FPS) / 1000.0
+            # sleep until the next input or frame from the worker
+            events = pygame.event.get() or [pygame.event.wait()]
 
-        for event in pygame.event.get():
-            print(event)
-            handle_event(event)
+            for event in events:
+                if event.type in REDRAW_EVENTS:
+                    renderer.invalidate()
+                handle_event(event, worker, watcher)
 
-        WINDOW.fill(BG_COLOR)
-        buffer.draw(WINDOW)
-        ui.draw(WINDOW)
-        pygame.display.update()
+            if worker.error is not None:
+                raise worker.error
+            view.show(worker.frame)
+            renderer.render()
+    finally:
+        # also keeps the journal of a session that crashed
+        worker.stop()
+        if journal is not None:
+            journal.close()
+        if profiler is not None:
+            profiler.disable()
+        if instrumentation.PROBES:
+            instrumentation.print_summary(
+                time.perf_counter_ns() - start, profiler, args.profile
+            )
 
 
 if __name__ == '__main__':
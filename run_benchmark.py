@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from engine import BufferSystem, CrashError
+from engine.config import BUFFER_CAPACITY
+from engine.strategy import STRATEGIES
+
+STARTUP_CODE = (
+    "import time; start = time.perf_counter(); import app.config; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Measures logic throughput, render frame rate and "
+        "startup time, saves them to JSON and compares them against a "
+        "baseline."
+    )
+    parser.add_argument("--configs", type=int, nargs="+",
+                        default=[0, 1, 2, 3], choices=sorted(STRATEGIES))
+    parser.add_argument("--capacities", type=int, nargs="+",
+                        default=[BUFFER_CAPACITY],
+                        help="total buffer tower capacities")
+    parser.add_argument("--cycles", type=int, default=20000,
+                        help="machine cycles per logic measurement")
+    parser.add_argument("--frames", type=int, default=300,
+                        help="frames per render measurement")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="measurements of each, the best one is kept")
+    parser.add_argument("--skip-render", action="store_true",
+                        help="only measure the headless logic")
+    parser.add_argument("-o", "--output", default="benchmark.json",
+                        help="file to save the results to")
+    parser.add_argument("--baseline",
+                        help="results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="relative slowdown reported as a regression")
+    return parser.parse_args()
+
+
+def result(value: float, unit: str, higher_is_better: bool) -> dict:
+    return {"value": value, "unit": unit,
+            "higher_is_better": higher_is_better}
+
+
+def bench_logic(config: int, capacity: int, n_cycles: int,
+                repeat: int) -> dict:
+    """Best cycles per second of a fresh seeded buffer with part inflow,
+    over the cycles run before it crashed if it did."""
+    best = 0.0
+    for _ in range(repeat):
+        buffer = BufferSystem(capacity=capacity, seed=0)
+        buffer.set_config(config)
+        buffer.part_inflow = True
+        start = time.perf_counter()
+        try:
+            buffer.run(n_cycles)
+        except CrashError:
+            pass
+        elapsed = time.perf_counter() - start
+        best = max(best, buffer.cycle_count / elapsed)
+    return result(best, "cycles/s", True)
+
+
+def bench_startup(repeat: int) -> dict[str, dict]:
+    """Best wall time of a fresh interpreter importing app.config, which
+    initializes pygame and opens the window, and of the import alone."""
+    best_process = best_import = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_CODE], check=True,
+            capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout
+        best_process = min(best_process, time.perf_counter() - start)
+        best_import = min(best_import, float(output.split()[-1]))
+    return {
+        "startup/process": result(best_process, "s", False),
+        "startup/import_app_config": result(best_import, "s", False),
+    }
+
+
+def bench_render(n_frames: int, repeat: int) -> dict[str, dict]:
+    """
+    Best frame rates of the render path: full redraws, then the dirty
+    rectangle frames of a running buffer with one cycle per frame.
+    """
+    import pygame
+
+    from app.buffer_system import BufferSystem
+    from app.config import WINDOW
+    from app.renderer import Renderer
+    from app.ui import UserInterface
+
+    buffer = BufferSystem()
+    ui = UserInterface(buffer)
+    buffer.rng.seed(0)
+    buffer.set_config(3)
+    buffer.part_inflow = True
+    buffer.run(300)  # some parts in the towers
+    renderer = Renderer(WINDOW, buffer, ui)
+
+    best_full = best_dirty = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n_frames):
+            renderer.invalidate()
+            renderer.render()
+        best_full = max(best_full, n_frames / (time.perf_counter() - start))
+
+        start = time.perf_counter()
+        for _ in range(n_frames):
+            buffer.step()
+            renderer.render()
+        best_dirty = max(best_dirty, n_frames / (time.perf_counter() - start))
+
+    size = "x".join(map(str, WINDOW.get_size()))
+    pygame.quit()
+    return {
+        f"render/full/{size}": result(best_full, "frames/s", True),
+        f"render/cycle/{size}": result(best_dirty, "frames/s", True),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Prints every measurement against the baseline and returns the
+    names of those that got slower by more than the tolerance."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<36}{current['value']:>14.4g}  (new)")
+            continue
+        change = current["value"] / previous["value"] - 1
+        slower = -change if current["higher_is_better"] else change
+        flag = ""
+        if slower > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<36}{current['value']:>14.4g}{previous['value']:>14.4g}"
+              f"{100 * change:>+9.1f}%{flag}")
+    return regressions
+
+
+def main() -> None:
+
+    args = parse_args()
+    results = {}
+    for capacity in args.capacities:
+        for config in args.configs:
+            results[f"logic/config={config}/capacity={capacity}"] = (
+                bench_logic(config, capacity, args.cycles, args.repeat)
+            )
+    if not args.skip_render:
+        # draw off screen, inherited by the startup subprocesses too
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        results.update(bench_startup(args.repeat))
+        results.update(bench_render(args.frames, args.repeat))
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cycles": args.cycles,
+            "frames": args.frames,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    if args.baseline is None:
+        for name, current in results.items():
+            print(f"{name:<36}{current['value']:>14.4g} {current['unit']}")
+        return
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+    print(f"{'benchmark':<36}{'current':>14}{'baseline':>14}{'change':>10}")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond "
+              f"{100 * args.tolerance:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
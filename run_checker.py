@@ -0,0 +1,54 @@
+import argparse
+import sys
+import time
+
+from engine.checker import ModelChecker
+from engine.config import BUFFER_CAPACITY, HORIZ_CONV_CAPACITY
+from engine.strategy import STRATEGIES
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Searches every arrival pattern and downstream outage "
+        "schedule for crashes and parts left at inaccessible slots, and "
+        "prints the shortest trace to each failure found."
+    )
+    parser.add_argument("--configs", type=int, nargs="+",
+                        default=[0, 1, 2, 3], choices=sorted(STRATEGIES))
+    parser.add_argument("--capacity", type=int, default=BUFFER_CAPACITY,
+                        help="total buffer tower capacity")
+    parser.add_argument("--conveyor-capacity", type=int,
+                        default=HORIZ_CONV_CAPACITY,
+                        help="horizontal conveyor capacity")
+    parser.add_argument("--max-states", type=int, default=5_000_000,
+                        help="stop after visiting this many states")
+    parser.add_argument("--max-depth", type=int,
+                        help="stop after this many cycles")
+    return parser.parse_args()
+
+
+def main() -> None:
+
+    args = parse_args()
+    failed = False
+    for config in args.configs:
+        start = time.perf_counter()
+        result = ModelChecker(
+            config, args.capacity, args.conveyor_capacity
+        ).run(max_states=args.max_states, max_depth=args.max_depth)
+        scope = "all" if result.exhaustive else "bounded search,"
+        print(
+            f"config {config}: {scope} {result.states} states to depth "
+            f"{result.depth} in {time.perf_counter() - start:.1f}s"
+        )
+        if not result.failures:
+            print("  no failures" if result.exhaustive
+                  else "  no failures within the bound")
+        for counterexample in result.failures.values():
+            print(counterexample.format())
+        failed = failed or bool(result.failures)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import os
+import re
+import time
+
+
+def resolution(value: str) -> str:
+    if not re.fullmatch(r"[1-9]\d*x[1-9]\d*", value.lower()):
+        raise argparse.ArgumentTypeError(
+            f"expected WIDTHxHEIGHT, e.g. 1280x720, got {value!r}"
+        )
+    return value.lower()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Exports a clip of a trace recorded by run_headless.py "
+        "--trace as the trace viewer draws it, rendered off screen by a "
+        "pool of processes, to a video through ffmpeg or to a directory "
+        "of images."
+    )
+    parser.add_argument("trace", help="trace file to export from")
+    parser.add_argument("output",
+                        help="video file to encode with ffmpeg (.avi, "
+                        ".mkv, .mov, .mp4 or .webm), or directory to write "
+                        "numbered images to")
+    parser.add_argument("--start", type=int, default=0, metavar="CYCLE",
+                        help="cycle shown by the first frame")
+    parser.add_argument("--duration", type=float, metavar="SECONDS",
+                        help="length of the clip (default: until the end "
+                        "of the trace)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="multiple of real time, negative to play in "
+                        "reverse")
+    parser.add_argument("--fps", type=float, default=30.0,
+                        help="frames per second of the clip")
+    parser.add_argument("--resolution", type=resolution, default="1920x1080",
+                        help="size of the frames as WIDTHxHEIGHT")
+    parser.add_argument("--format", default="png",
+                        choices=("png", "bmp", "tga", "jpg"),
+                        help="file type of an image sequence")
+    parser.add_argument("-j", "--workers", type=int,
+                        help="rendering processes (default: one per core)")
+    args = parser.parse_args()
+    if args.speed == 0 or args.fps <= 0:
+        parser.error("--speed must not be 0 and --fps must be positive")
+    return args
+
+
+def main() -> None:
+
+    args = parse_args()
+    # read by app.config on import, which draws to an off-screen surface
+    os.environ["BUFFERSIM_RESOLUTION"] = args.resolution
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    from app.config import SCREEN_HEIGHT, SCREEN_WIDTH
+    from app.export import VIDEO_SUFFIXES, Clip, export
+
+    if args.output.endswith(VIDEO_SUFFIXES) and (
+        SCREEN_WIDTH % 2 or SCREEN_HEIGHT % 2
+    ):
+        raise SystemExit("Video is encoded as yuv420p, which needs an even "
+                         "--resolution")
+    try:
+        clip = Clip.fit(args.trace, args.start, args.duration,
+                        args.speed, args.fps)
+    except ValueError as e:
+        raise SystemExit(e)
+    print(f"Exporting {clip.frames} frames ({clip.duration:.1f}s at "
+          f"{clip.fps:g} fps, {clip.cycles_per_frame:.3g} cycles/frame) "
+          f"at {args.resolution} to {args.output}")
+
+    start = time.perf_counter()
+    try:
+        export(clip, args.output, args.workers, args.format)
+    except RuntimeError as e:
+        raise SystemExit(e)
+    elapsed = time.perf_counter() - start
+    print(f"Exported in {elapsed:.1f}s, {clip.frames / elapsed:.0f} "
+          f"frames/s, {clip.duration / elapsed:.1f}x real time")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import cProfile
+import time
+
+from engine import BufferSystem, CrashError, instrumentation
+from engine.buffer_system import CYCLES_PER_HOUR
+from engine.config import INFLOW_PROBABILITY
+from engine.models import (BernoulliArrivals, ExponentialOutages, FaultLog,
+                           OutageModel, WeibullOutages)
+from engine.scheduler import EventScheduler
+from engine.strategy import STRATEGIES
+from engine.sweep import Outage
+from engine.trace import TraceWriter
+
+CYCLES_PER_MINUTE = CYCLES_PER_HOUR / 60
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Runs the buffer logic headless, as fast as possible."
+    )
+    length = parser.add_mutually_exclusive_group()
+    length.add_argument("-n", "--cycles", type=int, default=CYCLES_PER_HOUR,
+                        help="machine cycles to run (default: 1 hour)")
+    length.add_argument("--hours", type=float,
+                        help="line time to run, in hours of machine cycles")
+    parser.add_argument("-c", "--config", type=int, default=0,
+                        choices=sorted(STRATEGIES),
+                        help="buffer configuration")
+    parser.add_argument("--no-inflow", action="store_true",
+                        help="start with upstream part inflow paused")
+    parser.add_argument("--downstream-stoppage", action="store_true",
+                        help="start with the downstream cell halted")
+    parser.add_argument("--inflow", type=float, default=INFLOW_PROBABILITY,
+                        help="probability of a part arriving each cycle")
+    outages = parser.add_mutually_exclusive_group()
+    outages.add_argument("--outages", type=Outage.parse, default=None,
+                         help="repeating downstream outages as "
+                         "EVERY:DURATION in cycles")
+    outages.add_argument("--mtbf", type=float,
+                         help="random downstream outages with this mean "
+                         "time between failures, in minutes")
+    outages.add_argument("--fault-log",
+                         help="replay downstream faults from a CSV file "
+                         "with start and end columns in cycles")
+    parser.add_argument("--mttr", type=float, default=10,
+                        help="mean time to repair with --mtbf, in minutes")
+    parser.add_argument("--weibull", type=float, metavar="SHAPE",
+                        help="Weibull instead of exponential outage "
+                        "durations with --mtbf")
+    parser.add_argument("--event-driven", action="store_true",
+                        help="use the discrete-event scheduler, which "
+                        "skips quiescent cycles")
+    parser.add_argument("-r", "--replicas", type=int,
+                        help="run this many independent replicas at once "
+                        "with the NumPy batch engine")
+    parser.add_argument("--seed", type=int, help="seed for repeatable runs")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="record the state after every cycle to a "
+                        "trace file, see engine.trace")
+    parser.add_argument("--profile", nargs="?", const="headless.pstats",
+                        metavar="FILE",
+                        help="time the cycle functions, print a summary "
+                        "and save cProfile stats to FILE (default: "
+                        "headless.pstats). Not used with --replicas")
+    args = parser.parse_args()
+    if args.trace and (args.event_driven or args.replicas):
+        parser.error("--trace records a single buffer cycle by cycle, "
+                     "it cannot be used with --event-driven or --replicas")
+    return args
+
+
+def outage_model(args: argparse.Namespace) -> OutageModel | Outage | None:
+    """Builds the downstream outage model selected on the command line."""
+    seed = None if args.seed is None else args.seed + 1
+    if args.mtbf is not None:
+        mtbf = args.mtbf * CYCLES_PER_MINUTE
+        mttr = args.mttr * CYCLES_PER_MINUTE
+        if args.weibull is not None:
+            return WeibullOutages(args.weibull, mtbf, mttr, seed=seed)
+        return ExponentialOutages(mtbf, mttr, seed=seed)
+    if args.fault_log is not None:
+        return FaultLog.from_csv(args.fault_log)
+    return args.outages
+
+
+def run_batch(args: argparse.Namespace, n_cycles: int) -> None:
+    """Runs the replicas in lockstep and prints the distributions of
+    throughput and overflow probability across them."""
+    import numpy as np
+
+    from engine.vectorized import BufferBatch
+
+    batch = BufferBatch(
+        args.replicas, config=args.config, seed=args.seed,
+        inflow_probability=args.inflow, outages=outage_model(args)
+    )
+    batch.part_inflow[:] = not args.no_inflow
+    batch.downstream_stoppage[:] = args.downstream_stoppage
+
+    start = time.perf_counter()
+    batch.run(n_cycles)
+    elapsed = time.perf_counter() - start
+
+    replica_cycles = n_cycles * args.replicas
+    print(f"Config {args.config}: ran {args.replicas} replicas x "
+          f"{n_cycles} cycles in {elapsed:.2f}s "
+          f"({replica_cycles / max(elapsed, 1e-9):,.0f} cycles/s)")
+    print(f"Crashed replicas: {batch.crashed.sum()}")
+    percentiles = (5, 50, 95)
+    for name, values in (
+        ("Parts/hour", batch.throughput * CYCLES_PER_HOUR),
+        ("Overflow probability", batch.overflow_probability),
+    ):
+        p5, p50, p95 = np.percentile(values, percentiles)
+        print(f"{name}: mean {values.mean():.4g}, "
+              f"p5 {p5:.4g}, p50 {p50:.4g}, p95 {p95:.4g}")
+
+
+def main() -> None:
+
+    args = parse_args()
+    n_cycles = args.cycles
+    if args.hours is not None:
+        n_cycles = int(args.hours * CYCLES_PER_HOUR)
+
+    if args.replicas:
+        run_batch(args, n_cycles)
+        return
+
+    buffer = BufferSystem(
+        seed=args.seed,
+        arrivals=BernoulliArrivals(args.inflow, seed=args.seed),
+        outages=outage_model(args)
+    )
+    buffer.set_config(args.config)
+    buffer.part_inflow = not args.no_inflow
+    buffer.downstream_stoppage = args.downstream_stoppage
+
+    scheduler = None
+    trace = None
+    run = buffer.run
+    if args.event_driven:
+        scheduler = EventScheduler(buffer)
+        run = scheduler.run
+    elif args.trace:
+        trace = TraceWriter(args.trace, buffer)
+
+        def run(n_cycles: int) -> None:
+            trace.run(buffer, n_cycles)
+
+    profiler = None
+    if args.profile or instrumentation.env_enabled():
+        instrumentation.instrument_engine()
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    start = time.perf_counter()
+    try:
+        run(n_cycles)
+    except CrashError as e:
+        print(f"Crash at cycle {buffer.cycle_count}: {e}")
+        raise SystemExit(1)
+    finally:
+        if trace is not None:
+            trace.close()
+    elapsed = time.perf_counter() - start
+    if profiler is not None:
+        profiler.disable()
+
+    parts = sum(buffer.inlet.contents) + sum(buffer.outlet.contents)
+    print(f"Config {buffer.config}: ran {n_cycles} cycles "
+          f"({n_cycles / CYCLES_PER_HOUR:.1f} h) in {elapsed:.2f}s "
+          f"({n_cycles / max(elapsed, 1e-9):,.0f} cycles/s)")
+    print(f"Parts in buffer: {parts}, "
+          f"transfer position: {buffer.xfer.position}, "
+          f"upstream inhibited: {buffer.upstream_inhibit}")
+    print(f"Parts in: {buffer.parts_in}, parts out: {buffer.parts_out}")
+    if scheduler is not None:
+        print(f"Events processed: {scheduler.events_processed}, "
+              f"cycles skipped: {scheduler.cycles_skipped}")
+    if instrumentation.PROBES:
+        instrumentation.print_summary(
+            int(elapsed * 1e9), profiler, args.profile
+        )
+
+
+if __name__ == '__main__':
+    main()
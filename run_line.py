@@ -0,0 +1,99 @@
+import argparse
+import time
+
+from engine import BufferSystem
+from engine.buffer_system import BASE_CYCLE_TIME
+from engine.config import BUFFER_CAPACITY, HORIZ_CONV_CAPACITY
+from engine.line import Cell, Line, Tower
+from engine.models import ExponentialOutages
+from engine.strategy import STRATEGIES
+
+MS_PER_HOUR = 3600 * 1000
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Runs a line of processing cells with buffer towers "
+        "between them headless: a source cell, then a tower and a cell "
+        "for each tower."
+    )
+    parser.add_argument("-t", "--towers", type=int, default=3,
+                        help="buffer towers in the line")
+    parser.add_argument("--capacity", type=int, default=BUFFER_CAPACITY,
+                        help="total capacity of each tower")
+    parser.add_argument("-c", "--config", type=int, default=3,
+                        choices=sorted(STRATEGIES), help="tower configuration")
+    parser.add_argument("--segment-capacity", type=int,
+                        default=HORIZ_CONV_CAPACITY,
+                        help="parts each conveyor segment between stages "
+                        "holds")
+    parser.add_argument("--source-time", type=int, default=2800,
+                        help="cycle time of the first cell, in ms")
+    parser.add_argument("--cell-time", type=int, default=BASE_CYCLE_TIME,
+                        help="cycle time of the other cells, in ms")
+    parser.add_argument("--mtbf", type=float,
+                        help="random outages of the cells after the "
+                        "source with this mean time between failures, "
+                        "in minutes")
+    parser.add_argument("--mttr", type=float, default=10,
+                        help="mean time to repair with --mtbf, in minutes")
+    parser.add_argument("--hours", type=float, default=8,
+                        help="line time to run")
+    parser.add_argument("--seed", type=int, help="seed for repeatable runs")
+    return parser.parse_args()
+
+
+def build_line(args: argparse.Namespace) -> Line:
+    line = Line()
+    line.add(Cell("source", args.source_time))
+    for i in range(args.towers):
+        seed = None if args.seed is None else args.seed + 2 * i
+        buffer = BufferSystem(capacity=args.capacity, seed=seed)
+        buffer.set_config(args.config)
+        line.add(Tower(f"tower {i + 1}", buffer), args.segment_capacity)
+
+        outages = None
+        if args.mtbf is not None:
+            cycles_per_minute = 60 * 1000 / args.cell_time
+            outages = ExponentialOutages(
+                args.mtbf * cycles_per_minute, args.mttr * cycles_per_minute,
+                seed=None if seed is None else seed + 1
+            )
+        line.add(Cell(f"cell {i + 1}", args.cell_time, outages),
+                 args.segment_capacity)
+    return line
+
+
+def main() -> None:
+
+    args = parse_args()
+    line = build_line(args)
+
+    start = time.perf_counter()
+    line.run(int(args.hours * MS_PER_HOUR))
+    elapsed = time.perf_counter() - start
+
+    cycles = sum(stage.cycles for stage in line.stages)
+    print(f"{len(line.stages)} stages, {args.hours:g} h of line time "
+          f"in {elapsed:.2f}s ({cycles / max(elapsed, 1e-9):,.0f} "
+          "stage cycles/s)")
+    print(f"{'stage':<10}{'cycle ms':>9}{'parts in':>10}{'parts out':>10}"
+          f"{'blocked':>9}{'starved':>9}{'down':>9}{'fill':>6}")
+    for stage in line.stages:
+        row = (f"{stage.name:<10}{stage.cycle_time:>9}"
+               f"{stage.parts_in:>10}{stage.parts_out:>10}")
+        if isinstance(stage, Cell):
+            for count in (stage.blocked_cycles, stage.starved_cycles,
+                          stage.down_cycles):
+                row += f"{count / max(stage.cycles, 1):>9.1%}"
+        else:
+            stats = f"{stage.fill:>33}"
+            if stage.overflows:
+                stats += f"  {stage.overflows} overflows"
+            row += stats
+        print(row)
+    print(f"Line output: {line.parts_out / args.hours:.0f} parts/hour")
+
+
+if __name__ == '__main__':
+    main()
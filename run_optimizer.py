@@ -0,0 +1,83 @@
+import argparse
+import time
+
+from engine.config import HORIZ_CONV_CAPACITY
+from engine.optimizer import CYCLES_PER_MINUTE, CapacityOptimizer, Scenario
+from engine.strategy import STRATEGIES
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Finds the smallest buffer capacity for each "
+        "configuration that rides out a downstream outage without "
+        "blocking upstream."
+    )
+    parser.add_argument("--configs", type=int, nargs="+",
+                        default=[0, 1, 2, 3], choices=sorted(STRATEGIES))
+    parser.add_argument("--outage", type=float, default=20,
+                        help="downstream outage to ride out, in minutes")
+    parser.add_argument("--inflow", type=float, default=0.67,
+                        help="probability of a part arriving each cycle")
+    parser.add_argument("--conveyor-capacity", type=int,
+                        default=HORIZ_CONV_CAPACITY)
+    parser.add_argument("--target", type=float, default=0.99,
+                        help="required probability that upstream is never "
+                        "blocked during the outage")
+    parser.add_argument("--confidence", type=float, default=0.95,
+                        help="confidence level of the intervals")
+    parser.add_argument("--min-capacity", type=int, default=10)
+    parser.add_argument("--max-capacity", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=256,
+                        help="replicas per batch")
+    parser.add_argument("--max-replicas", type=int, default=16384,
+                        help="replicas per capacity at most")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="base seed")
+    return parser.parse_args()
+
+
+def main() -> None:
+
+    args = parse_args()
+    scenario = Scenario(
+        outage_cycles=int(args.outage * CYCLES_PER_MINUTE),
+        inflow_probability=args.inflow,
+        conveyor_capacity=args.conveyor_capacity,
+    )
+    optimizer = CapacityOptimizer(
+        scenario, target=args.target, confidence=args.confidence,
+        batch_size=args.batch, max_replicas=args.max_replicas,
+        workers=args.workers, seed=args.seed
+    )
+    print(f"Sizing for a {args.outage:g} min outage "
+          f"({scenario.outage_cycles} cycles) at inflow {args.inflow:g}, "
+          f"P(upstream never blocked) >= {args.target:g} at "
+          f"{args.confidence:.0%} confidence")
+
+    start = time.perf_counter()
+    for sizing in optimizer.run(
+        args.configs, args.min_capacity, args.max_capacity
+    ):
+        if sizing.capacity is None:
+            print(f"Config {sizing.config}: not met up to capacity "
+                  f"{args.max_capacity}")
+        else:
+            print(f"Config {sizing.config}: minimal capacity "
+                  f"{sizing.capacity}")
+        for capacity, estimate in sorted(sizing.tried.items()):
+            low, high = estimate.interval(args.confidence)
+            if optimizer.passes(estimate):
+                verdict = "pass"
+            elif high >= args.target:
+                verdict = "undecided, counted as fail"
+            else:
+                verdict = "fail"
+            print(f"  capacity {capacity:5d}: {estimate.successes}/"
+                  f"{estimate.trials} through, p = {estimate.p:.4f} "
+                  f"[{low:.4f}, {high:.4f}] {verdict}")
+    print(f"Searched in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import argparse
+
+import pygame
+
+from app import clock
+from app.buffer_system import BufferSystem
+from app.config import FPS, HORIZ_CONV_CAPACITY, WINDOW
+from app.playback import Playback, handle_playback_event
+from app.renderer import REDRAW_EVENTS, Renderer
+from app.ui import PlaybackInterface
+from engine.trace import TraceReader
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Plays back a trace recorded by run_headless.py "
+        "--trace, with seeking, forward and reverse play at any speed "
+        "and jumps to crashes and upstream inhibits."
+    )
+    parser.add_argument("trace", help="trace file to play back")
+    parser.add_argument("--speed", type=float, default=16.0,
+                        help="initial multiple of real time, negative "
+                        "to play in reverse")
+    parser.add_argument("--start", type=int, default=0, metavar="CYCLE",
+                        help="cycle to start from")
+    parser.add_argument("--paused", action="store_true",
+                        help="start paused")
+    return parser.parse_args()
+
+
+def main() -> None:
+
+    args = parse_args()
+    with TraceReader(args.trace) as trace:
+        if not len(trace):
+            raise SystemExit(f"{args.trace} holds no cycles")
+        if trace.conveyor_capacity != HORIZ_CONV_CAPACITY:
+            raise SystemExit(
+                f"{args.trace} has a conveyor of {trace.conveyor_capacity} "
+                f"parts, the display draws {HORIZ_CONV_CAPACITY}"
+            )
+
+        buffer = BufferSystem(capacity=trace.capacity)
+        buffer.config = trace.config
+        playback = Playback(trace, speed=args.speed)
+        playback.seek(args.start)
+        playback.playing = not args.paused
+
+        ui = PlaybackInterface(playback)
+        renderer = Renderer(WINDOW, buffer, ui)
+        buffer.show_record(playback.state())
+        renderer.render()
+
+        while True:
+
+            elapsed = clock.tick(FPS)
+
+            # while paused, nothing changes until the next event
+            events = pygame.event.get()
+            if not events and not playback.playing:
+                events = [pygame.event.wait()]
+                clock.tick()  # the wait is no playing time
+
+            for event in events:
+                if event.type in REDRAW_EVENTS:
+                    renderer.invalidate()
+                handle_playback_event(event, playback, ui.playback_block)
+
+            playback.advance(elapsed)
+            buffer.show_record(playback.state())
+            renderer.render()
+
+
+if __name__ == '__main__':
+    main()
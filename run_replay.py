@@ -0,0 +1,64 @@
+import argparse
+import sys
+import time
+from itertools import islice
+
+from engine.journal import expand_runs, read_journal, replay
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Reconstructs a recorded session headless and reports "
+        "where it crashed, or its state at a given cycle."
+    )
+    parser.add_argument("journal", help="session journal recorded by run.py")
+    parser.add_argument("--until", type=int, metavar="CYCLE",
+                        help="stop before this machine cycle of the "
+                        "session and show the state there")
+    parser.add_argument("--list", action="store_true",
+                        help="list the journaled actions replayed")
+    return parser.parse_args()
+
+
+def main() -> None:
+
+    args = parse_args()
+    header, records = read_journal(args.journal)
+    print(
+        f"seed {header.seed}, capacity {header.capacity}, conveyor "
+        f"{header.conveyor_capacity}, config {header.config}, "
+        f"{len(records)} records"
+    )
+
+    start = time.perf_counter()
+    result = replay(header, records, until_cycle=args.until)
+    elapsed = time.perf_counter() - start
+
+    if args.list:
+        listed = result.applied + bool(result.crash)
+        for record in islice(expand_runs(records), listed):
+            argument = record.argument if record.action.startswith("set_") \
+                else ""
+            if record.strategy is not None:
+                argument = f"{record.argument} {record.strategy.name}"
+            print(f"{record.cycle:9d}  {record.action} {argument}".rstrip())
+
+    buffer = result.buffer
+    print(f"replayed {result.applied} actions, {result.cycle} cycles "
+          f"in {elapsed:.2f}s")
+    print(
+        f"config {buffer.config}, carriage at {buffer.xfer.position}, "
+        f"inlet {buffer.inlet.part_count}, outlet {buffer.outlet.part_count}, "
+        f"conveyor {buffer.conveyor.bits.bit_count()} parts, "
+        f"autorun {buffer.autorun}, inflow {buffer.part_inflow}, "
+        f"downstream stopped {buffer.downstream_stoppage}"
+    )
+    if result.crash:
+        record = result.crash_record
+        print(f"crashed on cycle {record.cycle} during {record.action}: "
+              f"{result.crash}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import csv
+import sys
+import time
+
+from engine.buffer_system import CYCLES_PER_HOUR
+from engine.config import (BUFFER_CAPACITY, HORIZ_CONV_CAPACITY,
+                           INFLOW_PROBABILITY)
+from engine.strategy import STRATEGIES
+from engine.sweep import (Outage, format_table, grid, run_sweep,
+                          summarize)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Sweeps buffer configurations and parameters headless "
+        "across all cores."
+    )
+    parser.add_argument("--configs", type=int, nargs="+",
+                        default=[0, 1, 2, 3], choices=sorted(STRATEGIES))
+    parser.add_argument("--capacities", type=int, nargs="+",
+                        default=[BUFFER_CAPACITY],
+                        help="total buffer tower capacities")
+    parser.add_argument("--conveyor-capacities", type=int, nargs="+",
+                        default=[HORIZ_CONV_CAPACITY],
+                        help="horizontal conveyor capacities")
+    parser.add_argument("--probabilities", type=float, nargs="+",
+                        default=[INFLOW_PROBABILITY],
+                        help="part inflow probabilities per cycle")
+    parser.add_argument("--outages", type=Outage.parse, nargs="+",
+                        default=[None],
+                        help="downstream outage patterns as EVERY:DURATION "
+                        "in cycles, or 'none'")
+    parser.add_argument("--replicas", type=int, default=1,
+                        help="seeded runs per combination")
+    parser.add_argument("--hours", type=float, default=8,
+                        help="line time per run, in hours of machine cycles")
+    parser.add_argument("--seed", type=int, default=0, help="base seed")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--csv", help="file to stream every run's row to")
+    return parser.parse_args()
+
+
+def main() -> None:
+
+    args = parse_args()
+    points = grid(
+        configs=args.configs,
+        capacities=args.capacities,
+        conveyor_capacities=args.conveyor_capacities,
+        probabilities=args.probabilities,
+        outages=args.outages,
+        replicas=args.replicas,
+        n_cycles=int(args.hours * CYCLES_PER_HOUR),
+        seed=args.seed,
+    )
+
+    out = open(args.csv, "w", newline="") if args.csv else None
+    writer = None
+    rows = []
+
+    start = time.perf_counter()
+    for i, row in enumerate(run_sweep(points, workers=args.workers), 1):
+        rows.append(row)
+        if out is not None:
+            if writer is None:
+                writer = csv.DictWriter(out, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+            out.flush()
+        print(f"\r{i}/{len(points)} runs", end="", file=sys.stderr)
+    print(f" in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    if out is not None:
+        out.close()
+
+    print(format_table(summarize(rows)))
+
+
+if __name__ == '__main__':
+    main()
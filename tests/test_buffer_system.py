@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+import pytest
+
+from engine import BufferSystem, CrashError
+
+
+def test_engine_runs_without_pygame():
+    code = (
+        "import sys, engine, engine.buffer_system, engine.components; "
+        "sys.exit('pygame' in sys.modules)"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def parts_held(buffer: BufferSystem) -> int:
+    return (buffer.conveyor.bits.bit_count() + buffer.inlet.part_count
+            + buffer.outlet.part_count)
+
+
+@pytest.mark.parametrize("config", [0, 1, 2, 3])
+def test_parts_are_conserved(config):
+    buffer = BufferSystem(seed=2)
+    buffer.set_config(config)
+    buffer.part_inflow = True
+    for cycle in range(3000):
+        if cycle % 400 == 200:
+            buffer.toggle_downstream_fault()
+        buffer.step()
+        assert buffer.parts_in - buffer.parts_out == parts_held(buffer)
+    assert buffer.cycle_count == 3000
+    assert buffer.parts_out > 0
+
+
+def test_run_until_checks_before_every_cycle():
+    buffer = BufferSystem(seed=0)
+    buffer.part_inflow = True
+    assert buffer.run_until(lambda b: True) == 0
+    cycles = buffer.run_until(lambda b: b.parts_in == 5)
+    assert buffer.parts_in == 5 and buffer.cycle_count == cycles
+    assert buffer.run_until(lambda b: False, max_cycles=10) == 10
+
+
+def test_indexing_onto_a_part_crashes():
+    buffer = BufferSystem(seed=0)
+    buffer.outlet.set_part(0, True)
+    with pytest.raises(CrashError):
+        buffer.index_outlet()
@@ -0,0 +1,26 @@
+from engine.checker import EVENTS, INACCESSIBLE_SLOT, ModelChecker, check
+
+CAPACITY = 12  # small enough to search exhaustively in a second
+
+
+def test_config_2_strands_a_part():
+    result = check(2, CAPACITY)
+    assert result.exhaustive
+    assert set(result.failures) == {INACCESSIBLE_SLOT}
+    trace = [EVENTS.index(event)
+             for event in result.failures[INACCESSIBLE_SLOT].trace]
+    outcome = ModelChecker(2, CAPACITY).replay(trace)
+    assert outcome is not None and outcome[0] == INACCESSIBLE_SLOT
+
+
+def test_other_configs_have_no_failures():
+    for config in (0, 1, 3):
+        result = check(config, CAPACITY)
+        assert result.exhaustive, config
+        assert result.failures == {}, config
+
+
+def test_bounded_search_is_not_exhaustive():
+    result = check(1, CAPACITY, max_states=1000)
+    assert not result.exhaustive
+    assert result.states < 2000
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from engine import CrashError
+from engine.components.horiz_conveyor import HorizConveyor
+from engine.components.vert_conveyor import VertConveyor
+
+
+def test_contents_round_trip():
+    conveyor = VertConveyor(6)
+    conveyor.contents = [True, False, False, True, True, False]
+    assert conveyor.bits == 0b011001
+    assert conveyor.contents == [True, False, False, True, True, False]
+    assert conveyor.part_count == 3
+
+
+def test_vert_conveyor_matches_a_list():
+    """Random moves on the bitmask against the same moves on a list,
+    the representation it replaced."""
+    rng = random.Random(0)
+    conveyor, parts = VertConveyor(8), [False] * 8
+    for _ in range(2000):
+        move = rng.randrange(3)
+        if move == 0:
+            position, present = rng.randrange(8), rng.random() < 0.5
+            conveyor.set_part(position, present)
+            parts[position] = present
+        elif move == 1:
+            conveyor.index_up()
+            parts = [False] + parts[:-1]
+        elif parts[0]:
+            with pytest.raises(CrashError):
+                conveyor.index_down()
+        else:
+            conveyor.index_down()
+            parts = parts[1:] + [False]
+        assert conveyor.contents == parts
+        position = rng.randrange(9)
+        assert conveyor.any_from(position) == any(parts[position:])
+        assert conveyor.count_below(position) == sum(parts[:position])
+
+
+def test_indexing_changes_only_the_contents():
+    conveyor = VertConveyor(4)
+    state = set(vars(conveyor))
+    conveyor.index_up()
+    conveyor.index_down()
+    assert set(vars(conveyor)) == state
+
+
+def test_horiz_conveyor_matches_a_list():
+    rng = random.Random(1)
+    conveyor, parts = HorizConveyor(10), [False] * 10
+    for _ in range(500):
+        new_part = rng.random() < 0.5
+        conveyor.index(new_part)
+        parts = [new_part] + parts[:-1]
+        assert conveyor.contents == parts
+        position = rng.randrange(11)
+        assert conveyor.count_below(position) == sum(parts[:position])
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from engine import BufferSystem
+from engine.trace import TraceWriter
+
+# app.config opens the window on import, off screen and small here
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("BUFFERSIM_RESOLUTION", "320x180")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def trace(tmp_path) -> str:
+    path = str(tmp_path / "run.trace")
+    buffer = BufferSystem(seed=0)
+    buffer.set_config(3)
+    buffer.part_inflow = True
+    with TraceWriter(path, buffer) as writer:
+        writer.run(buffer, 1000)
+    return path
+
+
+def test_clip_fit(trace):
+    from app.export import Clip
+
+    clip = Clip.fit(trace, start=100, duration=2, speed=30, fps=10)
+    assert clip.cycles_per_frame == 1.0
+    assert (clip.frames, clip.duration) == (20, 2.0)
+    assert clip.position(19) == 119
+    # cut short where playback runs off either end of the trace
+    assert Clip.fit(trace, start=990, speed=30, fps=10).frames == 10
+    assert Clip.fit(trace, start=5, speed=-30, fps=10).frames == 6
+    with pytest.raises(ValueError):
+        Clip.fit(trace, start=1000)
+
+
+def test_split_covers_every_frame_once():
+    from app.export import split
+
+    for frames, parts in ((10, 3), (2, 8), (1000, 7)):
+        ranges = split(frames, parts)
+        assert len(ranges) == min(frames, parts)
+        assert [i for r in ranges for i in r] == list(range(frames))
+        assert max(map(len, ranges)) - min(map(len, ranges)) <= 1
+
+
+def test_export_image_sequence(trace, tmp_path):
+    output = tmp_path / "frames"
+    subprocess.run([
+        sys.executable, os.path.join(ROOT, "run_export.py"), trace,
+        str(output), "--start", "200", "--duration", "1", "--speed", "3",
+        "--fps", "10", "--resolution", "320x180", "--format", "bmp",
+        "-j", "2",
+    ], check=True, capture_output=True, cwd=ROOT)
+    files = sorted(os.listdir(output))
+    assert files == [f"frame_{i:06d}.bmp" for i in range(10)]
+    # at 0.1 cycles per frame, frames 0 to 9 all show cycle 200, the
+    # ones after the first of each process reuse its image
+    links = {os.stat(output / name).st_ino for name in files}
+    assert len(links) == 2
@@ -0,0 +1,99 @@
+from engine import BufferSystem
+from engine.models import BernoulliArrivals, ExponentialOutages
+
+
+def warmed_up(outages: bool = False) -> BufferSystem:
+    buffer = BufferSystem(
+        seed=0, arrivals=BernoulliArrivals(0.5, seed=0),
+        outages=ExponentialOutages(200, 50, seed=1) if outages else None
+    )
+    buffer.set_config(3)
+    buffer.part_inflow = True
+    buffer.run(500)
+    return buffer
+
+
+def history(buffer: BufferSystem, n_cycles: int) -> list[tuple]:
+    states = []
+    for _ in range(n_cycles):
+        buffer.step()
+        states.append((
+            buffer.conveyor.bits, buffer.parts_in,
+            buffer.downstream_stoppage
+        ))
+    return states
+
+
+def test_restore_continues_the_same_run():
+    buffer = warmed_up(outages=True)
+    data = buffer.snapshot()
+    expected = history(buffer, 2000)
+
+    other = BufferSystem(capacity=40)
+    other.restore(data)
+    assert (other.capacity, other.config, other.cycle_count) == (
+        buffer.capacity, 3, 500
+    )
+    assert history(other, 2000) == expected
+    buffer.restore(data)
+    assert history(buffer, 2000) == expected
+
+
+def test_forks_with_different_seeds_diverge():
+    buffer = warmed_up()
+    assert history(buffer.fork(seed=1), 200) != history(
+        buffer.fork(seed=2), 200
+    )
+
+
+def test_forks_with_different_seeds_diverge_downstream():
+    buffer = warmed_up(outages=True)
+    first, second = buffer.fork(seed=1), buffer.fork(seed=2)
+    stoppages = [
+        [state[2] for state in history(fork, 5000)]
+        for fork in (first, second)
+    ]
+    assert stoppages[0] != stoppages[1]
+
+
+def test_fork_without_seed_repeats_the_run():
+    buffer = warmed_up(outages=True)
+    assert history(buffer.fork(), 500) == history(buffer.fork(), 500)
+
+
+def test_reseed_keeps_the_current_outage():
+    buffer = warmed_up(outages=True)
+    fork = buffer.fork(seed=7)
+    assert fork.outages.stopped(buffer.cycle_count) == (
+        buffer.outages.stopped(buffer.cycle_count)
+    )
+
+
+def periods(outages: ExponentialOutages, cycle: int, n: int) -> list[tuple]:
+    """The state and length of the n periods after the one under way."""
+    cycle = outages.next_change(cycle)
+    result = []
+    for _ in range(n):
+        end = outages.next_change(cycle)
+        result.append((outages.stopped(cycle), end - cycle))
+        cycle = end
+    return result
+
+
+def test_reseed_keeps_running_and_halted_periods_apart():
+    for halted in (False, True):
+        outages = ExponentialOutages(mtbf=10000, mttr=10, seed=0)
+        cycle = 0
+        while outages.stopped(cycle) != halted:
+            cycle = outages.next_change(cycle)
+        cycle = (cycle + outages.next_change(cycle)) // 2  # mid-period
+        assert outages.stopped(cycle) == halted
+        outages.reseed(5)
+
+        after = periods(outages, cycle, 2000)
+        states = [stopped for stopped, _ in after]
+        assert states == [not halted, halted] * 1000
+        running = [n for stopped, n in after if not stopped]
+        down = [n for stopped, n in after if stopped]
+        assert 9000 < sum(running) / len(running) < 11000
+        assert 9 < sum(down) / len(down) < 12
@@ -0,0 +1,133 @@
+import pytest
+
+from engine import BufferSystem, strategy
+from engine.journal import (JournalWriter, expand_runs, read_journal,
+                            replay)
+from engine.strategy import (STRATEGIES, TABLES, Strategy, get_strategy,
+                             register_strategy)
+
+PHASES = ("cycle_conveyor", "cycle_verticals", "cycle_xfer_push")
+# indexes the inlet only while the downstream cell is stopped
+HOLDING = Strategy(
+    "holding", inlet=({"part_at_inlet_top": False,
+                       "downstream_stoppage": True},), min_pos=3
+)
+
+
+@pytest.fixture(autouse=True)
+def shipped_strategies():
+    strategies, tables = dict(STRATEGIES), dict(TABLES)
+    yield
+    STRATEGIES.clear()
+    STRATEGIES.update(strategies)
+    TABLES.clear()
+    TABLES.update(tables)
+
+
+def state(buffer: BufferSystem) -> tuple:
+    return (buffer.config, buffer.min_pos, buffer.xfer.position,
+            buffer.inlet.part_count, buffer.outlet.part_count,
+            buffer.conveyor.bits)
+
+
+def record_session(path, buffer: BufferSystem, reload_at: int) -> None:
+    """Runs 600 cycles journaled, registering HOLDING as config 1 on
+    the given cycle, the way a hot reload does."""
+    with JournalWriter(str(path), buffer) as journal:
+        journal.record("toggle_part_inflow")
+        buffer.toggle_part_inflow()
+        for cycle in range(600):
+            if cycle == reload_at:
+                journal.record_strategy(1, HOLDING)
+                register_strategy(1, HOLDING)
+                buffer.min_pos = get_strategy(buffer.config).min_pos
+            for phase in PHASES:
+                journal.record(phase)
+                getattr(buffer, phase)()
+
+
+def new_buffer(config: int) -> BufferSystem:
+    buffer = BufferSystem(seed=3)
+    buffer.set_config(config)
+    return buffer
+
+
+def test_replay_registers_reloaded_strategies(tmp_path):
+    path = tmp_path / "session.journal"
+    buffer = new_buffer(1)
+    original = get_strategy(1)
+    record_session(path, buffer, reload_at=300)
+
+    register_strategy(1, original)  # as a new process would have it
+    header, records = read_journal(str(path))
+    assert [r.strategy for r in records if r.cycle > 0 and r.strategy] \
+        == [HOLDING]
+    assert state(replay(header, records).buffer) == state(buffer)
+
+    register_strategy(1, original)
+    unloaded = [r for r in records if r.strategy != HOLDING]
+    assert state(replay(header, unloaded).buffer) != state(buffer)
+
+
+def test_replay_starts_with_the_session_strategies(tmp_path):
+    path = tmp_path / "session.journal"
+    register_strategy(7, HOLDING)  # e.g. from a --logic directory
+    buffer = new_buffer(7)
+    record_session(path, buffer, reload_at=-1)
+
+    del STRATEGIES[7], TABLES[7]
+    header, records = read_journal(str(path))
+    assert state(replay(header, records).buffer) == state(buffer)
+
+
+def test_truncated_strategy_is_dropped(tmp_path):
+    path = tmp_path / "session.journal"
+    record_session(path, new_buffer(1), reload_at=599)
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(data[:data.rindex(b'"holding"')])
+    header, records = read_journal(str(path))
+    assert (records[-1].action, records[-1].count) \
+        == ("cycle_conveyor", 599 * len(PHASES))
+
+
+def test_phases_are_recorded_as_runs(tmp_path):
+    path = tmp_path / "session.journal"
+    buffer = new_buffer(1)
+    record_session(path, buffer, reload_at=300)
+    header, records = read_journal(str(path))
+    runs = [(r.cycle, r.action, r.count) for r in records if r.count > 1]
+    assert runs == [(1, "cycle_conveyor", 300 * len(PHASES)),
+                    (301, "cycle_conveyor", 300 * len(PHASES))]
+    actions = list(expand_runs(records))
+    phases = [(r.cycle, r.action) for r in actions if r.action in PHASES]
+    assert phases == [(cycle + 1, phase) for cycle in range(600)
+                      for phase in PHASES]
+    result = replay(header, records, until_cycle=451)
+    assert result.cycle == 450
+    assert result.applied == len(actions) - 150 * len(PHASES)
+
+
+def test_cycles_past_32_bits(tmp_path):
+    path = tmp_path / "session.journal"
+    with JournalWriter(str(path), new_buffer(1)) as journal:
+        journal.cycle = 2 ** 32 - 1
+        journal.record("cycle_xfer_push")
+        journal.record("cycle_conveyor")
+        journal.record("toggle_autorun")
+    header, records = read_journal(str(path))
+    assert [(r.cycle, r.action, r.count) for r in records[-2:]] \
+        == [(2 ** 32 - 1, "cycle_xfer_push", 2),
+            (2 ** 32, "toggle_autorun", 1)]
+
+
+def test_invalid_shipped_file_is_skipped(tmp_path, monkeypatch):
+    (tmp_path / "1-broken.json").write_text('{"config": 1, "name": "x"}')
+    (tmp_path / "2-fine.json").write_text(
+        '{"config": 2, "name": "fine", "inlet": [{"xfer_at_max": false}]}'
+    )
+    monkeypatch.setattr(strategy, "LOGIC_DIR", str(tmp_path))
+    with pytest.warns(UserWarning, match="1-broken.json: missing inlet"):
+        strategy._load_shipped()
+    assert get_strategy(2).name == "fine"
@@ -0,0 +1,63 @@
+import pytest
+
+from engine.kpi import ProductionStats, RingBuffer
+
+
+def test_ring_buffer_keeps_the_latest_values_in_order():
+    ring = RingBuffer(5)
+    for value in (3, 1, 4):
+        ring.append(value)
+    assert list(ring) == [3, 1, 4]
+    assert (len(ring), ring.total, ring.latest) == (3, 8, 4)
+
+    for value in (1, 5, 9, 2):  # wraps around, 3, 1 are dropped
+        ring.append(value)
+    assert list(ring) == [4, 1, 5, 9, 2]
+    assert (len(ring), ring.total, ring.latest) == (5, 21, 2)
+    assert ring.mean == pytest.approx(21 / 5)
+
+
+def test_ring_buffer_extend():
+    ring = RingBuffer(4)
+    ring.append(7)
+    ring.extend(1, 2)
+    assert list(ring) == [7, 1, 1]
+    ring.extend(2, 10)  # more than fit, only the last 4 remain
+    assert list(ring) == [2, 2, 2, 2]
+    assert ring.total == 8
+    ring.extend(5, 0)
+    assert list(ring) == [2, 2, 2, 2]
+
+
+def test_ring_buffer_copy_is_independent():
+    ring = RingBuffer(3)
+    ring.extend(1, 3)
+    clone = ring.copy()
+    ring.append(4)
+    assert list(clone) == [1, 1, 1] and clone.total == 3
+    assert list(ring) == [1, 1, 4]
+
+
+def state(stats: ProductionStats) -> tuple:
+    return (
+        stats.cycles, stats.parts_in, stats.parts_out, stats.blocked_cycles,
+        stats.starved_cycles, stats.travel, stats.position,
+        *(list(ring) for ring in (stats.inflow, stats.outflow,
+                                  stats.blocked, stats.starved, stats.fill)),
+        *(ring.total for ring in (stats.inflow, stats.outflow,
+                                  stats.blocked, stats.starved, stats.fill)),
+    )
+
+
+@pytest.mark.parametrize("n_cycles", [0, 1, 5, 8, 30])
+def test_record_idle_matches_repeated_record(n_cycles):
+    bulk, single = ProductionStats(window=8), ProductionStats(window=8)
+    for stats in (bulk, single):
+        stats.record(True, False, False, False, fill=2, position=4)
+        stats.record(False, True, True, False, fill=3, position=6)
+
+    bulk.record_idle(n_cycles, blocked=True, starved=False, fill=3,
+                     position=5)
+    for _ in range(n_cycles):
+        single.record(False, False, True, False, fill=3, position=5)
+    assert state(bulk) == state(single)
@@ -0,0 +1,55 @@
+import pytest
+
+from engine import BufferSystem
+from engine.line import Cell, Line, Tower
+from engine.models import ExponentialOutages
+
+HOUR = 3600 * 1000  # ms
+
+
+def build_line(towers: int = 2, seed: int = 0) -> Line:
+    line = Line()
+    line.add(Cell("source", 2800))
+    for i in range(towers):
+        buffer = BufferSystem(capacity=40, seed=seed + 2 * i)
+        buffer.set_config(3)
+        line.add(buffer, segment_capacity=8)
+        line.add(Cell(f"cell {i + 1}", 3200,
+                      ExponentialOutages(300, 60, seed=seed + 2 * i + 1)))
+    return line
+
+
+def held(stage) -> int:
+    if isinstance(stage, Tower):
+        return stage.buffer.parts_in - stage.buffer.parts_out
+    return int(stage.holding)
+
+
+def test_parts_are_conserved():
+    line = build_line()
+    source = line.stages[0]
+    for _ in range(8):
+        line.run(HOUR // 4)
+        assert all(segment.parts >= 0 for segment in line.segments)
+        assert source.parts_out == line.parts_out + sum(
+            segment.parts for segment in line.segments
+        ) + sum(held(stage) for stage in line.stages[1:])
+    for before, after in zip(line.stages, line.stages[1:]):
+        assert after.parts_in <= before.parts_out
+    assert line.parts_out > 0
+    assert sum(tower.overflows for tower in line.towers) == 0
+
+
+def test_stages_cycle_at_their_own_times():
+    line = build_line(towers=1)
+    line.run(HOUR)
+    source, tower, cell = line.stages
+    assert source.cycles == -(-HOUR // 2800)
+    assert cell.cycles == -(-HOUR // 3200)
+    assert tower.cycles == -(-HOUR // tower.cycle_time)
+
+
+def test_tower_with_outage_model_is_refused():
+    buffer = BufferSystem(outages=ExponentialOutages(300, 60))
+    with pytest.raises(ValueError):
+        Tower("tower", buffer)
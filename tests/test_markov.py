@@ -0,0 +1,42 @@
+import pytest
+
+from engine import BufferSystem
+from engine.markov import MarkovChain
+
+CAPACITY = 10  # a tower of a few hundred states
+
+
+def simulate(config: int, n_cycles: int) -> tuple[float, float, float]:
+    """Throughput, mean fill and overflow probability of a long run of
+    the scalar engine."""
+    buffer = BufferSystem(capacity=CAPACITY, seed=1)
+    buffer.set_config(config)
+    buffer.part_inflow = True
+    fill = blocked = 0
+    for _ in range(n_cycles):
+        blocked += buffer.upstream_inhibit
+        buffer.step()
+        fill += buffer.inlet.part_count + buffer.outlet.part_count
+    return buffer.parts_out / n_cycles, fill / n_cycles, blocked / n_cycles
+
+
+@pytest.mark.parametrize("config", [0, 3])
+def test_steady_state_matches_monte_carlo(config):
+    result = MarkovChain(config, CAPACITY).solve()
+    throughput, fill, overflow = simulate(config, 200_000)
+    assert result.crash_probability == 0
+    assert result.throughput == pytest.approx(throughput, abs=0.01)
+    assert result.mean_fill == pytest.approx(fill, abs=0.05)
+    assert result.overflow_probability == pytest.approx(overflow, abs=0.01)
+
+
+@pytest.mark.parametrize("mtbf, mttr", [(None, None), (200, 50)])
+def test_distribution_conserves_parts(mtbf, mttr):
+    chain = MarkovChain(3, CAPACITY, mtbf=mtbf, mttr=mttr)
+    pi, _ = chain.stationary()
+    assert pi.sum() == pytest.approx(1)
+    assert pi.min() >= 0
+    # parts arriving, less those turned away while blocked, leave
+    result = chain.solve()
+    accepted = result.inflow_probability * (1 - result.overflow_probability)
+    assert accepted == pytest.approx(result.throughput)
@@ -0,0 +1,53 @@
+import pytest
+
+from engine.optimizer import CapacityOptimizer, Estimate, Scenario, trial
+
+
+@pytest.mark.parametrize("successes, trials, low, high", [
+    (8, 10, 0.4902, 0.9433),  # textbook Wilson score intervals
+    (0, 10, 0.0, 0.2775),
+    (10, 10, 0.7225, 1.0),
+    (95, 100, 0.8882, 0.9785),
+])
+def test_wilson_interval(successes, trials, low, high):
+    interval = Estimate(successes, trials).interval(0.95)
+    assert interval == pytest.approx((low, high), abs=1e-4)
+
+
+def test_interval_without_trials_is_uninformative():
+    assert Estimate().interval() == (0.0, 1.0)
+
+
+class StubOptimizer(CapacityOptimizer):
+    """Capacities from `smallest` up always pass, smaller ones never."""
+
+    def __init__(self, smallest: int) -> None:
+        super().__init__(Scenario(outage_cycles=100), workers=1)
+        self.smallest = smallest
+        self.evaluated: list[int] = []
+
+    def evaluate(self, executor, config: int, capacity: int) -> Estimate:
+        self.evaluated.append(capacity)
+        trials = self.max_replicas
+        return Estimate(trials if capacity >= self.smallest else 0, trials)
+
+
+@pytest.mark.parametrize("smallest", [10, 38, 40, 100])
+def test_bisection_finds_the_smallest_passing_capacity(smallest):
+    optimizer = StubOptimizer(smallest)
+    sizing = optimizer.search(None, 3, 10, 100)
+    assert sizing.capacity == smallest
+    assert optimizer.evaluated[0] == 100
+    assert len(optimizer.evaluated) <= 8  # log2 of 46 pitches, plus one
+    assert set(sizing.tried) == set(optimizer.evaluated)
+
+
+def test_nothing_passes_in_range():
+    sizing = StubOptimizer(102).search(None, 3, 10, 100)
+    assert sizing.capacity is None and list(sizing.tried) == [100]
+
+
+def test_trial_counts_replicas_through_the_outage():
+    scenario = Scenario(outage_cycles=30, inflow_probability=1.0)
+    assert trial(scenario, 3, 150, 16, seed=0) == 16  # plenty of room
+    assert trial(scenario, 3, 20, 16, seed=0) == 0  # fills up at once
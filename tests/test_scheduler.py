@@ -0,0 +1,84 @@
+from engine import BufferSystem
+from engine.kpi import ProductionStats
+from engine.models import BernoulliArrivals
+from engine.scheduler import EventScheduler
+from engine.strategy import Strategy, get_strategy, register_strategy
+
+# (cycle, attribute, value) changes made before the cycle runs
+CHANGES = [
+    (1000, "part_inflow", False),
+    (3000, "downstream_stoppage", True),
+    (3500, "part_inflow", True),
+    (5000, "downstream_stoppage", False),
+    (6000, "part_inflow", False),
+    (9000, "part_inflow", True),
+]
+CYCLES = 12000
+
+
+def make_buffer(config: int) -> BufferSystem:
+    buffer = BufferSystem(
+        seed=0, arrivals=BernoulliArrivals(0.5, seed=0),
+        stats=ProductionStats(window=500)
+    )
+    buffer.set_config(config)
+    buffer.part_inflow = True
+    return buffer
+
+
+def kpis(stats: ProductionStats) -> tuple:
+    return (
+        stats.cycles, stats.parts_in, stats.parts_out,
+        stats.blocked_cycles, stats.starved_cycles, stats.travel,
+        list(stats.inflow), list(stats.outflow), list(stats.blocked),
+        list(stats.starved), list(stats.fill),
+    )
+
+
+def run_plain(config: int) -> BufferSystem:
+    buffer = make_buffer(config)
+    changes = {cycle: (name, value) for cycle, name, value in CHANGES}
+    for cycle in range(CYCLES):
+        if cycle in changes:
+            setattr(buffer, *changes[cycle])
+        buffer.step()
+    return buffer
+
+
+def run_event_driven(config: int) -> tuple[BufferSystem, EventScheduler]:
+    buffer = make_buffer(config)
+    scheduler = EventScheduler(buffer)
+    for cycle, name, value in CHANGES:
+        if name == "part_inflow":
+            scheduler.set_upstream(cycle, value)
+        else:
+            scheduler.set_downstream(cycle, value)
+    scheduler.run(CYCLES)
+    return buffer, scheduler
+
+
+def test_event_driven_kpis_match_plain_run():
+    for config in (0, 3):
+        plain = run_plain(config)
+        buffer, scheduler = run_event_driven(config)
+        assert scheduler.cycles_skipped > 0
+        assert buffer.cycle_count == plain.cycle_count
+        assert kpis(buffer.stats) == kpis(plain.stats)
+
+
+def test_pass_through_cache_follows_registered_strategies():
+    original = get_strategy(0)
+    buffer = BufferSystem(seed=0, arrivals=BernoulliArrivals(0.5, seed=0))
+    buffer.set_config(0)
+    buffer.part_inflow = True
+    scheduler = EventScheduler(buffer)
+    scheduler.run(100)
+    assert scheduler._passes_through()
+    try:
+        # lifts every part it sees, so the conveyor no longer passes
+        register_strategy(0, Strategy(
+            "lift", inlet=({"part_at_inlet_bottom": True},), min_pos=1
+        ))
+        assert not scheduler._passes_through()
+    finally:
+        register_strategy(0, original)
@@ -0,0 +1,39 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+# app.config opens the window on import, off screen and small here
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("BUFFERSIM_RESOLUTION", "320x180")
+
+
+@pytest.fixture
+def ticks(monkeypatch) -> list[int]:
+    import pygame
+
+    now = [1000]
+    monkeypatch.setattr(pygame.time, "get_ticks", lambda: now[0])
+    return now
+
+
+def test_rate_is_held_between_refreshes(ticks):
+    from app.ui.speed_display import RATE_REFRESH, SpeedDisplay
+
+    buffer = SimpleNamespace(speed=64, cycles_per_frame=0, cycle_time=46,
+                             rate=21.3, target_rate=21.3)
+    display = SpeedDisplay(buffer)
+    text = display.text
+    assert text[2] == "Cycles/s: 21.3 / 21.3"
+
+    buffer.rate = 21.4
+    ticks[0] += RATE_REFRESH - 1
+    assert display.text == text
+    ticks[0] += 1
+    assert display.text[2] == "Cycles/s: 21.4 / 21.3"
+
+    buffer.rate = 0.0  # autorun stopped, shown at once
+    assert display.text[2] == "Cycles/s: 0.0 / 21.3"
+    buffer.rate = 21.3
+    assert display.text[2] == "Cycles/s: 21.3 / 21.3"
@@ -0,0 +1,119 @@
+import json
+import os
+
+import pytest
+
+from engine import BufferSystem
+from engine.strategy import (SENSORS, STRATEGIES, TABLES, WORDS,
+                             StrategyWatcher, load_directory, sensor_word)
+
+
+def baseline(config: int, word: int) -> tuple[bool, bool]:
+    """The if/elif chain vert_strategy was before it was compiled, on
+    the sensors of a word."""
+    sensors = {name: bool(word & bit) for name, bit in SENSORS.items()}
+    inlet_bottom = sensors["part_at_inlet_bottom"]
+    inlet_top = sensors["part_at_inlet_top"]
+    below_max = not sensors["xfer_at_max"]
+    stoppage = sensors["downstream_stoppage"]
+
+    inlet = False
+    if config == 0:
+        inlet = inlet_bottom and stoppage
+    elif config == 1:
+        inlet = not inlet_top or below_max
+    elif config in (2, 3):
+        inlet = (not inlet_top or below_max) and inlet_bottom
+        if config == 3 and not (
+            inlet_bottom or inlet_top or sensors["part_at_outlet_top"]
+        ):
+            inlet = True
+    outlet = not stoppage and not sensors["part_at_outlet_bottom"]
+    return inlet, outlet
+
+
+@pytest.mark.parametrize("config", [0, 1, 2, 3])
+def test_tables_match_the_original_logic(config):
+    assert len(TABLES[config]) == WORDS == 64
+    for word in range(WORDS):
+        assert TABLES[config][word] == baseline(config, word), word
+
+
+def test_buffer_sensor_word_packs_its_sensors():
+    buffer = BufferSystem(capacity=20, seed=0)
+    buffer.set_config(3)
+    buffer.part_inflow = True
+    words = set()
+    for cycle in range(5000):
+        if cycle % 300 == 150:
+            buffer.toggle_downstream_fault()
+        buffer.step()
+        word = buffer.sensor_word
+        assert word == sensor_word(
+            buffer.part_at_inlet_bottom, buffer.part_at_inlet_top,
+            buffer.part_at_outlet_top, buffer.part_at_outlet_bottom,
+            buffer.xfer.position >= buffer.max_pos,
+            buffer.downstream_stoppage,
+        )
+        words.add(word)
+    assert len(words) > 10
+
+
+def write(path, data: str, stamp: int) -> None:
+    """Writes a file with a given modification time, as polling would
+    miss a rewrite within the file system's timestamp resolution."""
+    path.write_text(data)
+    os.utime(path, ns=(stamp, stamp))
+
+
+def strategy_json(config: int, name: str) -> str:
+    return json.dumps({"config": config, "name": name,
+                       "inlet": [{"xfer_at_max": False}]})
+
+
+def test_watcher_reads_changed_files(tmp_path):
+    write(tmp_path / "a.json", strategy_json(4, "a"), 1)
+    write(tmp_path / "b.json", strategy_json(5, "b"), 1)
+    watcher = StrategyWatcher(str(tmp_path))
+    assert watcher.poll() == {}  # present at the start, taken as loaded
+
+    write(tmp_path / "a.json", strategy_json(4, "a, edited"), 2)
+    write(tmp_path / "c.json", strategy_json(6, "c"), 2)
+    (tmp_path / "notes.txt").write_text("not a strategy")
+    changed = watcher.poll()
+    assert {config: s.name for config, s in changed.items()} == {
+        4: "a, edited", 6: "c"
+    }
+    assert watcher.errors == []
+    assert watcher.poll() == {}
+
+
+def test_watcher_skips_invalid_and_duplicate_files(tmp_path):
+    write(tmp_path / "a.json", strategy_json(4, "a"), 1)
+    watcher = StrategyWatcher(str(tmp_path))
+
+    write(tmp_path / "a.json", '{"config": 4, "name": "a", "inlet": [', 2)
+    write(tmp_path / "b.json", strategy_json(4, "b"), 2)
+    write(tmp_path / "c.json", json.dumps(
+        {"config": 7, "name": "c", "inlet": [{"no_such_sensor": True}]}
+    ), 2)
+    assert watcher.poll() == {}
+    assert sorted(error.split(":")[0] for error in watcher.errors) == [
+        str(tmp_path / name) for name in ("a.json", "b.json", "c.json")
+    ]
+    assert "config 4 is already defined by" in " ".join(watcher.errors)
+
+    # fixed, and the duplicate renumbered, both load on the next poll
+    write(tmp_path / "a.json", strategy_json(4, "a, fixed"), 3)
+    write(tmp_path / "b.json", strategy_json(8, "b"), 3)
+    assert sorted(watcher.poll()) == [4, 8]
+    assert watcher.errors == []
+
+
+def test_load_directory_is_all_or_nothing(tmp_path):
+    write(tmp_path / "a.json", strategy_json(4, "a"), 1)
+    write(tmp_path / "b.json", strategy_json(4, "b"), 1)
+    before = dict(STRATEGIES)
+    with pytest.raises(ValueError, match="already defined"):
+        load_directory(str(tmp_path))
+    assert STRATEGIES == before
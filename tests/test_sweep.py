@@ -0,0 +1,42 @@
+import pytest
+
+from engine.sweep import Outage, grid, run_sweep, simulate, summarize
+
+
+def test_seeds_do_not_depend_on_the_other_swept_values():
+    alone = grid([1], [20], [16], [0.5], [None], replicas=2, n_cycles=10)
+    swept = grid([0, 1], [20, 40], [16], [0.5], [None, Outage(100, 10)],
+                 replicas=2, n_cycles=10)
+    assert len(swept) == 2 * 2 * 2 * 2
+    assert set(alone) <= set(swept)
+    assert len({point.seed for point in swept}) == len(swept)
+
+
+def test_outage_pattern():
+    outage = Outage.parse("10:3")
+    assert [outage.stopped(cycle) for cycle in range(12)] == (
+        [False] * 7 + [True] * 3 + [False] * 2
+    )
+    assert [outage.next_change(cycle) for cycle in (0, 6, 7, 9)] == (
+        [7, 7, 10, 10]
+    )
+    assert Outage.parse("none") is None
+    with pytest.raises(ValueError):
+        Outage.parse("5:6")
+
+
+def run_key(row: dict) -> tuple:
+    return row["config"], row["outage"], row["replica"]
+
+
+def test_parallel_sweep_matches_serial_runs():
+    points = grid([0, 3], [20], [16], [0.6], [None, Outage(500, 200)],
+                  replicas=2, n_cycles=2000)
+    rows = list(run_sweep(points, workers=2))
+    assert sorted(rows, key=run_key) == sorted(map(simulate, points),
+                                               key=run_key)
+
+    summary = summarize(rows)
+    assert len(summary) == 4
+    assert all(row["runs"] == 2 for row in summary)
+    assert sum(row["crashes"] for row in summary) == 0
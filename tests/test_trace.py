@@ -0,0 +1,82 @@
+from dataclasses import astuple
+
+import pytest
+
+from engine import BufferSystem
+from engine.trace import (DOWNSTREAM_STOPPAGE, PART_INFLOW, UPSTREAM_INHIBIT,
+                          TraceReader, TraceWriter)
+
+CYCLES = 3000
+INTERVAL = 64
+
+
+def record_run(path, close: bool = True) -> tuple[list[tuple], TraceWriter]:
+    """Records a run with the downstream cell stopped now and then,
+    returning the state after every cycle."""
+    buffer = BufferSystem(capacity=40, seed=0)
+    buffer.set_config(3)
+    buffer.part_inflow = True
+    writer = TraceWriter(str(path), buffer, interval=INTERVAL)
+    states = []
+    for cycle in range(CYCLES):
+        if cycle % 500 == 100 or cycle % 500 == 400:
+            buffer.toggle_downstream_fault()
+        buffer.step()
+        writer.record(buffer)
+        flags = (UPSTREAM_INHIBIT * buffer.upstream_inhibit
+                 | DOWNSTREAM_STOPPAGE * buffer.downstream_stoppage
+                 | PART_INFLOW)
+        states.append((buffer.conveyor.bits, buffer.inlet.bits,
+                       buffer.outlet.bits, buffer.xfer.position, flags))
+    if close:
+        writer.close()
+    return states, writer
+
+
+def test_round_trip(tmp_path):
+    states, _ = record_run(tmp_path / "run.trace")
+    with TraceReader(str(tmp_path / "run.trace")) as trace:
+        assert (len(trace), trace.capacity, trace.config) == (CYCLES, 40, 3)
+        assert [
+            astuple(trace.state(cycle))
+            for cycle in range(CYCLES)
+        ] == states
+        inlet = trace.bits("inlet", 1000, 1010)
+        assert inlet.shape == (10, 20)
+        assert [sum(bit << i for i, bit in enumerate(row))
+                for row in inlet.tolist()] == [s[1] for s in states[1000:1010]]
+
+
+def brute_find(states, flags, start, reverse=False, clear=False):
+    cycles = range(start, -1, -1) if reverse else range(start, len(states))
+    for cycle in cycles:
+        hit = states[cycle][4] & flags
+        if (not hit) if clear else hit:
+            return cycle
+    return None
+
+
+@pytest.mark.parametrize("flags", [UPSTREAM_INHIBIT, DOWNSTREAM_STOPPAGE])
+def test_find(tmp_path, flags):
+    states, _ = record_run(tmp_path / "run.trace")
+    with TraceReader(str(tmp_path / "run.trace")) as trace:
+        for start in range(0, CYCLES, 97):
+            for reverse in (False, True):
+                for clear in (False, True):
+                    assert trace.find(flags, start, reverse, clear) == (
+                        brute_find(states, flags, start, reverse, clear)
+                    ), (start, reverse, clear)
+
+
+def test_trace_cut_short_reads_up_to_its_last_block(tmp_path):
+    states, writer = record_run(tmp_path / "run.trace", close=False)
+    writer.map.flush()
+    with TraceReader(str(tmp_path / "run.trace")) as trace:
+        assert len(trace) == CYCLES // INTERVAL * INTERVAL
+        assert astuple(trace.state(len(trace) - 1)) == (
+            states[len(trace) - 1]
+        )
+        assert trace.find(DOWNSTREAM_STOPPAGE) == brute_find(
+            states, DOWNSTREAM_STOPPAGE, 0
+        )
+    writer.close()
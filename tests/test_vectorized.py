@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from engine import BufferSystem
+from engine.exceptions import CrashError
+from engine.vectorized import BufferBatch
+
+CONFIGS = [0, 1, 2, 3]
+CYCLES = 4000
+
+
+class ScheduledBatch(BufferBatch):
+    """Takes the parts ready upstream from a fixed schedule, one row
+    per cycle, so the scalar engine can be given the same ones."""
+
+    def __init__(self, schedule: np.ndarray, *args, **kwargs) -> None:
+        self.schedule = schedule
+        super().__init__(*args, **kwargs)
+
+    def draw_parts(self) -> np.ndarray:
+        return self.schedule[self.cycle_count]
+
+
+def state(batch: BufferBatch, i: int) -> tuple:
+    return (list(batch.conveyor[i]), list(batch.inlet[i]),
+            list(batch.outlet[i]), int(batch.position[i]),
+            int(batch.parts_in[i]), int(batch.parts_out[i]))
+
+
+def scalar_state(buffer: BufferSystem) -> tuple:
+    return (buffer.conveyor.contents, buffer.inlet.contents,
+            buffer.outlet.contents, buffer.xfer.position,
+            buffer.parts_in, buffer.parts_out)
+
+
+@pytest.mark.parametrize("probability", [None, 0.0, 1.0])
+def test_batch_follows_scalar_engine(probability):
+    """Replicas of configs 0 to 3 match the scalar engine cycle for
+    cycle, under seeded arrivals or p = 0 or 1 inflow, with the
+    downstream cell stopped and restarted at random."""
+    rng = np.random.default_rng(0)
+    if probability is None:
+        schedule = rng.random((CYCLES, len(CONFIGS))) < 2 / 3
+    else:
+        schedule = np.full((CYCLES, len(CONFIGS)), probability == 1.0)
+    toggles = set(np.flatnonzero(rng.random(CYCLES) < 0.01).tolist())
+
+    batch = ScheduledBatch(schedule, len(CONFIGS), config=CONFIGS)
+    batch.part_inflow[:] = True
+    buffers = []
+    for config in CONFIGS:
+        buffer = BufferSystem(seed=0)
+        buffer.set_config(config)
+        buffer.part_inflow = True
+        buffers.append(buffer)
+
+    crashed = [False] * len(CONFIGS)
+    for cycle in range(CYCLES):
+        if cycle in toggles:
+            batch.downstream_stoppage ^= True
+        for i, buffer in enumerate(buffers):
+            if cycle in toggles:
+                buffer.toggle_downstream_fault()
+            if crashed[i]:
+                continue
+            try:
+                buffer.step(part_ready=bool(schedule[cycle, i]))
+            except CrashError:
+                crashed[i] = True
+        batch.step()
+        for i, buffer in enumerate(buffers):
+            assert batch.crashed[i] == crashed[i], (CONFIGS[i], cycle)
+            if not crashed[i]:
+                assert state(batch, i) == scalar_state(buffer), (
+                    CONFIGS[i], cycle
+                )
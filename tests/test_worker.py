@@ -0,0 +1,122 @@
+import dataclasses
+import threading
+
+import pytest
+
+from engine import BufferSystem
+from engine import worker as worker_module
+from engine.buffer_system import BASE_CYCLE_TIME
+from engine.worker import (MAX_CHUNK, MAX_SPEED, REALTIME_SPEED,
+                           SimulationWorker)
+
+
+def running_buffer(speed: float = 1.0) -> BufferSystem:
+    buffer = BufferSystem(seed=0)
+    buffer.set_config(3)
+    buffer.part_inflow = True
+    buffer.speed = speed
+    buffer.autorun = True
+    return buffer
+
+
+def test_frames_are_consistent_copies_of_the_running_buffer():
+    published = threading.Event()
+    worker = SimulationWorker(running_buffer(MAX_SPEED),
+                              on_frame=published.set)
+    worker.start()
+    try:
+        cycles = []
+        for _ in range(5):
+            published.clear()
+            worker.request_frame()
+            assert published.wait(5)
+            frame = worker.frame
+            held = sum(bits.bit_count() for bits in
+                       (frame.conveyor, frame.inlet, frame.outlet))
+            assert frame.parts_in - frame.parts_out == held
+            cycles.append(frame.cycle_count)
+        assert cycles == sorted(cycles) and cycles[-1] > cycles[0]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            frame.cycle_count = 0
+
+        ran_on = []
+        done = threading.Event()
+        worker.submit(lambda: (ran_on.append(threading.current_thread()),
+                               done.set()))
+        assert done.wait(5)
+        assert ran_on == [worker._thread]
+    finally:
+        worker.stop()
+    assert worker.error is None
+
+
+def test_error_stops_the_worker_and_wakes_the_renderer():
+    woken = threading.Event()
+    worker = SimulationWorker(running_buffer(), on_frame=woken.set)
+    worker.start()
+    worker.submit(lambda: 1 / 0)
+    assert woken.wait(5)
+    worker.stop()
+    assert isinstance(worker.error, ZeroDivisionError)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(worker_module, "perf_counter", clock)
+    return clock
+
+
+def test_real_time_runs_the_phases_due(clock):
+    """The worker's loop is driven by hand, without its thread."""
+    worker = SimulationWorker(running_buffer(speed=300.0))
+    cycle = worker.buffer.cycle_time / 1000  # 10 ms
+    assert worker.target_rate == 1 / cycle
+    assert worker._timeout() == pytest.approx(cycle)
+
+    worker._run_autorun()
+    assert worker.cycles == 0  # the first cycle starts one cycle from now
+    clock.now += 11 * cycle - 1e-6  # within MAX_LAG
+    worker._run_autorun()
+    assert worker.cycles == 10 and worker._phase == 0
+
+    # far behind schedule the missed phases are dropped, not caught up
+    clock.now += 3600
+    worker._run_autorun()
+    assert worker.cycles <= 12
+
+
+def test_time_warp_runs_cycles_per_frame(clock):
+    worker = SimulationWorker(running_buffer(speed=8 * REALTIME_SPEED),
+                              frame_rate=60)
+    per_frame = round(8 * REALTIME_SPEED * 1000 / BASE_CYCLE_TIME / 60)
+    assert worker.cycles_per_frame == per_frame
+    assert worker.target_rate == per_frame * 60
+    assert worker._timeout() is None  # only frame requests advance it
+
+    worker._run_autorun()
+    assert worker.cycles == 0
+    worker.request_frame()
+    worker._run_autorun()
+    assert worker.cycles == per_frame
+    clock.now += 3600  # the clock plays no part
+    worker._run_autorun()
+    assert worker.cycles == 2 * per_frame
+
+
+def test_max_speed_runs_chunks(clock):
+    worker = SimulationWorker(running_buffer(speed=MAX_SPEED))
+    assert worker.cycles_per_frame == 0
+    assert worker.target_rate == float("inf")
+    assert worker._timeout() == 0.0
+    worker._run_autorun()
+    worker._run_autorun()
+    assert worker.cycles == worker.buffer.cycle_count == 2 * MAX_CHUNK